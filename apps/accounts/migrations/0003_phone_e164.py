@@ -0,0 +1,61 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:39
+
+import re
+
+from django.db import migrations, models
+
+
+# Self-contained copy of apps.core.phone.to_e164 as of this migration.
+_BD_LOCAL = re.compile(r"^01\d{9}$")
+
+
+def _to_e164(value):
+    raw = str(value or "").strip()
+    d = "".join(ch for ch in raw if ch.isdigit())
+    local = d[2:] if d.startswith("00") else d
+    if local.startswith("880") and len(local) == 13:
+        local = "0" + local[3:]
+    elif len(local) == 10 and local.startswith("1"):
+        local = "0" + local
+    if _BD_LOCAL.match(local):
+        return f"+880{local[1:]}"
+    if raw.startswith("00"):
+        d = d[2:]
+    elif not raw.startswith("+"):
+        return None
+    return f"+{d}" if 8 <= len(d) <= 15 else None
+
+
+def _backfill_model(model, batch_size=2000):
+    batch = []
+    for obj in model._default_manager.only("pk", "phone_number", "phone_e164").order_by("pk").iterator(chunk_size=batch_size):
+        e164 = _to_e164(obj.phone_number) or ""
+        if obj.phone_e164 != e164:
+            obj.phone_e164 = e164
+            batch.append(obj)
+        if len(batch) >= batch_size:
+            model._default_manager.bulk_update(batch, ["phone_e164"])
+            batch = []
+    if batch:
+        model._default_manager.bulk_update(batch, ["phone_e164"])
+
+
+def backfill(apps, schema_editor):
+    for label in ('accounts.User',):
+        _backfill_model(apps.get_model(label))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_user_role'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='phone_e164',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=16),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,8 @@
 from django.db import models
 from django.utils import timezone
 
+from apps.core.phone import fill_phone_e164
+
 
 class UserManager(BaseUserManager):
     def create_user(self, phone_number, password=None, **extra_fields):
@@ -31,6 +33,7 @@ def create_superuser(self, phone_number, password, **extra_fields):
 
 class User(AbstractBaseUser, PermissionsMixin):
     phone_number = models.CharField(max_length=15, unique=True)
+    phone_e164 = models.CharField(max_length=16, blank=True, db_index=True, editable=False)  # see apps/core/phone.py
     email = models.EmailField(max_length=255, unique=True, blank=True, null=True)
 
     is_active = models.BooleanField(default=True)
@@ -80,3 +83,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return f"{self.phone_number}"
         # return f"{self.phone_number} ({self.get_role_display()})"
+
+    def save(self, *args, **kwargs):
+        fill_phone_e164(self, kwargs)
+        super().save(*args, **kwargs)
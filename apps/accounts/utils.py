@@ -1,6 +1,8 @@
 import random
 import string
-import requests
+
+from apps.core.phone import gateway_number
+from apps.core.sms import get_sms_client
 
 
 from django.utils import timezone
@@ -53,41 +55,10 @@ def generate_password(length=8):
 
 
 
-import logging
-
-logger = logging.getLogger(__name__)
-
 def send_sms_jbd(phone_number: str, message: str, api_token: str, sender_id: str = "YourName") -> str:
-    url = "https://sms.jbdit.net/api/http/sms/send"
-    headers = {
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-    }
-    payload = {
-        "api_token": api_token,
-        "recipient": phone_number,
-        "sender_id": sender_id,
-        "type": "plain",
-        "message": message,
-    }
-
-    try:
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
-        response.raise_for_status()  # Raise exception for non-2xx responses
-        result = response.json()
-
-        # Check the result of the response
-        if result.get("status") == "success":
-            return "SENT"
-        else:
-            logger.error(f"Error response from SMS API: {result}")
-            return f"FAILED: {result.get('error_message', 'Unknown error')}"
-    except requests.RequestException as e:
-        logger.error(f"Error in sending SMS: {e}")
-        return f"FAILED: {e}"
-    except ValueError as e:
-        logger.error(f"Error parsing response: {e}")
-        return f"FAILED: {e}"
+    # same pooled client (keep-alive + circuit breaker) as apps.core.sms;
+    # the gateway wants 8801XXXXXXXXX whatever format the account was saved with
+    return get_sms_client().send(gateway_number(phone_number) or phone_number, message, api_token, sender_id)[0]
 
 
 
@@ -13,6 +13,7 @@
 from web_project import TemplateLayout
 from web_project.template_helpers.theme import TemplateHelper
 from apps.guests.services import ensure_guest_profile
+from apps.core.phone import gateway_number, phone_q, storage_number, to_e164
 
 from django.views import View
 
@@ -56,18 +57,24 @@ def get_context_data(self, **kwargs):
         return context
 
     def post(self, request, *args, **kwargs):
-        phone = request.POST.get('phone_number')
+        raw_phone = request.POST.get('phone_number')
 
         if request.user.is_authenticated:
             return redirect('index')
 
+        # any format ("+8801…", "8801…", "01…") resolves to the same account
+        phone = to_e164(raw_phone)
+        if not phone:
+            messages.error(request, "Please enter a valid phone number.")
+            return redirect('guest_register')
+
         # 1. If active user exists
-        if User.objects.filter(phone_number=phone, is_active=True).exists():
+        if User.objects.filter(phone_e164=phone, is_active=True).exists():
             messages.error(request, "A user with this phone number already exists.")
             return redirect('guest_register')
 
         # 2. If inactive user exists, resend OTP (with cooldown)
-        user_qs = User.objects.filter(phone_number=phone, is_active=False)
+        user_qs = User.objects.filter(phone_e164=phone, is_active=False)
         if user_qs.exists():
             user = user_qs.first()
             if not self.can_send_otp(user):
@@ -96,7 +103,7 @@ def post(self, request, *args, **kwargs):
         password = generate_password()
 
         temp_user = User(
-            phone_number=phone,
+            phone_number=storage_number(raw_phone),
             role='guest',
             is_active=False,
             otp_code=otp,
@@ -108,7 +115,7 @@ def post(self, request, *args, **kwargs):
 
         if status == "SENT":
             user = User.objects.create(
-                phone_number=phone,
+                phone_number=storage_number(raw_phone),
                 role='guest',
                 is_active=False,
                 otp_code=otp,
@@ -134,19 +141,8 @@ def can_send_otp(self, user):
 
 
 def normalize_phone_number(phone_number):
-    # Strip spaces, hyphens, parentheses, or any other non-numeric characters
-    phone_number = ''.join(c for c in phone_number if c.isdigit())
-
-    # If phone number starts with 0, prepend the country code (880 for Bangladesh)
-    if phone_number.startswith('0'):
-        phone_number = '880' + phone_number[1:]  # Replace the leading 0 with country code
-
-    # If the number already includes the country code, return it as it is
-    elif not phone_number.startswith('880'):
-        # If it's not starting with '880', we assume it's a wrong number or format.
-        return None  # This handles invalid phone number formats
-
-    return phone_number
+    # 8801XXXXXXXXX for any accepted format, else None (see apps.core.phone)
+    return gateway_number(phone_number)
 
 
 class GuestOtpVerifyView(TemplateView):
@@ -168,9 +164,8 @@ def post(self, request, *args, **kwargs):
 
         otp = request.POST.get('otp', '').strip()
 
-        try:
-            user = User.objects.get(phone_number=phone)
-        except User.DoesNotExist:
+        user = User.objects.filter(phone_q(phone)).first()
+        if user is None:
             messages.error(request, "User not found. Please login again.")
             return redirect('login')
 
@@ -219,9 +214,9 @@ def get_context_data(self, **kwargs):
     def post(self, request, *args, **kwargs):
         phone = request.POST.get('phone_number')
         password = request.POST.get('password')
-        normalized_phone = normalize_phone_number(phone)
-
-        user = authenticate(request, phone_number=normalized_phone, password=password)
+        # authenticate against the number as the account stored it, whatever format was typed
+        account = User.objects.filter(phone_q(phone)).only("phone_number").first()
+        user = authenticate(request, phone_number=account.phone_number if account else phone, password=password)
 
         if user is not None:
             if not user.is_active:
@@ -269,9 +264,8 @@ def post(self, request, *args, **kwargs):
             messages.error(request, "ফোন নম্বর সঠিক নয়। দয়া করে সঠিক নম্বর দিন (যেমন: 01XXXXXXXXX)।")
             return redirect('guest_forgot_password')
 
-        try:
-            user = User.objects.get(phone_number=normalized_phone, is_active=True, role='guest')
-        except User.DoesNotExist:
+        user = User.objects.filter(phone_q(normalized_phone), is_active=True, role='guest').first()
+        if user is None:
             messages.error(request, "এই ফোন নম্বর দিয়ে কোন ব্যবহারকারী পাওয়া যায়নি।")
             return redirect('guest_forgot_password')
 
@@ -314,10 +308,7 @@ def get_user_from_session(self, request):
         phone = request.session.get('reset_phone')
         if not phone:
             return None
-        try:
-            return User.objects.get(phone_number=phone, is_active=True, role='guest')
-        except User.DoesNotExist:
-            return None
+        return User.objects.filter(phone_q(phone), is_active=True, role='guest').first()
 
     def get(self, request, *args, **kwargs):
         user = self.get_user_from_session(request)
@@ -2,20 +2,25 @@
 from django.views.generic import ListView, View
 from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
 from django.db.models import Q
 from web_project import TemplateLayout, TemplateHelper
 
 from apps.core.guards import RequireAnyRoleMixin
 from apps.core.roles import ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN
+from apps.core.export_jobs import TabularExport, export_or_enqueue
+from apps.core.exports import queryset_rows
+from apps.core.pagination import KeysetPaginationMixin
 from ..core.models import SmsLog
-import csv
 
 ALLOWED_ROLES = (ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN)
 
 from django.utils.dateparse import parse_date
 
 def _filter_sms_queryset(request):
+    return _filter_sms_params(request.GET)
+
+
+def _filter_sms_params(params):
     """
     Shared filter for list + CSV.
     Query params:
@@ -25,10 +30,10 @@ def _filter_sms_queryset(request):
       to      : created_at <= date
     """
     qs = SmsLog.objects.order_by("-created_at")
-    q = (request.GET.get("q") or "").strip()
-    status = (request.GET.get("status") or "").strip()
-    from_date = parse_date(request.GET.get("from") or "")
-    to_date   = parse_date(request.GET.get("to") or "")
+    q = (params.get("q") or "").strip()
+    status = (params.get("status") or "").strip()
+    from_date = parse_date(params.get("from") or "")
+    to_date   = parse_date(params.get("to") or "")
 
     if q:
         qs = qs.filter(
@@ -47,11 +52,12 @@ def _filter_sms_queryset(request):
     return qs
 
 @method_decorator(login_required, name="dispatch")
-class SmsLogListPage(RequireAnyRoleMixin, ListView):
+class SmsLogListPage(RequireAnyRoleMixin, KeysetPaginationMixin, ListView):
     model = SmsLog
     template_name = "core/sms_log_list.html"
     context_object_name = "logs"
     paginate_by = 50
+    keyset_ordering = ("-created_at", "-id")
     allowed_roles = ALLOWED_ROLES
 
     def get_queryset(self):
@@ -61,15 +67,12 @@ def get_context_data(self, **kwargs):
         # initialize base ctx via TemplateLayout (so layout bits exist)
         ctx = TemplateLayout.init(self, super().get_context_data(**kwargs))
 
-        params = self.request.GET.copy()
-        params.pop("page", None)
-
         ctx.update({
             "layout_path": TemplateHelper.set_layout("layout_vertical.html", ctx),
             "page_title": "SMS Logs",
             "q": self.request.GET.get("q", ""),
             "status": self.request.GET.get("status", ""),
-            "preserved_qs": params.urlencode(),
+            "preserved_qs": self.preserved_querystring(),
             "from_date": self.request.GET.get("from", ""),
             "to_date": self.request.GET.get("to", ""),
         })
@@ -104,29 +107,32 @@ def get_context_data(self, **kwargs):
 @method_decorator(login_required, name="dispatch")
 class SmsLogExportCSVView(RequireAnyRoleMixin, View):
     """
-    Export filtered logs as CSV (no pagination).
+    Export filtered logs as CSV, or XLSX with ?format=xlsx (streamed, no pagination).
     Avoid MRO issue by NOT inheriting SmsLogListPage.
     """
     allowed_roles = ALLOWED_ROLES
 
     def get(self, request, *args, **kwargs):
-        qs = _filter_sms_queryset(request)
-
-        resp = HttpResponse(content_type="text/csv; charset=utf-8")
-        resp["Content-Disposition"] = 'attachment; filename="sms_logs.csv"'
-        resp.write("\ufeff")  # Excel-friendly BOM
-
-        w = csv.writer(resp)
-        w.writerow(["ID", "To", "Context", "Result", "Body", "Provider", "Booking ID", "Created At"])
-        for r in qs:
-            w.writerow([
-                r.id,
-                r.to or "",
-                r.context or "",
-                r.result or "",
-                (r.body or "").replace("\r", " ").replace("\n", " "),
-                getattr(r, "provider", "") or "",
-                getattr(r, "booking_id", "") or "",
-                r.created_at.strftime("%Y-%m-%d %H:%M:%S") if getattr(r, "created_at", None) else "",
-            ])
-        return resp
+        # queued for the export worker above EXPORT_BACKGROUND_THRESHOLD rows
+        return export_or_enqueue(request, "sms_logs", sms_log_export(request.GET))
+
+
+def sms_log_export(params) -> TabularExport:
+    qs = _filter_sms_params(params)
+    fields = ("id", "to", "context", "result", "body", "provider", "booking_id", "created_at")
+
+    def rows():
+        for rid, to, context, result, body, provider, booking_id, created in queryset_rows(qs, fields):
+            yield [
+                rid,
+                to or "",
+                context or "",
+                result or "",
+                (body or "").replace("\r", " ").replace("\n", " "),
+                provider or "",
+                booking_id or "",
+                created.strftime("%Y-%m-%d %H:%M:%S") if created else "",
+            ]
+
+    header = ["ID", "To", "Context", "Result", "Body", "Provider", "Booking ID", "Created At"]
+    return TabularExport("sms_logs", header, rows, qs.count, title="SMS Logs")
@@ -1,5 +1,20 @@
-from django.contrib import admin
-from .models import Booking, Payment
+from datetime import datetime
+
+from django import forms
+from django.contrib import admin, messages
+from django.http import HttpResponse
+from django.shortcuts import redirect, render
+from django.urls import path, reverse
+
+from .importer import BookingImporter, read_rows, send_import_summary
+from .invoice_batch import enqueue_invoices
+from .models import Booking, Payment, RoomNight
+
+
+class BookingImportForm(forms.Form):
+    file = forms.FileField(help_text="CSV or XLSX with phone_number, full_name, room_number, check_in, check_out, …")
+    dry_run = forms.BooleanField(required=False, help_text="Validate only, write nothing.")
+    summary_sms = forms.CharField(required=False, max_length=20, help_text="Optional: one summary SMS to this number.")
 
 class PaymentInline(admin.TabularInline):
     model = Payment
@@ -31,6 +46,59 @@ class BookingAdmin(admin.ModelAdmin):
     )
     raw_id_fields = ("guest", "room", "created_by")
     inlines = [PaymentInline]
+    change_list_template = "admin/bookings/booking/change_list.html"
+    actions = ["render_invoices"]
+
+    # ---- batch invoices ----
+    @admin.action(description="Render invoices (zip of PDFs, in the background)")
+    def render_invoices(self, request, queryset):
+        # rendered by the export worker: a request must not fork a process pool
+        job = enqueue_invoices(queryset, request.user, fmt="zip")
+        self.message_user(request, f"Rendering {job.rows_total} invoices in the background.", messages.SUCCESS)
+        return redirect(f"{reverse('core:export_jobs')}?job={job.pk}")
+
+    # ---- bulk import ----
+    def get_urls(self):
+        custom = [
+            path("import/", self.admin_site.admin_view(self.import_view), name="bookings_booking_import"),
+        ]
+        return custom + super().get_urls()
+
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            return redirect("admin:bookings_booking_changelist")
+
+        form = BookingImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            upload = form.cleaned_data["file"]
+            importer = BookingImporter(dry_run=form.cleaned_data["dry_run"], created_by=request.user)
+            try:
+                result = importer.run(read_rows(upload.file, upload.name))
+            except ValueError as e:
+                messages.error(request, str(e))
+            else:
+                level = messages.SUCCESS if not result.errors else messages.WARNING
+                self.message_user(request, result.summary(), level)
+                if form.cleaned_data["summary_sms"] and not result.dry_run:
+                    send_import_summary(result, form.cleaned_data["summary_sms"])
+                if result.errors:
+                    # guest names and phones: hand the file back, never park it under MEDIA_ROOT
+                    self.message_user(request, "Failed rows are in the downloaded CSV.", messages.WARNING)
+                    response = HttpResponse(content_type="text/csv; charset=utf-8")
+                    response["Content-Disposition"] = (
+                        f'attachment; filename="booking_errors_{datetime.now():%Y%m%d_%H%M%S}.csv"'
+                    )
+                    result.write_errors(response)
+                    return response
+                return redirect("admin:bookings_booking_changelist")
+
+        ctx = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "form": form,
+            "title": "Import bookings",
+        }
+        return render(request, "admin/bookings/booking/import.html", ctx)
 
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
@@ -40,3 +108,12 @@ class PaymentAdmin(admin.ModelAdmin):
     autocomplete_fields = ("booking", "created_by")
     date_hierarchy = "received_at"
     ordering = ("-received_at", "-id")
+
+@admin.register(RoomNight)
+class RoomNightAdmin(admin.ModelAdmin):
+    list_display = ("id", "date", "room", "booking", "status", "rate")
+    list_filter  = ("status", "date")
+    search_fields = ("booking__id", "room__room_number")
+    raw_id_fields = ("room", "booking")
+    date_hierarchy = "date"
+    ordering = ("-date", "room_id")
@@ -0,0 +1,414 @@
+# apps/bookings/importer.py
+"""
+Bulk booking import (CSV / XLSX) for group & tour reservations.
+
+Rows are streamed and handled in batches. Per batch: rooms come from one
+in-memory map, guests are resolved by phone_number in one query, overlaps
+are found with a sorted interval sweep per room (same rule as
+Booking.clean: any existing booking of that room, half-open dates), and the
+survivors are written with bulk_create inside one transaction.
+
+bulk_create skips model signals, so no per-row SMS is sent; RoomNight rows,
+the finance rollup, the occupancy index, the guest search index and the API
+data versions are refreshed explicitly instead.
+"""
+import csv
+import io
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+
+from apps.guests.models import Guest
+from apps.guests.search import index_guests
+from apps.room.models import Room
+from apps.core.models import SmsLog
+from apps.core.outbox import enqueue_sms
+from apps.core.phone import storage_number, to_e164
+from apps.core.sms import normalize_bd_mobile
+from apps.core.versioning import bump
+from apps.finances.rollup import mark_dirty
+
+from .models import Booking
+from .occupancy import occupancy_index
+from .room_nights import rebuild_room_nights
+
+# header (lower-cased, spaces -> "_") -> field
+COLUMN_ALIASES = {
+    "phone": "phone_number", "mobile": "phone_number", "phone_number": "phone_number",
+    "name": "full_name", "guest": "full_name", "guest_name": "full_name", "full_name": "full_name",
+    "room": "room_number", "room_no": "room_number", "room_number": "room_number",
+    "check_in": "check_in", "checkin": "check_in", "arrival": "check_in",
+    "check_out": "check_out", "checkout": "check_out", "departure": "check_out",
+    "status": "status",
+    "rate": "nightly_rate", "nightly_rate": "nightly_rate",
+    "discount": "discount_amount", "discount_amount": "discount_amount",
+    "extra": "extra_amount", "extra_amount": "extra_amount",
+    "notes": "notes", "note": "notes",
+}
+REQUIRED = ("phone_number", "room_number", "check_in", "check_out")
+
+_STATUS_LOOKUP = {
+    **{v.lower(): v for v in Booking.Status.values},
+    **{label.lower(): v for v, label in Booking.Status.choices},
+}
+
+
+def normalize_phone(raw) -> str:
+    """Same storage format as GuestCreateForm."""
+    return storage_number(raw)
+
+
+# ---------- reading ----------
+def read_rows(fileobj, filename: str = ""):
+    """Yield (line_no, {header: value}) from a CSV or XLSX file object."""
+    if str(filename).lower().endswith((".xlsx", ".xlsm")):
+        yield from _read_xlsx(fileobj)
+    else:
+        yield from _read_csv(fileobj)
+
+
+def _read_csv(fileobj):
+    if isinstance(fileobj, io.TextIOBase):
+        text = fileobj
+    else:
+        text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    for line_no, row in enumerate(reader, start=2):
+        yield line_no, row
+
+
+def _read_xlsx(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:  # optional dependency
+        raise ValueError("XLSX import needs openpyxl (pip install openpyxl).") from e
+
+    wb = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        headers = [str(h or "").strip() for h in next(rows, [])]
+        for line_no, values in enumerate(rows, start=2):
+            if not any(v not in (None, "") for v in values):
+                continue
+            yield line_no, dict(zip(headers, values))
+    finally:
+        wb.close()
+
+
+# ---------- parsing ----------
+def _canon(row: dict) -> dict:
+    out = {}
+    for k, v in row.items():
+        key = COLUMN_ALIASES.get(str(k or "").strip().lower().replace(" ", "_").replace("-", "_"))
+        if key:
+            out[key] = v.strip() if isinstance(v, str) else v
+    return out
+
+
+def _to_date(v, label):
+    if isinstance(v, datetime):
+        return v.date()
+    if isinstance(v, date):
+        return v
+    d = parse_date(str(v or "").strip()[:10])
+    if not d:
+        raise ValueError(f"{label}: expected YYYY-MM-DD, got '{v}'.")
+    return d
+
+
+def _to_int(v, label, default=0):
+    if v in (None, ""):
+        return default
+    try:
+        n = int(float(str(v).replace(",", "")))
+    except ValueError:
+        raise ValueError(f"{label}: '{v}' is not a number.")
+    if n < 0:
+        raise ValueError(f"{label}: must not be negative.")
+    return n
+
+
+def parse_row(raw: dict, default_status=Booking.Status.RESERVED) -> dict:
+    data = _canon(raw)
+    missing = [f for f in REQUIRED if not data.get(f)]
+    if missing:
+        raise ValueError(f"Missing {', '.join(missing)}.")
+
+    phone = normalize_phone(data["phone_number"])
+    if len(phone) < 12:
+        raise ValueError(f"phone_number: '{data['phone_number']}' is not a valid number.")
+
+    cin = _to_date(data["check_in"], "check_in")
+    cout = _to_date(data["check_out"], "check_out")
+    if cout <= cin:
+        raise ValueError("Check-out must be later than check-in (minimum 1 night).")
+
+    status = default_status
+    if data.get("status"):
+        status = _STATUS_LOOKUP.get(str(data["status"]).strip().lower())
+        if not status:
+            raise ValueError(f"status: unknown value '{data['status']}'.")
+
+    return {
+        "phone_number": phone,
+        "full_name": str(data.get("full_name") or "").strip(),
+        "room_number": str(data["room_number"]).strip(),
+        "check_in": cin,
+        "check_out": cout,
+        "status": status,
+        "nightly_rate": _to_int(data.get("nightly_rate"), "nightly_rate", default=None),
+        "discount_amount": _to_int(data.get("discount_amount"), "discount_amount"),
+        "extra_amount": _to_int(data.get("extra_amount"), "extra_amount"),
+        "notes": str(data.get("notes") or "").strip() or None,
+    }
+
+
+# ---------- overlap sweep ----------
+def find_overlaps(existing, candidates) -> set:
+    """
+    existing:   [(check_in, check_out)] already booked for one room
+    candidates: [(check_in, check_out, key)] rows to insert for that room
+    Returns the keys that overlap an existing booking or an earlier
+    accepted candidate (half-open ranges, sorted sweep).
+    """
+    existing = sorted(existing)
+    starts = [ci for ci, _ in existing]
+    max_end, m = [], None
+    for _, co in existing:
+        m = co if m is None or co > m else m
+        max_end.append(m)
+
+    bad, accepted_end = set(), None
+    for ci, co, key in sorted(candidates, key=lambda c: (c[0], c[1])):
+        i = bisect_left(starts, co)          # existing bookings starting before our check-out
+        if i and max_end[i - 1] > ci:
+            bad.add(key)
+            continue
+        if accepted_end is not None and accepted_end > ci:
+            bad.add(key)
+            continue
+        accepted_end = co if accepted_end is None else max(accepted_end, co)
+    return bad
+
+
+# ---------- result ----------
+@dataclass
+class ImportResult:
+    rows: int = 0
+    created: int = 0
+    guests_created: int = 0
+    errors: list = field(default_factory=list)   # [(line_no, raw_row, message)]
+    seconds: float = 0.0
+    dry_run: bool = False
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        verb = "would be created" if self.dry_run else "created"
+        return (
+            f"{self.rows} rows: {self.created} bookings {verb}, "
+            f"{self.guests_created} new guests, {len(self.errors)} errors "
+            f"in {self.seconds:.2f}s ({self.rows_per_second:.0f} rows/s)"
+        )
+
+    def write_errors(self, fh):
+        """CSV: line, error, then the original columns of the failed row."""
+        headers = []
+        for _, raw, _ in self.errors:
+            for k in raw:
+                if k not in headers:
+                    headers.append(k)
+        w = csv.writer(fh)
+        w.writerow(["line", "error", *headers])
+        for line_no, raw, msg in sorted(self.errors, key=lambda e: e[0]):
+            w.writerow([line_no, msg, *[raw.get(h, "") for h in headers]])
+
+
+# ---------- importer ----------
+class BookingImporter:
+    def __init__(self, batch_size=500, dry_run=False, created_by=None,
+                 default_status=Booking.Status.RESERVED):
+        self.batch_size = max(1, int(batch_size))
+        self.dry_run = dry_run
+        self.created_by = created_by
+        self.default_status = default_status
+        self._rooms = None
+        self._accepted = defaultdict(list)   # room_id -> [(ci, co)] written by this run
+
+    def run(self, rows) -> ImportResult:
+        result = ImportResult(dry_run=self.dry_run)
+        t0 = time.perf_counter()
+        batch = []
+        for line_no, raw in rows:
+            result.rows += 1
+            batch.append((line_no, raw))
+            if len(batch) >= self.batch_size:
+                self._process(batch, result)
+                batch = []
+        if batch:
+            self._process(batch, result)
+        result.seconds = time.perf_counter() - t0
+        return result
+
+    def _room_map(self):
+        if self._rooms is None:
+            self._rooms = {
+                str(num).strip(): (rid, int(price or 0))
+                for rid, num, price in Room.objects.values_list("id", "room_number", "price")
+            }
+        return self._rooms
+
+    def _process(self, batch, result: ImportResult):
+        rooms = self._room_map()
+        parsed = []
+        for line_no, raw in batch:
+            try:
+                data = parse_row(raw, self.default_status)
+            except ValueError as e:
+                result.errors.append((line_no, raw, str(e)))
+                continue
+            room = rooms.get(data["room_number"])
+            if room is None:
+                result.errors.append((line_no, raw, f"Unknown room '{data['room_number']}'."))
+                continue
+            data["room_id"], data["room_price"] = room
+            parsed.append((line_no, raw, data))
+        if not parsed:
+            return
+
+        # guests: one lookup for the whole batch
+        # (by canonical phone too, so guests stored in an older format still match)
+        phones = {d["phone_number"] for _, _, d in parsed}
+        canonical = {e: p for p in phones if (e := to_e164(p))}
+        guest_ids = {}
+        for number, e164, gid in (
+            Guest.objects
+            .filter(Q(phone_number__in=phones) | Q(phone_e164__in=list(canonical)))
+            .values_list("phone_number", "phone_e164", "id")
+        ):
+            if number in phones:
+                guest_ids[number] = gid
+            elif e164 in canonical:
+                guest_ids.setdefault(canonical[e164], gid)
+        new_names = {}
+        ok = []
+        for line_no, raw, d in parsed:
+            p = d["phone_number"]
+            if p not in guest_ids and p not in new_names:
+                if not d["full_name"]:
+                    result.errors.append((line_no, raw, f"Guest {p} not found and no full_name given."))
+                    continue
+                new_names[p] = d["full_name"]
+            ok.append((line_no, raw, d))
+
+        # overlaps: one query for the batch window, then a sweep per room
+        by_room = defaultdict(list)
+        for idx, (_, _, d) in enumerate(ok):
+            by_room[d["room_id"]].append((d["check_in"], d["check_out"], idx))
+        lo = min(d["check_in"] for _, _, d in ok)
+        hi = max(d["check_out"] for _, _, d in ok)
+        existing = defaultdict(list)
+        for room_id, ci, co in (
+            Booking.objects
+            .filter(room_id__in=list(by_room), check_in__lt=hi, check_out__gt=lo)
+            .values_list("room_id", "check_in", "check_out")
+        ):
+            existing[room_id].append((ci, co))
+        for room_id, spans in self._accepted.items():
+            if room_id in by_room:
+                existing[room_id].extend(spans)
+
+        bad = set()
+        for room_id, candidates in by_room.items():
+            bad |= find_overlaps(existing.get(room_id, []), candidates)
+
+        accepted = []
+        for idx, (line_no, raw, d) in enumerate(ok):
+            if idx in bad:
+                result.errors.append((
+                    line_no, raw,
+                    f"Room {d['room_number']} is not available for {d['check_in']} → {d['check_out']}.",
+                ))
+            else:
+                accepted.append(d)
+        if not accepted:
+            return
+
+        for d in accepted:
+            self._accepted[d["room_id"]].append((d["check_in"], d["check_out"]))
+
+        needed = {d["phone_number"] for d in accepted}
+        new_names = {p: n for p, n in new_names.items() if p in needed}
+        if self.dry_run:
+            result.created += len(accepted)
+            result.guests_created += len(new_names)
+            return
+
+        with transaction.atomic():
+            if new_names:
+                Guest.objects.bulk_create(
+                    [
+                        Guest(phone_number=p, phone_e164=to_e164(p) or "", full_name=n, created_by=self.created_by)
+                        for p, n in new_names.items()
+                    ],
+                    ignore_conflicts=True,
+                )
+                created = list(Guest.objects.filter(phone_number__in=list(new_names)))
+                guest_ids.update((g.phone_number, g.id) for g in created)
+                index_guests(created)
+            bookings = Booking.objects.bulk_create(
+                [self._booking(d, guest_ids[d["phone_number"]]) for d in accepted],
+                batch_size=self.batch_size,
+            )
+            rebuild_room_nights(bookings, batch_size=self.batch_size)
+            mark_dirty(*{b.check_in for b in bookings}, *{b.created_at for b in bookings})
+            transaction.on_commit(occupancy_index.invalidate)
+            bump("bookings", "guests")
+
+        result.created += len(bookings)
+        result.guests_created += len(new_names)
+
+    def _booking(self, d, guest_id) -> Booking:
+        # same arithmetic as Booking.clean(); imported bookings start unpaid
+        rate = d["nightly_rate"] if d["nightly_rate"] is not None else d["room_price"]
+        nights = (d["check_out"] - d["check_in"]).days
+        gross = rate * nights + d["extra_amount"]
+        net = max(0, gross - d["discount_amount"])
+        return Booking(
+            guest_id=guest_id,
+            room_id=d["room_id"],
+            check_in=d["check_in"],
+            check_out=d["check_out"],
+            nights=nights,
+            nightly_rate=rate,
+            extra_amount=d["extra_amount"],
+            gross_amount=gross,
+            discount_amount=d["discount_amount"],
+            net_amount=net,
+            payment_amount=0,
+            due_amount=net,
+            status=d["status"],
+            notes=d["notes"],
+            created_by=self.created_by,
+        )
+
+
+def send_import_summary(result: ImportResult, phone: str) -> str:
+    """One SMS for the whole import instead of one per booking."""
+    to = normalize_bd_mobile(phone)
+    if not to:
+        return "FAILED: invalid phone"
+    body = (
+        f"Booking import: {result.created} created, {len(result.errors)} failed "
+        f"of {result.rows} rows."
+    )
+    enqueue_sms(to, body, context=SmsLog.Kind.IMPORT)
+    return "QUEUED"
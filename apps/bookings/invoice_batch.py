@@ -0,0 +1,239 @@
+# apps/bookings/invoice_batch.py
+"""
+Batch invoice rendering (month-end runs): `manage.py render_invoices` and
+the "Render invoices" admin action, which queues an "invoices" export job
+so the pool is forked by the export worker, never from a request thread.
+
+xhtml2pdf is pure Python and CPU-bound, so documents are rendered in a
+process pool. The parent reads bookings in chunks with guest, room and
+payments loaded in bulk (three queries per chunk) and hands the workers
+fully built contexts; workers never touch the database. Each worker sets
+up xhtml2pdf/reportlab fonts, the template loaders and the static file
+finders used by link_callback once, in its initializer.
+
+Documents go through the PDF cache (apps.core.pdf), so a re-run only
+renders what changed since the last one and the invoice pages serve the
+same files afterwards. Output is a zip (one PDF per document) or a single
+merged PDF.
+"""
+import logging
+import multiprocessing
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import QueryDict
+
+from apps.core import pdf
+from apps.core.export_jobs import FileExport, enqueue
+from apps.site_settings.cache import get_site_settings
+
+from . import invoices
+from .models import Booking, Payment
+
+logger = logging.getLogger(__name__)
+
+INVOICE_BATCH_WORKERS = getattr(settings, "INVOICE_BATCH_WORKERS", 0)  # 0 = one per CPU
+INVOICE_BATCH_CHUNK = getattr(settings, "INVOICE_BATCH_CHUNK", 200)
+
+
+@dataclass
+class BatchResult:
+    documents: int = 0
+    pages: int = 0
+    rendered: int = 0      # cache misses
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def pages_per_second(self):
+        return self.pages / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.documents} documents, {self.pages} pages in {self.seconds:.1f}s "
+            f"({self.pages_per_second:.1f} pages/s; {self.rendered} rendered, "
+            f"{self.documents - self.rendered - self.failed} from cache, {self.failed} failed)"
+        )
+
+
+# ---------- selection ----------
+def select_bookings(date_from=None, date_to=None, status=None):
+    """Bookings by check-out date range and status (None = any)."""
+    qs = Booking.objects.all()
+    if date_from:
+        qs = qs.filter(check_out__gte=date_from)
+    if date_to:
+        qs = qs.filter(check_out__lte=date_to)
+    if status:
+        qs = qs.filter(status=status)
+    return qs
+
+
+def _chunks(bookings, size):
+    """Bookings with guest, room, category and payments loaded, `size` at a time."""
+    ids = list(bookings.order_by("check_out", "id").values_list("id", flat=True))
+    for i in range(0, len(ids), size):
+        batch = (
+            Booking.objects.filter(id__in=ids[i:i + size])
+            .select_related("guest", "room", "room__category")
+            .prefetch_related(Prefetch("payments", queryset=Payment.objects.order_by("-received_at", "-id")))
+        )
+        by_id = {b.id: b for b in batch}
+        yield [by_id[pk] for pk in ids[i:i + size] if pk in by_id]
+
+
+def _documents(bookings, receipts, site_settings):
+    """(file name, template, context, cache key) per document, in output order."""
+    for chunk in _chunks(bookings, INVOICE_BATCH_CHUNK):
+        for booking in chunk:
+            yield (
+                f"booking_{booking.pk}.pdf",
+                invoices.SUMMARY_PDF_TEMPLATE,
+                invoices.summary_context(booking, site_settings),
+                invoices.summary_key(booking, site_settings),
+            )
+            if receipts:
+                for payment in reversed(booking.payments.all()):
+                    payment.booking = booking   # already loaded: no query, smaller pickle
+                    yield (
+                        f"booking_{booking.pk}_payment_{payment.pk}.pdf",
+                        invoices.PAYMENT_PDF_TEMPLATE,
+                        invoices.payment_context(payment, site_settings),
+                        invoices.payment_key(payment, site_settings),
+                    )
+
+
+# ---------- worker ----------
+def _init_worker():
+    """Once per process: fonts, template loaders and static finders."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:     # spawn start method: fresh interpreter
+        django.setup()
+    from django.template.loader import get_template
+
+    for name in (invoices.SUMMARY_PDF_TEMPLATE, invoices.PAYMENT_PDF_TEMPLATE):
+        get_template(name)
+    pdf.link_callback(settings.STATIC_URL, None)
+    pdf.render_pdf_bytes("bookings/_receipt_pdf_hotel.html", {})  # loads xhtml2pdf + reportlab fonts
+
+
+def _render(document):
+    """Worker task: (name, path or None, pages, rendered?)."""
+    from pypdf import PdfReader
+
+    name, template, context, key = document
+    digest = pdf.cache_key(template, key)
+    path = pdf.cached_path(digest)
+    rendered = path is None
+    if rendered:
+        data = pdf.render_pdf_bytes(template, context)
+        if data is None:
+            return name, None, 0, True
+        path = pdf.store(digest, data, evict_after=False)   # the parent evicts once at the end
+    return name, str(path), len(PdfReader(path).pages), rendered
+
+
+# ---------- runner ----------
+def _bounded_map(pool, items, in_flight):
+    """pool.map in input order, but only `in_flight` tasks queued at a time
+    (Executor.map submits everything up front, i.e. reads every booking first)."""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(_render, item))
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def render_batch(bookings, out, fmt="zip", receipts=False, workers=None, progress=None) -> BatchResult:
+    """
+    Render the bookings' invoices into `out` (a path or binary file object):
+    fmt "zip" = one PDF per document, "pdf" = one merged PDF. With receipts,
+    every payment's receipt follows its booking's summary. workers=1 renders
+    in this process.
+    """
+    from pypdf import PdfWriter
+
+    workers = workers or INVOICE_BATCH_WORKERS or os.cpu_count() or 1
+    documents = _documents(bookings, receipts, get_site_settings())
+    result = BatchResult()
+    t0 = time.perf_counter()
+
+    if workers == 1:
+        _init_worker()
+        results = map(_render, documents)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("fork" if os.name == "posix" else "spawn"),
+            initializer=_init_worker,
+        )
+        results = _bounded_map(pool, documents, in_flight=workers * 4)
+
+    merged = PdfWriter() if fmt == "pdf" else None
+    archive = zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) if fmt == "zip" else None
+    try:
+        for name, path, pages, rendered in results:
+            result.documents += 1
+            result.rendered += rendered
+            if path is None:
+                result.failed += 1
+                logger.warning("Invoice %s failed to render", name)
+                continue
+            result.pages += pages
+            if archive is not None:
+                archive.write(path, name)      # PDFs are already compressed
+            else:
+                merged.append(path)
+            if progress:
+                progress(result)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if archive is not None:
+            archive.close()
+
+    if merged is not None:
+        merged.write(out)
+    pdf.evict()
+    result.seconds = time.perf_counter() - t0
+    return result
+
+
+# ---------- background job (apps.core.export_jobs) ----------
+def enqueue_invoices(bookings, user, fmt="zip", receipts=False):
+    """Queue a render of `bookings` for the export worker; returns the ExportJob."""
+    params = QueryDict(mutable=True)
+    params.setlist("id", [str(pk) for pk in bookings.order_by().values_list("id", flat=True)])
+    params["format"] = fmt
+    if receipts:
+        params["receipts"] = "1"
+    return enqueue("invoices", params, user, total=len(params.getlist("id")))
+
+
+def invoice_export(params) -> FileExport:
+    """Export-job builder for enqueue_invoices(); progress counts documents."""
+    bookings = Booking.objects.filter(id__in=[int(pk) for pk in params.getlist("id")])
+    fmt = "pdf" if params.get("format") == "pdf" else "zip"
+    receipts = params.get("receipts") == "1"
+
+    def write(fh, progress):
+        result = render_batch(bookings, fh, fmt=fmt, receipts=receipts, progress=lambda r: progress(r.documents))
+        progress(result.documents)
+        logger.info("Invoice export: %s", result.summary())
+
+    def count():
+        n = bookings.count()
+        return (n + Payment.objects.filter(booking__in=bookings).count()) if receipts else n
+
+    return FileExport(f"invoices.{fmt}", write, count)
@@ -0,0 +1,99 @@
+# apps/bookings/invoices.py
+"""
+Invoice PDFs: context and cache key for a booking summary or a single
+payment receipt, rendered through apps.core.pdf.
+
+Keys are built from objects already loaded (booking with guest, room and
+prefetched payments), so a cache hit costs no query beyond loading the
+booking itself. Any save of the booking, its guest, room, payments or the
+site settings, or a rename of the room category, changes the key.
+"""
+from apps.core import pdf
+from apps.site_settings.cache import get_site_settings
+
+SUMMARY_PDF_TEMPLATE = "bookings/invoice_summary_pdf.html"
+PAYMENT_PDF_TEMPLATE = "payments/payment_invoice_pdf.html"
+
+
+def _stamp(obj):
+    at = getattr(obj, "updated_at", None)
+    return at.isoformat() if at else None
+
+
+def _booking_key(booking) -> tuple:
+    return (
+        booking.pk, _stamp(booking),
+        booking.guest_id, _stamp(booking.guest),
+        booking.room_id, _stamp(booking.room), _category_key(booking.room.category),
+    )
+
+
+def _category_key(category) -> tuple:
+    # Category has no updated_at: key on what the invoice prints
+    return (category.pk, category.name) if category else (None, None)
+
+
+def _settings_key(site_settings) -> tuple:
+    return (getattr(site_settings, "pk", None), _stamp(site_settings))
+
+
+def _money(booking) -> dict:
+    return {
+        "rate": int(getattr(booking, "nightly_rate", 0) or 0),
+        "gross": int(getattr(booking, "gross_amount", 0) or 0),
+        "discount": int(getattr(booking, "discount_amount", 0) or 0),
+        "net": int(getattr(booking, "net_amount", 0) or 0),
+        "paid": int(getattr(booking, "payment_amount", 0) or 0),
+        "due": int(getattr(booking, "due_amount", 0) or 0),
+    }
+
+
+# ---------- booking summary ----------
+def summary_key(booking, site_settings=None) -> tuple:
+    """Needs booking.guest, booking.room and booking.payments loaded (select/prefetch)."""
+    payments = booking.payments.all()
+    return (
+        "booking_invoice",
+        _booking_key(booking),
+        [(p.pk, _stamp(p)) for p in payments],
+        _settings_key(site_settings or get_site_settings()),
+    )
+
+
+def summary_context(booking, site_settings=None) -> dict:
+    payments = list(booking.payments.all())   # Meta.ordering: newest first
+    return {
+        "site_settings": site_settings or get_site_settings(),
+        "booking": booking,
+        "guest": booking.guest,
+        "room": booking.room,
+        "last_payment": payments[0] if payments else None,
+        **_money(booking),
+    }
+
+
+def summary_pdf_path(booking, site_settings=None):
+    """Cached PDF file for the booking summary (rendered on a miss)."""
+    return pdf.cached_pdf(
+        SUMMARY_PDF_TEMPLATE,
+        lambda: summary_context(booking, site_settings),
+        summary_key(booking, site_settings),
+    )
+
+
+# ---------- payment receipt ----------
+def payment_key(payment, site_settings=None) -> tuple:
+    return (
+        "payment_invoice",
+        payment.pk, _stamp(payment),
+        _booking_key(payment.booking),
+        _settings_key(site_settings or get_site_settings()),
+    )
+
+
+def payment_context(payment, site_settings=None) -> dict:
+    return {
+        "site_settings": site_settings or get_site_settings(),
+        "payment": payment,
+        "booking": payment.booking,
+    }
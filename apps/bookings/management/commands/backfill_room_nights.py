@@ -0,0 +1,49 @@
+# apps/bookings/management/commands/backfill_room_nights.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.bookings.models import Booking, RoomNight
+from apps.bookings.room_nights import rebuild_room_nights
+
+
+class Command(BaseCommand):
+    help = "Rebuild the RoomNight fact table from existing bookings (safe to re-run)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--truncate", action="store_true", help="Delete all RoomNight rows first.")
+
+    def handle(self, *args, **opts):
+        t0 = time.perf_counter()
+        if opts["truncate"]:
+            RoomNight.objects.all().delete()
+
+        qs = (
+            Booking.objects
+            .only("id", "room_id", "check_in", "check_out", "status", "nightly_rate")
+            .order_by("id")
+        )
+        total_nights = 0
+        total_bookings = 0
+        batch = []
+        for b in qs.iterator(chunk_size=opts["batch_size"]):
+            batch.append(b)
+            if len(batch) >= opts["batch_size"]:
+                total_nights += self._write(batch, opts["batch_size"])
+                total_bookings += len(batch)
+                batch = []
+        if batch:
+            total_nights += self._write(batch, opts["batch_size"])
+            total_bookings += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled {total_nights} room nights for {total_bookings} bookings "
+            f"in {time.perf_counter() - t0:.1f}s."
+        ))
+
+    @staticmethod
+    def _write(batch, batch_size):
+        with transaction.atomic():
+            return rebuild_room_nights(batch, batch_size=batch_size)
@@ -0,0 +1,74 @@
+# apps/bookings/management/commands/check_occupancy_index.py
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.bookings.models import Booking
+from apps.bookings.occupancy import OccupancyIndex, HORIZON_DAYS
+from apps.room.models import Room
+
+
+class Command(BaseCommand):
+    help = (
+        "Consistency check for the in-memory occupancy index: compares a bulk-built "
+        "index with one replayed booking-by-booking through the signal path, then "
+        "spot-checks random (room, window) pairs against SQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=500, help="Random SQL spot checks.")
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts["seed"])
+
+        t0 = time.perf_counter()
+        bulk = OccupancyIndex()
+        bulk.rebuild()
+        build_ms = (time.perf_counter() - t0) * 1000
+        self.stdout.write(f"Bulk build: {len(bulk._bits)} busy rooms in {build_ms:.1f} ms (origin {bulk.origin})")
+
+        # replay every booking through the incremental path
+        replay = OccupancyIndex()
+        replay.rebuild()
+        replay._spans, replay._bits, replay._where = {}, {}, {}
+        for b in Booking.objects.only("id", "room_id", "check_in", "check_out", "status").iterator(chunk_size=2000):
+            replay._discard(b.pk)
+            if b.status != Booking.Status.CANCELLED:
+                replay._add(b.pk, b.room_id, b.check_in, b.check_out)
+
+        mismatched = [
+            rid for rid in set(bulk._bits) | set(replay._bits)
+            if bulk._bits.get(rid, 0) != replay._bits.get(rid, 0)
+        ]
+        for rid in mismatched[:20]:
+            self.stderr.write(f"  bitmap mismatch for room_id={rid}")
+
+        # random spot checks against SQL
+        room_ids = list(Room.objects.values_list("id", flat=True))
+        bad = 0
+        lookups = []
+        if room_ids and opts["samples"]:
+            for _ in range(opts["samples"]):
+                rid = rng.choice(room_ids)
+                cin = bulk.origin + timedelta(days=rng.randrange(HORIZON_DAYS - 1))
+                cout = min(cin + timedelta(days=rng.randint(1, 14)), bulk.origin + timedelta(days=HORIZON_DAYS))
+                t1 = time.perf_counter()
+                fast = bulk.is_available(rid, cin, cout)
+                lookups.append(time.perf_counter() - t1)
+                slow = not OccupancyIndex._sql(cin, cout).filter(room_id=rid).exists()
+                if fast != slow:
+                    bad += 1
+                    if bad <= 20:
+                        self.stderr.write(f"  room_id={rid} [{cin}, {cout}) index={fast} sql={slow}")
+
+        if lookups:
+            lookups.sort()
+            self.stdout.write(
+                f"{len(lookups)} spot checks, median lookup {lookups[len(lookups) // 2] * 1e6:.1f} µs"
+            )
+        if mismatched or bad:
+            raise CommandError(f"Occupancy index inconsistent: {len(mismatched)} bitmap mismatches, {bad} SQL mismatches.")
+        self.stdout.write(self.style.SUCCESS("Occupancy index is consistent."))
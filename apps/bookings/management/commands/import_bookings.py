@@ -0,0 +1,47 @@
+# apps/bookings/management/commands/import_bookings.py
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.bookings.importer import BookingImporter, read_rows, send_import_summary
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-import bookings from a CSV/XLSX file. Columns: phone_number, full_name, "
+        "room_number, check_in, check_out, [status, nightly_rate, discount_amount, "
+        "extra_amount, notes]. No per-booking SMS is sent."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or XLSX file")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true", help="Validate only, write nothing.")
+        parser.add_argument("--errors", default=None,
+                            help="Where to write failed rows (default: <file>.errors.csv).")
+        parser.add_argument("--summary-sms", default=None, metavar="PHONE",
+                            help="Send one summary SMS to this number when done.")
+
+    def handle(self, *args, **opts):
+        path = Path(opts["path"])
+        if not path.exists():
+            raise CommandError(f"File not found: {path}")
+
+        importer = BookingImporter(batch_size=opts["batch_size"], dry_run=opts["dry_run"])
+        try:
+            with path.open("rb") as fh:
+                result = importer.run(read_rows(fh, path.name))
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        style = self.style.SUCCESS if not result.errors else self.style.WARNING
+        self.stdout.write(style(result.summary()))
+
+        if result.errors:
+            err_path = Path(opts["errors"] or f"{path}.errors.csv")
+            with err_path.open("w", newline="", encoding="utf-8") as fh:
+                result.write_errors(fh)
+            self.stdout.write(f"Failed rows written to {err_path}")
+
+        if opts["summary_sms"] and not opts["dry_run"]:
+            self.stdout.write(f"Summary SMS: {send_import_summary(result, opts['summary_sms'])}")
@@ -0,0 +1,68 @@
+# apps/bookings/management/commands/render_invoices.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.bookings.invoice_batch import render_batch, select_bookings
+from apps.bookings.models import Booking
+
+
+class Command(BaseCommand):
+    help = (
+        "Render booking invoices (by check-out date) in a process pool into a zip or one merged PDF, "
+        "e.g. --from 2026-09-01 --to 2026-09-30 --status CHECKED_OUT."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", help="Check-out on or after (YYYY-MM-DD).")
+        parser.add_argument("--to", dest="date_to", help="Check-out on or before (YYYY-MM-DD).")
+        parser.add_argument("--status", default=Booking.Status.CHECKED_OUT,
+                            help=f"One of {', '.join(Booking.Status.values)}, or ANY.")
+        parser.add_argument("--format", choices=("zip", "pdf"), default="zip",
+                            help="zip = one PDF per invoice, pdf = one merged document.")
+        parser.add_argument("--receipts", action="store_true", help="Add every payment's receipt after its summary.")
+        parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: INVOICE_BATCH_WORKERS / CPUs).")
+        parser.add_argument("--output", "-o", help="Output file (default: invoices_<from>_<to>.<format>).")
+
+    def handle(self, *args, **opts):
+        date_from, date_to = (self._date(opts[k], k) for k in ("date_from", "date_to"))
+        status = opts["status"].upper()
+        if status == "ANY":
+            status = None
+        elif status not in Booking.Status.values:
+            raise CommandError(f"Unknown status {opts['status']!r}.")
+
+        bookings = select_bookings(date_from, date_to, status)
+        count = bookings.count()
+        if not count:
+            self.stdout.write("No bookings match.")
+            return
+
+        output = opts["output"] or "invoices_{}_{}.{}".format(
+            date_from or "start", date_to or timezone.localdate(), opts["format"],
+        )
+        self.stdout.write(f"Rendering {count} bookings -> {output}")
+
+        last = [time.monotonic()]
+
+        def progress(result):
+            if time.monotonic() - last[0] >= 5:
+                last[0] = time.monotonic()
+                self.stdout.write(f"  {result.documents} documents, {result.pages} pages")
+
+        result = render_batch(
+            bookings, output, fmt=opts["format"], receipts=opts["receipts"],
+            workers=opts["workers"] or None, progress=progress,
+        )
+        style = self.style.WARNING if result.failed else self.style.SUCCESS
+        self.stdout.write(style(result.summary()))
+
+    def _date(self, value, name):
+        if not value:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise CommandError(f"--{name.split('_')[1]} must be YYYY-MM-DD, got {value!r}.")
+        return parsed
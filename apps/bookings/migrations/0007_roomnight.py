@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_alter_booking_status'),
+        ('room', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomNight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending Approval'), ('RESERVED', 'Reserved'), ('CHECKED_IN', 'Checked-In'), ('CHECKED_OUT', 'Checked-Out'), ('CANCELLED', 'Cancelled')], max_length=20)),
+                ('rate', models.PositiveIntegerField(default=0)),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_nights', to='bookings.booking')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_nights', to='room.room')),
+            ],
+            options={
+                'ordering': ('date', 'room_id'),
+                'indexes': [models.Index(fields=['date', 'status'], name='roomnight_date_status_idx'), models.Index(fields=['room', 'date'], name='roomnight_room_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('booking', 'date'), name='uniq_roomnight_booking_date')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_roomnight'),
+        ('guests', '0004_keyset_indexes'),
+        ('room', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['-created_at', '-id'], name='booking_created_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['-received_at', '-id'], name='payment_received_keyset_idx'),
+        ),
+    ]
@@ -13,6 +13,15 @@
 from django.db.models import Sum, Q, F, Index
 from django.core.exceptions import ValidationError
 
+def net_paid(payments) -> int:
+    """CHARGE minus REFUND over a Payment queryset, as one conditional aggregate."""
+    agg = payments.aggregate(
+        charges=Sum("amount", filter=Q(kind="CHARGE"), default=0),
+        refunds=Sum("amount", filter=Q(kind="REFUND"), default=0),
+    )
+    return int(agg["charges"] - agg["refunds"])
+
+
 class Booking(models.Model):
     class Status(models.TextChoices):
         PENDING     = "PENDING", "Pending Approval"
@@ -61,6 +70,7 @@ class Meta:
         ordering = ("-created_at",)
         indexes = [
             Index(fields=["room", "check_in", "check_out"], name="booking_room_dates_idx"),
+            Index(fields=["-created_at", "-id"], name="booking_created_keyset_idx"),
         ]
         constraints = [
             models.CheckConstraint(check=Q(check_out__gt=F('check_in')), name="booking_check_out_after_in"),
@@ -75,9 +85,23 @@ def __str__(self):
     # ---------- computed totals ----------
     @property
     def total_paid(self) -> int:
-        charges = self.payments.filter(kind="CHARGE").aggregate(s=Sum("amount"))["s"] or 0
-        refunds = self.payments.filter(kind="REFUND").aggregate(s=Sum("amount"))["s"] or 0
-        return int(charges - refunds)
+        """
+        CHARGE minus REFUND, one query. Memoized on the instance until
+        invalidate_payment_cache() (save() and sync_payment_caches() call it).
+        """
+        if not self.pk:
+            return 0
+        cached = self.__dict__.get("_total_paid_cache")
+        if cached is None:
+            cached = self.__dict__["_total_paid_cache"] = net_paid(self.payments.all())
+        return cached
+
+    def invalidate_payment_cache(self):
+        self.__dict__.pop("_total_paid_cache", None)
+
+    def refresh_from_db(self, *args, **kwargs):
+        self.invalidate_payment_cache()
+        super().refresh_from_db(*args, **kwargs)
 
     @property
     def balance_due(self) -> int:
@@ -85,6 +109,7 @@ def balance_due(self) -> int:
 
     def sync_payment_caches(self, save=True):
         """Keep cached columns in sync (handy for lists/reports)."""
+        self.invalidate_payment_cache()   # payments just changed
         self.payment_amount = self.total_paid
         self.due_amount = self.balance_due
         if save:
@@ -123,7 +148,7 @@ def clean(self):
 
         # ---- Sync payment caches if this booking already exists ----
         if self.pk:
-            # careful: total_paid will run DB queries
+            # one aggregate query, memoized for the rest of this save
             self.payment_amount = self.total_paid
         else:
             self.payment_amount = int(self.payment_amount or 0)
@@ -155,9 +180,14 @@ def clean(self):
             raise ValidationError(errors)
 
     def save(self, *args, **kwargs):
-        # Validate before saving
-        self.full_clean()
-        super().save(*args, **kwargs)
+        # fresh payment totals for this save only
+        self.invalidate_payment_cache()
+        try:
+            # Validate before saving
+            self.full_clean()
+            super().save(*args, **kwargs)
+        finally:
+            self.invalidate_payment_cache()
 
 
 class Payment(models.Model):
@@ -194,6 +224,7 @@ class Meta:
         ordering = ("-received_at", "-id",)
         indexes = [
             models.Index(fields=("booking", "received_at")),
+            models.Index(fields=("-received_at", "-id"), name="payment_received_keyset_idx"),
         ]
         constraints = [
             models.CheckConstraint(check=Q(amount__gt=0), name="payment_amount_gt_0"),
@@ -204,11 +235,7 @@ def clean(self):
             raise ValidationError({"amount": "Amount must be a positive value."})
 
         # Prevent overpayment relative to booking.net_amount
-        existing = self.booking.payments.exclude(pk=self.pk)
-        paid = (
-            (existing.filter(kind=self.Kind.CHARGE).aggregate(s=Sum("amount", default=0))["s"] or 0)
-            - (existing.filter(kind=self.Kind.REFUND).aggregate(s=Sum("amount", default=0))["s"] or 0)
-        )
+        paid = net_paid(self.booking.payments.exclude(pk=self.pk))
 
         delta = self.amount if self.kind == self.Kind.CHARGE else -self.amount
         new_paid = paid + delta
@@ -221,3 +248,30 @@ def clean(self):
     def __str__(self):
         sign = "+" if self.kind == self.Kind.CHARGE else "−"
         return f"Payment {sign}৳{int(self.amount)} for Booking #{self.booking_id}"
+
+
+class RoomNight(models.Model):
+    """
+    Denormalized fact table: one row per booked room per night.
+    Written incrementally from Booking writes (see room_nights.py / signals.py)
+    so occupancy questions become indexed point lookups by date.
+    """
+    room     = models.ForeignKey(Room, on_delete=models.CASCADE, related_name="room_nights")
+    date     = models.DateField()
+    booking  = models.ForeignKey("Booking", on_delete=models.CASCADE, related_name="room_nights")
+    status   = models.CharField(max_length=20, choices=Booking.Status.choices)
+    # nightly rate snapshot (BDT integer) — room-night revenue
+    rate     = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ("date", "room_id")
+        indexes = [
+            Index(fields=["date", "status"], name="roomnight_date_status_idx"),
+            Index(fields=["room", "date"], name="roomnight_room_date_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["booking", "date"], name="uniq_roomnight_booking_date"),
+        ]
+
+    def __str__(self):
+        return f"Room {self.room_id} @ {self.date} (Booking #{self.booking_id}, {self.status})"
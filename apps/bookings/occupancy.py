@@ -0,0 +1,243 @@
+# apps/bookings/occupancy.py
+"""
+Per-process room occupancy index.
+
+For every room we keep a day-bitmap (a plain Python int, bit N = day N after
+`origin`) over a rolling horizon, built lazily from non-cancelled bookings in
+one query. Booking post_save/post_delete signals (see signals.py) keep it
+current, so availability questions become a couple of bit operations.
+
+Anything outside the horizon falls back to SQL.
+
+Cross-process freshness: every write bumps a version counter in the Django
+cache. A process that sees a version it did not produce itself rebuilds on
+the next lookup. With the default LocMem cache this only covers the current
+process — configure a shared cache when running several workers.
+"""
+import threading
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+
+HORIZON_DAYS  = getattr(settings, "OCCUPANCY_INDEX_HORIZON_DAYS", 400)
+LOOKBACK_DAYS = getattr(settings, "OCCUPANCY_INDEX_LOOKBACK_DAYS", 30)
+VERSION_KEY   = "occupancy_index:version"
+
+
+def _booking_model():
+    from .models import Booking
+    return Booking
+
+
+def _cache_version():
+    try:
+        return cache.get(VERSION_KEY, 0)
+    except Exception:
+        return None
+
+
+def _bump_version():
+    try:
+        cache.add(VERSION_KEY, 0, timeout=None)
+        return cache.incr(VERSION_KEY)
+    except Exception:
+        return None
+
+
+def _to_int(v):
+    try:
+        return int(v) if v not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+class OccupancyIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._origin = None      # date of bit 0
+        self._version = None     # cache version this snapshot matches
+        self._spans = {}         # room_id -> {booking_id: (start_bit, end_bit)}
+        self._bits = {}          # room_id -> int bitmap
+        self._where = {}         # booking_id -> room_id
+
+    # ---------- build / freshness ----------
+    def _anchor(self) -> date:
+        return date.today() - timedelta(days=LOOKBACK_DAYS)
+
+    def _ensure(self):
+        with self._lock:
+            if self._origin != self._anchor() or self._version is None or self._version != _cache_version():
+                self.rebuild()
+
+    def rebuild(self):
+        Booking = _booking_model()
+        with self._lock:
+            version = _cache_version()
+            origin = self._anchor()
+            end = origin + timedelta(days=HORIZON_DAYS)
+            rows = (
+                Booking.objects
+                .exclude(status=Booking.Status.CANCELLED)
+                .filter(check_in__lt=end, check_out__gt=origin)
+                .values_list("id", "room_id", "check_in", "check_out")
+            )
+            self._origin = origin
+            self._spans, self._bits, self._where = {}, {}, {}
+            for bid, room_id, ci, co in rows.iterator(chunk_size=2000):
+                self._add(bid, room_id, ci, co)
+            self._version = version
+
+    @property
+    def origin(self) -> date | None:
+        return self._origin
+
+    # ---------- incremental maintenance ----------
+    def _span(self, ci: date, co: date):
+        s = max(0, (ci - self._origin).days)
+        e = min(HORIZON_DAYS, (co - self._origin).days)
+        return (s, e) if e > s else None
+
+    @staticmethod
+    def _mask(s: int, e: int) -> int:
+        return ((1 << (e - s)) - 1) << s
+
+    def _recompute_room(self, room_id):
+        bits = 0
+        for s, e in self._spans.get(room_id, {}).values():
+            bits |= self._mask(s, e)
+        if bits:
+            self._bits[room_id] = bits
+        else:
+            self._bits.pop(room_id, None)
+            self._spans.pop(room_id, None)
+
+    def _add(self, bid, room_id, ci, co):
+        span = self._span(ci, co)
+        if span is None:
+            return
+        self._spans.setdefault(room_id, {})[bid] = span
+        self._bits[room_id] = self._bits.get(room_id, 0) | self._mask(*span)
+        self._where[bid] = room_id
+
+    def _discard(self, bid):
+        room_id = self._where.pop(bid, None)
+        if room_id is None:
+            return
+        self._spans.get(room_id, {}).pop(bid, None)
+        self._recompute_room(room_id)
+
+    def _after_write(self, apply):
+        """Apply a change locally and keep our version in step with the cache."""
+        with self._lock:
+            if self._origin is None:
+                _bump_version()
+                return
+            expected = (self._version or 0) + 1
+            apply()
+            new_version = _bump_version()
+            # someone else wrote in between -> our snapshot misses their change
+            self._version = new_version if new_version == expected else None
+
+    def booking_saved(self, booking):
+        Booking = _booking_model()
+
+        def apply():
+            self._discard(booking.pk)
+            if booking.status != Booking.Status.CANCELLED and booking.check_in and booking.check_out:
+                self._add(booking.pk, booking.room_id, booking.check_in, booking.check_out)
+        self._after_write(apply)
+
+    def booking_deleted(self, booking_id):
+        self._after_write(lambda: self._discard(booking_id))
+
+    def invalidate(self):
+        """Force every process to rebuild (after bulk writes that skip signals)."""
+        with self._lock:
+            self._version = None
+            _bump_version()
+
+    # ---------- queries ----------
+    def covers(self, cin: date, cout: date) -> bool:
+        return (
+            self._origin is not None
+            and cin >= self._origin
+            and cout <= self._origin + timedelta(days=HORIZON_DAYS)
+        )
+
+    def _room_bits(self, room_id, exclude_booking_id=None) -> int:
+        if exclude_booking_id and exclude_booking_id in self._spans.get(room_id, {}):
+            bits = 0
+            for bid, (s, e) in self._spans[room_id].items():
+                if bid != exclude_booking_id:
+                    bits |= self._mask(s, e)
+            return bits
+        return self._bits.get(room_id, 0)
+
+    def conflicts(self, room_id, cin: date, cout: date, exclude_booking_id=None) -> list[int]:
+        """Ids of non-cancelled bookings of this room overlapping [cin, cout)."""
+        room_id, exclude_booking_id = _to_int(room_id), _to_int(exclude_booking_id)
+        self._ensure()
+        with self._lock:
+            if self.covers(cin, cout):
+                span = self._span(cin, cout)
+                if span is None:
+                    return []
+                mask = self._mask(*span)
+                return sorted(
+                    bid for bid, (s, e) in self._spans.get(room_id, {}).items()
+                    if bid != exclude_booking_id and self._mask(s, e) & mask
+                )
+        return list(self._sql(cin, cout, exclude_booking_id).filter(room_id=room_id).values_list("id", flat=True))
+
+    def is_available(self, room_id, cin: date, cout: date, exclude_booking_id=None) -> bool:
+        room_id, exclude_booking_id = _to_int(room_id), _to_int(exclude_booking_id)
+        self._ensure()
+        with self._lock:
+            if self.covers(cin, cout):
+                span = self._span(cin, cout)
+                return span is None or not (self._room_bits(room_id, exclude_booking_id) & self._mask(*span))
+        return not self._sql(cin, cout, exclude_booking_id).filter(room_id=room_id).exists()
+
+    def busy_room_ids(self, cin: date, cout: date, exclude_booking_id=None) -> set[int]:
+        exclude_booking_id = _to_int(exclude_booking_id)
+        self._ensure()
+        with self._lock:
+            if self.covers(cin, cout):
+                span = self._span(cin, cout)
+                if span is None:
+                    return set()
+                mask = self._mask(*span)
+                return {
+                    room_id for room_id in self._bits
+                    if self._room_bits(room_id, exclude_booking_id) & mask
+                }
+        return set(self._sql(cin, cout, exclude_booking_id).values_list("room_id", flat=True).distinct())
+
+    def busy_days(self, room_id) -> set[date]:
+        """Busy days of one room inside the horizon (used by the consistency check)."""
+        self._ensure()
+        with self._lock:
+            bits = self._bits.get(_to_int(room_id), 0)
+            out, n = set(), 0
+            while bits:
+                if bits & 1:
+                    out.add(self._origin + timedelta(days=n))
+                bits >>= 1
+                n += 1
+            return out
+
+    @staticmethod
+    def _sql(cin, cout, exclude_booking_id=None):
+        Booking = _booking_model()
+        qs = (
+            Booking.objects
+            .exclude(status=Booking.Status.CANCELLED)
+            .filter(check_in__lt=cout, check_out__gt=cin)
+        )
+        if exclude_booking_id:
+            qs = qs.exclude(pk=exclude_booking_id)
+        return qs
+
+
+occupancy_index = OccupancyIndex()
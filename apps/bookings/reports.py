@@ -0,0 +1,183 @@
+# apps/bookings/reports.py
+"""
+Summary report query builder (ReportSummaryPage + ReportSummaryAPI).
+
+Costs a fixed number of statements whatever the window size:
+    1  bookings  — one grouped aggregate per room (feeds the per-room table,
+                   the booking KPIs and the paginator count)
+    1  payments  — DailyFinanceRollup totals (~1 row per day and bucket)
+    1  guests    — new registrations
+    1  rooms     — available rooms for the occupancy denominator
+    1  nights    — RoomNight aggregate
+    1  page      — the current page of booking detail rows
+"""
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db.models import Count, Sum
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from apps.finances import rollup
+from apps.guests.models import Guest
+from apps.room.models import Room
+
+from .models import Booking
+from .room_nights import room_night_totals
+
+REPORT_PAGE_SIZE = getattr(settings, "REPORT_PAGE_SIZE", 50)
+
+
+@dataclass(frozen=True)
+class SummaryKPIs:
+    new_guests: int = 0
+    total_bookings: int = 0
+    total_invoices: int = 0
+    sum_net: int = 0
+    sum_discount: int = 0
+    sum_received: int = 0      # charges minus refunds
+    sum_due: int = 0
+    room_nights: int = 0
+    room_night_revenue: int = 0
+    occupancy_pct: float = 0
+
+
+@dataclass(frozen=True)
+class RoomSummary:
+    room_id: int
+    room_number: str
+    category: str
+    bookings: int
+    net: int
+    discount: int
+    received: int
+    due: int
+
+
+@dataclass
+class SummaryReport:
+    date_from: date
+    date_to: date
+    kpi: SummaryKPIs
+    per_room: list[RoomSummary] = field(default_factory=list)
+    page: Page | None = None
+
+    def as_dict(self) -> dict:
+        """JSON-ready shape (dates as ISO strings)."""
+        page = self.page
+        return {
+            "date_from": self.date_from.isoformat(),
+            "date_to": self.date_to.isoformat(),
+            "kpi": asdict(self.kpi),
+            "per_room": [asdict(r) for r in self.per_room],
+            "bookings": {
+                "page": page.number if page else 1,
+                "pages": page.paginator.num_pages if page else 1,
+                "count": page.paginator.count if page else 0,
+                "results": [booking_row(b) for b in page] if page else [],
+            },
+        }
+
+
+class _CountedPaginator(Paginator):
+    """Paginator whose total is already known (skips the COUNT(*) query)."""
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._known_count = count
+
+    @cached_property
+    def count(self):
+        return self._known_count
+
+
+def booking_row(b: Booking) -> dict:
+    room = b.room
+    return {
+        "id": b.id,
+        "check_in": b.check_in.isoformat() if b.check_in else None,
+        "check_out": b.check_out.isoformat() if b.check_out else None,
+        "room": room.room_number if room else "",
+        "category": getattr(getattr(room, "category", None), "name", "") or "",
+        "guest": b.guest.full_name if b.guest_id else "",
+        "status": b.status,
+        "net": int(b.net_amount or 0),
+        "paid": int(b.payment_amount or 0),
+        "due": int(b.due_amount or 0),
+    }
+
+
+def window_bookings(df: date, dt: date):
+    # business rule: a booking belongs to the window if its check_in is in [df, dt]
+    return Booking.objects.filter(check_in__gte=df, check_in__lte=dt)
+
+
+def _per_room(df: date, dt: date) -> list[RoomSummary]:
+    rows = (
+        window_bookings(df, dt)
+        .values("room_id", "room__room_number", "room__category__name")
+        .annotate(
+            bookings=Count("id"),
+            net=Sum("net_amount", default=0),
+            discount=Sum("discount_amount", default=0),
+            received=Sum("payment_amount", default=0),
+            due=Sum("due_amount", default=0),
+        )
+        .order_by("room__room_number")
+    )
+    return [
+        RoomSummary(
+            room_id=r["room_id"],
+            room_number=r["room__room_number"] or "",
+            category=r["room__category__name"] or "",
+            bookings=r["bookings"],
+            net=int(r["net"]),
+            discount=int(r["discount"]),
+            received=int(r["received"]),
+            due=int(r["due"]),
+        )
+        for r in rows
+    ]
+
+
+def _new_guests(df: date, dt: date) -> int:
+    start = timezone.make_aware(datetime.combine(df, time.min))
+    end = timezone.make_aware(datetime.combine(dt, time.max))
+    return Guest.objects.filter(created_at__gte=start, created_at__lte=end).count()
+
+
+def summary_report(df: date, dt: date, page=1, per_page: int = REPORT_PAGE_SIZE) -> SummaryReport:
+    per_room = _per_room(df, dt)
+    total_bookings = sum(r.bookings for r in per_room)
+
+    money = rollup.totals(df, dt)
+    nights = room_night_totals(df, dt)
+    available_nights = Room.objects.count() * ((dt - df).days + 1)
+
+    kpi = SummaryKPIs(
+        new_guests=_new_guests(df, dt),
+        total_bookings=total_bookings,
+        total_invoices=money["charge_count"] + money["refund_count"],
+        sum_net=sum(r.net for r in per_room),
+        sum_discount=sum(r.discount for r in per_room),
+        sum_received=money["net_received"],
+        sum_due=sum(r.due for r in per_room),
+        room_nights=nights["nights"],
+        room_night_revenue=nights["revenue"],
+        occupancy_pct=round(100 * nights["nights"] / available_nights, 1) if available_nights else 0,
+    )
+
+    detail = (
+        window_bookings(df, dt)
+        .select_related("guest", "room", "room__category")
+        .order_by("-check_in", "-id")
+    )
+    paginator = _CountedPaginator(detail, per_page, count=total_bookings)
+    return SummaryReport(
+        date_from=df,
+        date_to=dt,
+        kpi=kpi,
+        per_room=per_room,
+        page=paginator.get_page(page),
+    )
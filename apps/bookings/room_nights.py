@@ -0,0 +1,93 @@
+# apps/bookings/room_nights.py
+"""
+Maintenance + query helpers for the RoomNight fact table.
+
+One row per (booking, night). Cancelled bookings keep their rows with
+status=CANCELLED, so every occupancy query filters them out via
+`occupied_nights()`.
+"""
+from datetime import date, timedelta
+
+from django.db.models import Count, Sum
+
+from .models import Booking, RoomNight
+
+
+def _nights_for(booking: Booking) -> list[RoomNight]:
+    if not (booking.check_in and booking.check_out and booking.room_id):
+        return []
+    n = (booking.check_out - booking.check_in).days
+    return [
+        RoomNight(
+            room_id=booking.room_id,
+            date=booking.check_in + timedelta(days=i),
+            booking_id=booking.pk,
+            status=booking.status,
+            rate=int(booking.nightly_rate or 0),
+        )
+        for i in range(max(0, n))
+    ]
+
+
+def sync_room_nights(booking: Booking, old: dict | None = None):
+    """
+    Bring the RoomNight rows of one booking in line with its current state.
+    `old` = {"room_id", "check_in", "check_out"} captured before the save;
+    when those did not change a single UPDATE is enough.
+    """
+    if old and (
+        old.get("room_id") == booking.room_id
+        and old.get("check_in") == booking.check_in
+        and old.get("check_out") == booking.check_out
+    ):
+        RoomNight.objects.filter(booking_id=booking.pk).update(
+            status=booking.status, rate=int(booking.nightly_rate or 0)
+        )
+        return
+
+    if old is not None:
+        RoomNight.objects.filter(booking_id=booking.pk).delete()
+    RoomNight.objects.bulk_create(_nights_for(booking))
+
+
+def rebuild_room_nights(bookings, batch_size: int = 1000) -> int:
+    """Replace RoomNight rows for the given bookings (used by the backfill command)."""
+    total = 0
+    rows, ids = [], []
+    for b in bookings:
+        ids.append(b.pk)
+        rows.extend(_nights_for(b))
+        if len(ids) >= batch_size:
+            total += _flush(ids, rows)
+            rows, ids = [], []
+    if ids:
+        total += _flush(ids, rows)
+    return total
+
+
+def _flush(ids, rows) -> int:
+    RoomNight.objects.filter(booking_id__in=ids).delete()
+    RoomNight.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+# ---------- queries ----------
+def occupied_nights(day_from: date, day_to: date | None = None):
+    """Non-cancelled room nights in [day_from, day_to] (inclusive)."""
+    qs = RoomNight.objects.exclude(status=Booking.Status.CANCELLED)
+    if day_to is None:
+        return qs.filter(date=day_from)
+    return qs.filter(date__gte=day_from, date__lte=day_to)
+
+
+def occupied_room_ids(day: date):
+    return occupied_nights(day).values_list("room_id", flat=True)
+
+
+def room_night_totals(day_from: date, day_to: date) -> dict:
+    """{"nights": <count>, "revenue": <sum of nightly rates>} for the window."""
+    agg = occupied_nights(day_from, day_to).aggregate(nights=Count("id"), revenue=Sum("rate"))
+    return {
+        "nights": int(agg["nights"] or 0),
+        "revenue": int(agg["revenue"] or 0),
+    }
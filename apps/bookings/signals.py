@@ -3,9 +3,16 @@
 from django.dispatch import receiver
 from django.conf import settings
 from django.core.cache import cache
+from django.db import transaction
 
 from .models import Payment, Booking
-from apps.core.sms import send_sms_jbd, normalize_bd_mobile
+from .occupancy import occupancy_index
+from .room_nights import sync_room_nights
+from apps.core.models import SmsLog
+from apps.core.outbox import enqueue_sms
+from apps.core.sms import normalize_bd_mobile
+from apps.core.events import publish_on_commit
+from apps.core.versioning import bump
 from apps.core.site_meta import get_hotel_meta  # helper to read site_settings
 
 # ==================== SMS feature toggles ====================
@@ -32,6 +39,102 @@ def recalc_booking_totals(sender, instance: Payment, **kwargs):
     booking = instance.booking
     booking.sync_payment_caches(save=True)  # ✅ no SMS here
 
+# -------------------- 1b) OCCUPANCY INDEX --------------------
+_OCCUPANCY_FIELDS = ("room_id", "check_in", "check_out", "status")
+
+@receiver(post_save, sender=Booking)
+def _occupancy_on_save(sender, instance: Booking, created, **kwargs):
+    """
+    Refresh this booking's days in the in-memory index once the write commits.
+    Saves that leave room, dates and status alone (payment caches, notes) are
+    skipped: each refresh bumps the shared version and every other process
+    rebuilds its whole index.
+    """
+    old = getattr(instance, "_old_room_night_key", None)
+    if not created and old and all(old[f] == getattr(instance, f) for f in _OCCUPANCY_FIELDS):
+        return
+    transaction.on_commit(lambda: occupancy_index.booking_saved(instance))
+
+@receiver(post_delete, sender=Booking)
+def _occupancy_on_delete(sender, instance: Booking, **kwargs):
+    booking_id = instance.pk
+    transaction.on_commit(lambda: occupancy_index.booking_deleted(booking_id))
+
+# -------------------- 1b') DATA VERSIONS (API ETags) --------------------
+@receiver([post_save, post_delete], sender=Booking)
+def _bump_booking_version(sender, using, **kwargs):
+    bump("bookings", using=using)
+
+@receiver([post_save, post_delete], sender=Payment)
+def _bump_payment_version(sender, using, **kwargs):
+    bump("payments", using=using)
+
+# -------------------- 1c) ROOM NIGHTS (fact table) --------------------
+_ROOM_NIGHT_FIELDS = {"status", "room", "room_id", "check_in", "check_out", "nightly_rate"}
+
+@receiver(post_save, sender=Booking)
+def _sync_room_nights(sender, instance: Booking, created, update_fields=None, **kwargs):
+    """
+    Keep RoomNight rows in step with the booking, inside the same transaction.
+    Saves that only touch payment caches are skipped.
+    """
+    if update_fields and not (set(update_fields) & _ROOM_NIGHT_FIELDS):
+        return
+    old = None if created else (getattr(instance, "_old_room_night_key", None) or {})
+    sync_room_nights(instance, old=old)
+
+# -------------------- 1d) LIVE EVENTS (SSE, apps/core/events.py) --------------------
+_PAYMENT_CACHE_FIELDS = {"payment_amount", "due_amount", "updated_at"}
+_FREES_ROOM = {Booking.Status.CHECKED_OUT, Booking.Status.CANCELLED}
+
+def _booking_delta(b: Booking) -> dict:
+    return {
+        "id": b.pk,
+        "room": b.room_id,
+        "status": b.status,
+        "check_in": b.check_in,
+        "check_out": b.check_out,
+    }
+
+@receiver(post_save, sender=Booking)
+def _publish_booking(sender, instance: Booking, created, using, update_fields=None, **kwargs):
+    """Push the change to open dashboards once it commits."""
+    if update_fields and set(update_fields) <= _PAYMENT_CACHE_FIELDS:
+        return  # payment.added already covers it
+    delta = _booking_delta(instance)
+    if created:
+        publish_on_commit("booking.created", delta, using=using)
+        return
+
+    old_status = getattr(instance, "_old_status", None)
+    old_room = (getattr(instance, "_old_room_night_key", None) or {}).get("room_id")
+    if old_status and old_status != instance.status:
+        publish_on_commit("booking.status", {**delta, "from": old_status}, using=using)
+        if instance.status in _FREES_ROOM:
+            publish_on_commit("room.freed", {"room": instance.room_id, "booking": instance.pk}, using=using)
+    else:
+        publish_on_commit("booking.updated", delta, using=using)
+    if old_room and old_room != instance.room_id:
+        publish_on_commit("room.freed", {"room": old_room, "booking": instance.pk}, using=using)
+
+@receiver(post_delete, sender=Booking)
+def _publish_booking_deleted(sender, instance: Booking, using, **kwargs):
+    publish_on_commit("room.freed", {"room": instance.room_id, "booking": instance.pk, "deleted": True}, using=using)
+
+@receiver(post_save, sender=Payment)
+def _publish_payment(sender, instance: Payment, created, using, **kwargs):
+    if not created:
+        return
+    booking = instance.booking
+    publish_on_commit("payment.added", {
+        "id": instance.pk,
+        "booking": booking.pk,
+        "kind": instance.kind,
+        "amount": instance.amount,
+        "paid": booking.payment_amount,
+        "due": booking.due_amount,
+    }, using=using)
+
 # -------------------- 2) BOOKING STATUS → SMS --------------------
 def _compose_status_sms(booking: Booking, new_status: str) -> str:
     hotel, phone = get_hotel_meta()
@@ -76,16 +179,20 @@ def _compose_status_sms(booking: Booking, new_status: str) -> str:
 @receiver(pre_save, sender=Booking)
 def _capture_old_status(sender, instance: Booking, **kwargs):
     """
-    Cache previous status so post_save can detect changes.
+    Cache previous status (and room/dates for RoomNight sync) so post_save
+    can detect changes.
     """
+    instance._old_room_night_key = None
     if not instance.pk:
         instance._old_status = None
         return
-    try:
-        old = sender.objects.get(pk=instance.pk)
-        instance._old_status = getattr(old, "status", None)
-    except sender.DoesNotExist:
-        instance._old_status = None
+    old = (
+        sender.objects.filter(pk=instance.pk)
+        .values("status", "room_id", "check_in", "check_out")
+        .first()
+    )
+    instance._old_status = old["status"] if old else None
+    instance._old_room_night_key = old
 
 @receiver(post_save, sender=Booking)
 def _send_status_sms_when_changed(sender, instance: Booking, created, **kwargs):
@@ -129,9 +236,9 @@ def _send_status_sms_when_changed(sender, instance: Booking, created, **kwargs):
     if not m01:
         return
 
-    # Compose & send
+    # Compose & queue (sent by the sms_worker after commit)
     msg = _compose_status_sms(instance, new_status)
-    send_sms_jbd(m01, msg)
+    enqueue_sms(m01, msg, context=SmsLog.Kind.STATUS, booking_id=instance.pk)
 
 # ===================== 3) BOOKING CREATED (RESERVED) → SMS =====================
 def _compose_created_sms(booking: Booking) -> str:
@@ -188,4 +295,4 @@ def _send_created_sms(sender, instance: Booking, created, **kwargs):
         return
 
     msg = _compose_created_sms(instance)
-    send_sms_jbd(m01, msg)
+    enqueue_sms(m01, msg, context=SmsLog.Kind.CREATED, booking_id=instance.pk)
@@ -1,3 +1,341 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.core.models import SmsLog, SmsOutbox
+from apps.finances import rollup
+from apps.guests.models import Guest
+from apps.room.models import Category, Room
+from apps.site_settings.cache import get_site_settings, invalidate_site_settings
+
+from . import invoices
+from .importer import BookingImporter, find_overlaps, send_import_summary
+from .models import Booking, Payment
+from .occupancy import _cache_version, occupancy_index
+from .reports import summary_report
+
+
+def _payment_aggregates(ctx) -> int:
+    """Queries summing bookings_payment (Booking.total_paid / net_paid)."""
+    return sum(
+        1 for q in ctx.captured_queries
+        if 'FROM "bookings_payment"' in q["sql"] and "SUM(" in q["sql"]
+    )
+
+
+class BookingFlowQueryCountTests(TestCase):
+    """
+    Query budget of the booking write flows (view, signals and SMS enqueue;
+    on-commit hooks don't run inside TestCase). Booking.total_paid is one
+    conditional aggregate memoized per clean/save pass: a new booking has
+    none, an edit or a payment one for validation and one for the save,
+    checkout one more for the status save. A change here means a query
+    crept into (or left) the path: update the numbers deliberately.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("01700000000", "pw")
+        category = Category.objects.create(name="Deluxe")
+        cls.room = Room.objects.create(room_number="101", category=category, price=1000)
+        cls.other_room = Room.objects.create(room_number="102", category=category, price=1500)
+        cls.guest = Guest.objects.create(full_name="Test Guest", phone_number="8801711111111")
+        cls.today = timezone.localdate()
+        cls.booking = Booking.objects.create(
+            guest=cls.guest, room=cls.room, status=Booking.Status.CHECKED_IN,
+            check_in=cls.today, check_out=cls.today + timedelta(days=2),
+        )
+        Payment.objects.create(booking=cls.booking, amount=500)
+
+    def setUp(self):
+        # counts must not depend on which test warmed the settings / version caches
+        cache.clear()
+        invalidate_site_settings()
+        self.client.force_login(self.user)
+
+    def post(self, url, data, queries, aggregates):
+        with CaptureQueriesContext(connection) as ctx, self.assertNumQueries(queries):
+            response = self.client.post(url, data)
+        self.assertEqual(_payment_aggregates(ctx), aggregates)
+        return response
+
+    def booking_data(self, **overrides):
+        return {
+            "guest": self.guest.pk, "room": self.booking.room_id,
+            "check_in": self.booking.check_in.isoformat(), "check_out": self.booking.check_out.isoformat(),
+            "nightly_rate": 1000, "extra_amount": 0, "discount_amount": 0, "payment_amount": 0,
+            "notes": "", "status": Booking.Status.CHECKED_IN, **overrides,
+        }
+
+    def test_create(self):
+        data = self.booking_data(
+            room=self.other_room.pk, nightly_rate=0, status=Booking.Status.RESERVED,
+            check_in=self.today.isoformat(), check_out=(self.today + timedelta(days=3)).isoformat(),
+        )
+        response = self.post(reverse("booking_create"), data, queries=22, aggregates=0)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Booking.objects.filter(room=self.other_room).get().net_amount, 4500)
+
+    def test_edit(self):
+        response = self.post(reverse("booking_edit", args=[self.booking.pk]), self.booking_data(discount_amount=200), queries=22, aggregates=2)
+        self.assertEqual(response.status_code, 302)
+        self.booking.refresh_from_db()
+        self.assertEqual((self.booking.net_amount, self.booking.due_amount), (1800, 1300))
+
+    def test_add_payment(self):
+        data = {"kind": Payment.Kind.CHARGE, "method": Payment.Method.CASH, "amount": 300}
+        response = self.post(reverse("booking_add_payment", args=[self.booking.pk]), data, queries=14, aggregates=2)
+        self.assertEqual(response.json()["total_paid"], 800)
+
+    def test_checkout(self):
+        response = self.post(reverse("booking_checkout", args=[self.booking.pk]), {"amount": 1500}, queries=30, aggregates=3)
+        self.assertTrue(response.json()["ok"])
+        self.booking.refresh_from_db()
+        self.assertEqual((self.booking.status, self.booking.due_amount), (Booking.Status.CHECKED_OUT, 0))
+
+
+class SummaryReportQueryCountTests(TestCase):
+    """summary_report() and its JSON API cost the same statements for a day or a year."""
+
+    REPORT_QUERIES = 6      # per-room aggregate, rollup, guests, rooms, room nights, page
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("01700000000", "pw")
+        category = Category.objects.create(name="Standard")
+        rooms = [Room.objects.create(room_number=str(200 + i), category=category, price=1000) for i in range(4)]
+        cls.end = timezone.localdate()
+        cls.start = cls.end - timedelta(days=364)
+        for i in range(48):         # every room booked about once a month for a year
+            guest = Guest.objects.create(full_name=f"Guest {i}", phone_number=f"88017{i:08d}")
+            check_in = cls.start + timedelta(days=(i // 4) * 30 + 1)
+            booking = Booking.objects.create(
+                guest=guest, room=rooms[i % 4], status=Booking.Status.CHECKED_OUT,
+                check_in=check_in, check_out=check_in + timedelta(days=2),
+            )
+            Payment.objects.create(booking=booking, amount=1500)
+        Booking.objects.create(
+            guest=guest, room=rooms[0], status=Booking.Status.CHECKED_IN,
+            check_in=cls.end, check_out=cls.end + timedelta(days=1),
+        )
+        rollup.rebuild()    # the on-commit maintenance doesn't run inside TestCase
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def windows(self):
+        return {"1 day": (self.end, self.end), "1 year": (self.start, self.end)}
+
+    def test_summary_report(self):
+        sizes = {}
+        for label, (df, dt) in self.windows().items():
+            with self.subTest(window=label), self.assertNumQueries(self.REPORT_QUERIES):
+                report = summary_report(df, dt, per_page=20)
+                data = report.as_dict()       # renders the detail page too
+            sizes[label] = data["bookings"]["count"]
+        self.assertEqual(sizes, {"1 day": 1, "1 year": 49})
+
+    def test_summary_api(self):
+        url = reverse("report_summary_api")
+        for label, (df, dt) in self.windows().items():
+            # + session and user lookups
+            with self.subTest(window=label), self.assertNumQueries(self.REPORT_QUERIES + 2):
+                response = self.client.get(url, {"from": df.isoformat(), "to": dt.isoformat()})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["date_to"], dt.isoformat())
+
+
+class FindOverlapsTests(SimpleTestCase):
+    """The importer's sorted sweep, on half-open [check_in, check_out) spans."""
+
+    def d(self, day):
+        return date(2030, 1, day)
+
+    def bad(self, existing, candidates):
+        return find_overlaps(
+            [(self.d(a), self.d(b)) for a, b in existing],
+            [(self.d(a), self.d(b), key) for a, b, key in candidates],
+        )
+
+    def test_sweep(self):
+        cases = {
+            "touching existing on both sides": ([(5, 8)], [(3, 5, "a"), (8, 10, "b")], set()),
+            "inside / across existing": ([(5, 8)], [(6, 7, "a"), (4, 6, "b"), (7, 9, "c"), (4, 9, "d")], {"a", "b", "c", "d"}),
+            "long existing hides behind a short one": ([(1, 10), (2, 3)], [(4, 5, "a")], {"a"}),
+            "gap between existing": ([(1, 3), (6, 8)], [(3, 6, "a")], set()),
+            "touching candidates": ([], [(1, 3, "a"), (3, 5, "b"), (5, 6, "c")], set()),
+            "earlier candidate wins": ([], [(3, 6, "late"), (1, 4, "early")], {"late"}),
+            "rejected candidate doesn't block": ([(1, 4)], [(3, 6, "a"), (5, 7, "b")], {"a"}),
+            "nested candidates": ([], [(1, 10, "a"), (2, 3, "b"), (4, 5, "c")], {"b", "c"}),
+            "nothing booked": ([], [], set()),
+        }
+        for label, (existing, candidates, expected) in cases.items():
+            with self.subTest(label):
+                self.assertEqual(self.bad(existing, candidates), expected)
+
+
+class BookingImportTests(TestCase):
+    """BookingImporter end to end: overlaps per room, across batches and with cancelled rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Deluxe")
+        cls.room = Room.objects.create(room_number="101", category=category, price=1000)
+        cls.other_room = Room.objects.create(room_number="102", category=category, price=1500)
+        guest = Guest.objects.create(full_name="Test Guest", phone_number="8801711111111")
+        Booking.objects.create(guest=guest, room=cls.room, check_in=date(2030, 1, 5), check_out=date(2030, 1, 8))
+        Booking.objects.create(
+            guest=guest, room=cls.room, status=Booking.Status.CANCELLED,
+            check_in=date(2030, 1, 20), check_out=date(2030, 1, 22),
+        )
+
+    def run_import(self, rows, batch_size=500):
+        header = ("phone", "name", "room", "check_in", "check_out", "status")
+        lines = [dict(zip(header, row)) for row in rows]
+        with self.captureOnCommitCallbacks(execute=True):
+            result = BookingImporter(batch_size=batch_size).run(enumerate(lines, start=2))
+        return result, {line for line, _, _ in result.errors}
+
+    def test_overlaps(self):
+        for batch_size in (500, 1):     # the sweep also sees rows accepted by earlier batches
+            with self.subTest(batch_size=batch_size):
+                result, failed = self.run_import([
+                    ("01722222222", "Tour A", "101", "2030-01-08", "2030-01-10", ""),   # 2: touches existing
+                    ("01722222222", "Tour A", "101", "2030-01-03", "2030-01-05", ""),   # 3: touches existing
+                    ("01733333333", "Tour B", "101", "2030-01-07", "2030-01-09", ""),   # 4: overlaps existing
+                    ("01733333333", "Tour B", "102", "2030-01-05", "2030-01-08", ""),   # 5: same dates, other room
+                    ("01744444444", "Tour C", "102", "2030-01-06", "2030-01-07", ""),   # 6: overlaps row 5
+                    ("01744444444", "Tour C", "101", "2030-01-21", "2030-01-23", ""),   # 7: overlaps a cancelled booking
+                    ("01755555555", "Tour D", "102", "2030-02-01", "2030-02-03", "cancelled"),  # 8
+                    ("01755555555", "Tour D", "102", "2030-02-02", "2030-02-04", ""),   # 9: overlaps cancelled row 8
+                ], batch_size=batch_size)
+                # like Booking.clean, every booking of the room counts, cancelled ones too
+                self.assertEqual(failed, {4, 6, 7, 9})
+                self.assertEqual(result.created, 4)
+                Booking.objects.filter(check_in__year=2030).exclude(guest__phone_number="8801711111111").delete()
+
+    def test_summary_sms_kind(self):
+        result, _ = self.run_import([("01722222222", "Tour A", "101", "2030-03-01", "2030-03-02", "")])
+        self.assertEqual(send_import_summary(result, "01700000000"), "QUEUED")
+        self.assertEqual(SmsOutbox.objects.get(body__startswith="Booking import").context, SmsLog.Kind.IMPORT)
+
+
+class OccupancyIndexTests(TestCase):
+    """The in-memory index, kept current by the booking signals, against the SQL overlap query."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Deluxe")
+        cls.rooms = [
+            Room.objects.create(room_number="101", category=category, price=1000),
+            Room.objects.create(room_number="102", category=category, price=1500),
+        ]
+        cls.guest = Guest.objects.create(full_name="Test Guest", phone_number="8801711111111")
+        cls.today = timezone.localdate()
+
+    def setUp(self):
+        cache.clear()
+        occupancy_index.rebuild()
+        self.addCleanup(occupancy_index.invalidate)     # the rows roll back, the snapshot would not
+
+    def committed(self, write):
+        with self.captureOnCommitCallbacks(execute=True):
+            return write()
+
+    def book(self, room, start, nights):
+        ci = self.today + timedelta(days=start)
+        return self.committed(lambda: Booking.objects.create(
+            guest=self.guest, room=room, check_in=ci, check_out=ci + timedelta(days=nights),
+        ))
+
+    def assertIndexMatchesSql(self):
+        windows = [
+            (self.today + timedelta(days=s), self.today + timedelta(days=s + n))
+            for s in range(-1, 10) for n in (1, 3)
+        ]
+        # answered from the incrementally maintained bitmaps, not a fresh rebuild
+        with mock.patch.object(occupancy_index, "rebuild", side_effect=AssertionError("index rebuilt")):
+            for cin, cout in windows:
+                sql = occupancy_index._sql(cin, cout)
+                self.assertEqual(occupancy_index.busy_room_ids(cin, cout), set(sql.values_list("room_id", flat=True)))
+                for room in self.rooms:
+                    expected = sorted(sql.filter(room=room).values_list("id", flat=True))
+                    self.assertEqual(occupancy_index.conflicts(room.pk, cin, cout), expected, (room, cin, cout))
+                    self.assertEqual(occupancy_index.is_available(room.pk, cin, cout), not expected)
+
+    def test_create_move_cancel_delete(self):
+        first = self.book(self.rooms[0], 1, 3)
+        second = self.book(self.rooms[1], 2, 1)
+        self.assertIndexMatchesSql()
+
+        def move():
+            first.room = self.rooms[1]
+            first.check_in = self.today + timedelta(days=5)
+            first.check_out = self.today + timedelta(days=7)
+            first.save()
+
+        self.committed(move)
+        self.assertIndexMatchesSql()
+
+        second.status = Booking.Status.CANCELLED
+        self.committed(second.save)
+        self.assertIndexMatchesSql()
+
+        self.committed(first.delete)
+        self.assertIndexMatchesSql()
+
+    def test_payment_saves_leave_the_version_alone(self):
+        booking = self.book(self.rooms[0], 1, 2)
+        version = _cache_version()
+        self.committed(lambda: Payment.objects.create(booking=booking, amount=500))
+        self.committed(booking.save)                    # nothing changed
+        self.assertEqual(_cache_version(), version)
+
+        booking.status = Booking.Status.CHECKED_IN
+        self.committed(booking.save)
+        self.assertEqual(_cache_version(), version + 1)
+        self.assertIndexMatchesSql()
+
+
+class InvoiceKeyTests(TestCase):
+    """Invoice PDF cache keys follow everything the invoice prints, without extra queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Deluxe")
+        room = Room.objects.create(room_number="101", category=cls.category, price=1000)
+        guest = Guest.objects.create(full_name="Test Guest", phone_number="8801711111111")
+        today = timezone.localdate()
+        cls.booking = Booking.objects.create(
+            guest=guest, room=room, check_in=today, check_out=today + timedelta(days=2),
+        )
+        Payment.objects.create(booking=cls.booking, amount=500)
+
+    def keys(self):
+        booking = (
+            Booking.objects.select_related("guest", "room", "room__category")
+            .prefetch_related("payments").get(pk=self.booking.pk)
+        )
+        payment = booking.payments.all()[0]
+        site_settings = get_site_settings()
+        with self.assertNumQueries(0):
+            return (
+                invoices.summary_key(booking, site_settings),
+                invoices.payment_key(payment, site_settings),
+            )
+
+    def test_category_rename_changes_keys(self):
+        before = self.keys()
+        self.category.name = "Premium Deluxe"
+        self.category.save()
+        after = self.keys()
+        self.assertNotEqual(after[0], before[0])
+        self.assertNotEqual(after[1], before[1])
+        self.assertEqual(self.keys(), after)
@@ -48,6 +48,8 @@
 
     # report
     path("reports/summary/", views_reports.ReportSummaryPage.as_view(), name="report_summary"),
+    path("reports/summary/api/", views_reports.ReportSummaryAPI.as_view(), name="report_summary_api"),
+    path("reports/summary/export/", views_reports.ReportSummaryExportView.as_view(), name="report_summary_export"),
 
 
 
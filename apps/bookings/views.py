@@ -6,6 +6,7 @@
 
 from web_project import TemplateLayout, TemplateHelper
 from apps.core.guards import RequireAnyRoleMixin
+from apps.core.pagination import KeysetPaginationMixin
 from apps.core.roles import ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN
 
 from .models import Booking
@@ -130,15 +131,14 @@
 from apps.bookings.forms import BookingForm
 
 # ✅ SMS + site meta helpers
-from apps.core.sms import send_sms_jbd, normalize_bd_mobile
+from apps.core.models import SmsLog
+from apps.core.outbox import enqueue_sms
+from apps.core.sms import normalize_bd_mobile
 from apps.core.site_meta import get_hotel_meta
 
 logger = logging.getLogger(__name__)
 
 
-from apps.core.sms_log import log_sms
-
-
 
 
 @method_decorator(login_required, name="dispatch")
@@ -182,7 +182,7 @@ def form_valid(self, form):
         obj = form.save(commit=False, request_user=self.request.user)
         obj.save()
 
-        # 2) Try to send SMS (non-blocking)
+        # 2) Queue SMS (non-blocking)
         try:
             guest = getattr(obj, "guest", None)
             mobile = getattr(guest, "phone_number", None)
@@ -215,30 +215,16 @@ def form_valid(self, form):
                     f"Thank you."
                 )
 
-                resp = send_sms_jbd(m01, msg)
-                ok = isinstance(resp, str) and resp.upper().startswith("SENT")
-
-                # ✅ Persist log (so you can always see when it went)
-                try:
-                    log_sms(to=m01, body=msg, result=str(resp), context="CREATED", booking_id=obj.pk)
-                except Exception:
-                    # logging failure must not break flow
-                    logger.debug("SmsLog save failed for booking_id=%s", obj.pk, exc_info=True)
-
-                if ok:
-                    # ts = timezone.now().strftime("%d %b %Y, %I:%M %p")
-                    # messages.success(self.request, f"📨 SMS sent to {m01} at {ts}.")
-                    ts = timezone.localtime().strftime("%d %b %Y, %I:%M %p")
-                    messages.success(self.request, f"📨 SMS sent to {m01} at {ts}.")
-
-                else:
-                    messages.warning(self.request, "⚠️ Booking saved, but SMS not sent.")
+                # queued; the sms_worker sends it and writes the SmsLog row
+                enqueue_sms(m01, msg, context=SmsLog.Kind.CREATED, booking_id=obj.pk)
+                ts = timezone.localtime().strftime("%d %b %Y, %I:%M %p")
+                messages.success(self.request, f"📨 SMS to {m01} queued at {ts}.")
             else:
                 messages.warning(self.request, "⚠️ Booking saved, but no valid guest mobile found.")
         except Exception as e:
             # Never block booking on SMS failure
-            messages.warning(self.request, f"⚠️ SMS sending failed. Booking saved. ({e})")
-            logger.exception("SMS sending failed for booking_id=%s", obj.pk)
+            messages.warning(self.request, f"⚠️ SMS could not be queued. Booking saved. ({e})")
+            logger.exception("SMS enqueue failed for booking_id=%s", obj.pk)
 
         # 3) Success flash for booking
         messages.success(self.request, "✅ Booking created successfully.")
@@ -275,11 +261,12 @@ def form_invalid(self, form):
 
 
 @method_decorator(login_required, name="dispatch")
-class BookingListPage(RequireAnyRoleMixin, ListView):
+class BookingListPage(RequireAnyRoleMixin, KeysetPaginationMixin, ListView):
     model = Booking
     template_name = "bookings/booking_list.html"
     context_object_name = "bookings"
     paginate_by = 25
+    keyset_ordering = ("-created_at", "-id")
     allowed_roles = (ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN)
 
     def _safe_parse_date(self, v):
@@ -420,9 +407,7 @@ def get_context_data(self, **kwargs):
         from apps.room.models import Room
         rooms = Room.objects.select_related("category").order_by("room_number")
 
-        params = self.request.GET.copy()
-        params.pop("page", None)
-        preserved_qs = params.urlencode()
+        preserved_qs = self.preserved_querystring()
 
         r = self.request
         ctx.update({
@@ -443,11 +428,12 @@ def get_context_data(self, **kwargs):
 
 
 
-import csv
-from django.http import HttpResponse
 from datetime import date as _date
 from django.utils.dateparse import parse_date as _parse_date
 
+from apps.core.export_jobs import TabularExport, export_or_enqueue
+from apps.core.exports import queryset_rows
+
 
 def _safe_parse_date(v):
     if v is None:
@@ -484,88 +470,93 @@ class BookingExportCSVView(RequireAnyRoleMixin, ListView):
 
     # reuse filter logic
     def get_queryset(self):
-        r = self.request
-        q_text = (r.GET.get("q") or "").strip()
-        room_id = (r.GET.get("room") or "").strip()
-        status  = (r.GET.get("status") or "").strip()
-
-        ci_start = _safe_parse_date(r.GET.get("ci_start"))
-        ci_end   = _safe_parse_date(r.GET.get("ci_end"))
-        co_start = _safe_parse_date(r.GET.get("co_start"))
-        co_end   = _safe_parse_date(r.GET.get("co_end"))
-
-        qs = (
-            Booking.objects
-            .select_related("guest", "room", "room__category")
-            .order_by("-created_at")
-        )
-
-        if q_text:
-            qs = qs.filter(
-                Q(guest__full_name__icontains=q_text) |
-                Q(room__room_number__icontains=q_text) |
-                Q(room__category__name__icontains=q_text)
-            )
-        if room_id:
-            qs = qs.filter(room_id=room_id)
-        if status:
-            qs = qs.filter(status=status)
-        if ci_start:
-            qs = qs.filter(check_in__gte=ci_start)
-        if ci_end:
-            qs = qs.filter(check_in__lte=ci_end)
-        if co_start:
-            qs = qs.filter(check_out__gte=co_start)
-        if co_end:
-            qs = qs.filter(check_out__lte=co_end)
-
-        return qs
+        return _export_bookings(self.request.GET)
+
+    EXPORT_HEADER = (
+        "ID", "Guest", "Phone", "Email",
+        "Room", "Category",
+        "Check In", "Check Out", "Nights",
+        "Nightly Rate", "Gross", "Discount", "Net", "Paid", "Due",
+        "Status", "Created At",
+    )
+    EXPORT_FIELDS = (
+        "id", "guest__full_name", "guest__phone_number", "guest__email",
+        "room__room_number", "room__category__name",
+        "check_in", "check_out", "nights",
+        "nightly_rate", "gross_amount", "discount_amount", "net_amount", "payment_amount", "due_amount",
+        "status", "created_at",
+    )
 
     def render_to_response(self, context, **response_kwargs):
-        qs = context["object_list"]
+        # streamed inline, or queued for the export worker above EXPORT_BACKGROUND_THRESHOLD rows
+        return export_or_enqueue(self.request, "bookings", booking_export(self.request.GET))
 
-        # Prepare response
-        filename = "bookings_export.csv"
-        resp = HttpResponse(content_type="text/csv; charset=utf-8")
-        resp["Content-Disposition"] = f'attachment; filename="{filename}"'
 
-        # Excel-friendly UTF-8 BOM
-        resp.write("\ufeff")
+def _export_bookings(params):
+    """Bookings for the export filters (same params as BookingListPage)."""
+    q_text = (params.get("q") or "").strip()
+    room_id = (params.get("room") or "").strip()
+    status  = (params.get("status") or "").strip()
 
-        writer = csv.writer(resp)
-        writer.writerow([
-            "ID", "Guest", "Phone", "Email",
-            "Room", "Category",
-            "Check In", "Check Out", "Nights",
-            "Nightly Rate", "Gross", "Discount", "Net", "Paid", "Due",
-            "Status", "Created At"
-        ])
+    ci_start = _safe_parse_date(params.get("ci_start"))
+    ci_end   = _safe_parse_date(params.get("ci_end"))
+    co_start = _safe_parse_date(params.get("co_start"))
+    co_end   = _safe_parse_date(params.get("co_end"))
 
-        for b in qs:
-            guest = b.guest.full_name if b.guest else ""
-            phone = getattr(b.guest, "phone_number", "") if b.guest else ""
-            email = getattr(b.guest, "email", "") if b.guest else ""
-            room_no = b.room.room_number if b.room else ""
-            cat = getattr(getattr(b.room, "category", None), "name", "") if b.room else ""
+    qs = (
+        Booking.objects
+        .select_related("guest", "room", "room__category")
+        .order_by("-created_at")
+    )
 
-            writer.writerow([
-                b.id,
-                guest, phone, email,
-                room_no, cat,
-                b.check_in.isoformat() if b.check_in else "",
-                b.check_out.isoformat() if b.check_out else "",
-                getattr(b, "nights", "") or "",
-                f"{(b.nightly_rate or 0):.2f}",
-                f"{(b.gross_amount or 0):.2f}",
-                f"{(b.discount_amount or 0):.2f}",
-                f"{(b.net_amount or 0):.2f}",
-                f"{(b.payment_amount or 0):.2f}",
-                f"{(b.due_amount or 0):.2f}",
-                b.status or "",
-                b.created_at.strftime("%Y-%m-%d %H:%M") if getattr(b, "created_at", None) else "",
-            ])
+    if q_text:
+        qs = qs.filter(
+            Q(guest__full_name__icontains=q_text) |
+            Q(room__room_number__icontains=q_text) |
+            Q(room__category__name__icontains=q_text)
+        )
+    if room_id:
+        qs = qs.filter(room_id=room_id)
+    if status:
+        qs = qs.filter(status=status)
+    if ci_start:
+        qs = qs.filter(check_in__gte=ci_start)
+    if ci_end:
+        qs = qs.filter(check_in__lte=ci_end)
+    if co_start:
+        qs = qs.filter(check_out__gte=co_start)
+    if co_end:
+        qs = qs.filter(check_out__lte=co_end)
+
+    return qs
+
+
+def booking_export(params) -> TabularExport:
+    """Bookings export spec (view and `export_worker`)."""
+    # streamed: values_list projection + iterator, never the full list in memory
+    qs = _export_bookings(params).select_related(None)
+
+    def rows():
+        for (bid, guest, phone, email, room_no, cat, ci, co, nights,
+             rate, gross, disc, net, paid, due, status, created) in queryset_rows(qs, BookingExportCSVView.EXPORT_FIELDS):
+            yield [
+                bid,
+                guest or "", phone or "", email or "",
+                room_no or "", cat or "",
+                ci.isoformat() if ci else "",
+                co.isoformat() if co else "",
+                nights or "",
+                f"{(rate or 0):.2f}",
+                f"{(gross or 0):.2f}",
+                f"{(disc or 0):.2f}",
+                f"{(net or 0):.2f}",
+                f"{(paid or 0):.2f}",
+                f"{(due or 0):.2f}",
+                status or "",
+                created.strftime("%Y-%m-%d %H:%M") if created else "",
+            ]
 
-        return resp
+    return TabularExport("bookings_export", BookingExportCSVView.EXPORT_HEADER, rows, qs.count, title="Bookings")
 
 
 
@@ -785,7 +776,7 @@ def form_invalid(self, form):
 from .models import Booking, Payment
 
 # 🔔 add these imports
-from apps.core.sms import send_sms_jbd, normalize_bd_mobile
+from apps.core.sms import normalize_bd_mobile
 from apps.core.site_meta import get_hotel_meta
 from django.conf import settings
 from datetime import datetime
@@ -1031,22 +1022,10 @@ def checkout_booking(request, pk: int):
 
             if m01:
                 msg  = _compose_payment_sms(booking, paid_now=int(amount or 0))
-                resp = send_sms_jbd(m01, msg)
-
-                ok = False
-                if isinstance(resp, str):
-                    s = resp.upper()
-                    ok = s.startswith("SENT") or s.startswith("OK") or ("SUCCESS" in s)
-                elif isinstance(resp, dict):
-                    ok = resp.get("ok") is True or str(resp.get("status","")).upper() in {"SENT","OK","SUCCESS"}
-
-                sms_result = {"sent": ok, "detail": str(resp)}
-
-                # ✅ commit হওয়ার পর লগ সেভ (rollback-safe)
-                transaction.on_commit(lambda: log_sms(
-                    to=m01, body=msg, result=str(resp),
-                    context="Payment/Checkout", booking_id=booking.pk, provider="JBDSMS"
-                ))
+                # queued inside the transaction: no gateway call while it is open,
+                # dropped on rollback; the sms_worker sends it and logs to SmsLog
+                enqueue_sms(m01, msg, context=SmsLog.Kind.PAYMENT, booking_id=booking.pk)
+                sms_result = {"sent": False, "queued": True, "detail": "queued"}
             else:
                 sms_result = {"sent": False, "detail": "invalid_or_missing_mobile"}
     except Exception as e:
@@ -1140,6 +1119,7 @@ def get_context_data(self, **kwargs):
 from web_project import TemplateLayout, TemplateHelper
 from apps.room.models import Room, Category
 from apps.bookings.models import Booking
+from apps.bookings.occupancy import occupancy_index
 
 class RoomSearchView(View):
     template_name = "home.html"
@@ -1163,11 +1143,10 @@ def get(self, request):
             if category_id:
                 rooms = rooms.filter(category_id=category_id)
 
-            # ❗ exclude overlapping bookings
-            rooms = rooms.exclude(
-                bookings__check_in__lt=check_out,
-                bookings__check_out__gt=check_in
-            ).distinct()
+            # ❗ exclude rooms busy in [check_in, check_out)
+            cin, cout = _parse_date(check_in), _parse_date(check_out)
+            if cin and cout and cout > cin:
+                rooms = rooms.exclude(id__in=occupancy_index.busy_room_ids(cin, cout))
 
         # sort = request.GET.get("sort", "price")
         # if sort == "price":
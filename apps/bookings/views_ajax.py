@@ -2,6 +2,7 @@
 
 from datetime import timedelta
 
+from asgiref.sync import sync_to_async
 from django.http import JsonResponse
 from django.views import View
 from django.views.decorators.http import require_POST
@@ -10,16 +11,17 @@
 from django.utils.dateparse import parse_date
 from django.shortcuts import get_object_or_404
 from django.db import transaction
-from django.db.models import Q
 
-from apps.core.guards import RequireAnyRoleMixin
+from apps.core.guards import AsyncRequireAnyRoleMixin
 from apps.core.roles import (
     ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN, ROLE_GUEST
 )
+from apps.core.versioning import etag_versions
 
-from apps.guests.models import Guest
+from apps.guests import search as guest_search
 from apps.room.models import Room
 from .models import Booking
+from .occupancy import occupancy_index
 from .forms import PaymentForm
 
 
@@ -27,23 +29,16 @@
 # 🔍 Guest Search (GET ?q=)
 # -------------------------------------------------------------------
 @method_decorator(login_required, name="dispatch")
-class GuestSearchAPI(RequireAnyRoleMixin, View):
+class GuestSearchAPI(AsyncRequireAnyRoleMixin, View):
     allowed_roles = (ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN)
 
-    def get(self, request):
+    async def get(self, request):
         q = (request.GET.get("q") or "").strip()
         if not q:
             return JsonResponse({"results": []})
 
-        qs = (
-            Guest.objects
-            .filter(
-                Q(full_name__icontains=q) |
-                Q(phone_number__icontains=q) |
-                Q(email__icontains=q)
-            )
-            .order_by("full_name")[:10]
-        )
+        # index-backed (FTS5 / pg_trgm, raw SQL), see apps/guests/search.py
+        qs = await sync_to_async(guest_search.get_backend().typeahead)(q, limit=10)
         data = [
             {
                 "id": g.id,
@@ -62,16 +57,16 @@ def get(self, request):
 # 🏠 Room Info (GET ?id=<room_id>)
 # -------------------------------------------------------------------
 @method_decorator(login_required, name="dispatch")
-class RoomInfoAPI(RequireAnyRoleMixin, View):
+class RoomInfoAPI(AsyncRequireAnyRoleMixin, View):
     allowed_roles = (ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN)
 
-    def get(self, request):
+    async def get(self, request):
         rid = request.GET.get("id")
         if not rid:
             return JsonResponse({"error": "missing_room_id"}, status=400)
 
         try:
-            r = Room.objects.select_related("category").get(pk=rid)
+            r = await Room.objects.select_related("category").aget(pk=rid)
         except Room.DoesNotExist:
             return JsonResponse({"error": "room_not_found"}, status=404)
 
@@ -92,10 +87,10 @@ def get(self, request):
 # CANCELLED বুকিংগুলো availability ব্লক করবে না।
 # -------------------------------------------------------------------
 @method_decorator(login_required, name="dispatch")
-class RoomAvailabilityAPI(RequireAnyRoleMixin, View):
+class RoomAvailabilityAPI(AsyncRequireAnyRoleMixin, View):
     allowed_roles = (ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN, ROLE_GUEST)
 
-    def get(self, request):
+    async def get(self, request):
         rid_raw    = request.GET.get("room")
         cin_s      = request.GET.get("in")
         cout_s     = request.GET.get("out")
@@ -117,16 +112,8 @@ def get(self, request):
         if cout <= cin:
             cout = cin + timedelta(days=1)
 
-        qs = (
-            Booking.objects
-            .filter(room_id=rid)
-            .exclude(status=Booking.Status.CANCELLED)
-            .filter(check_in__lt=cout, check_out__gt=cin)
-        )
-        if exclude_id:
-            qs = qs.exclude(pk=exclude_id)
-
-        conflicts = list(qs.values_list("id", flat=True))
+        # in-memory occupancy index (SQL fallback outside its horizon)
+        conflicts = await sync_to_async(occupancy_index.conflicts)(rid, cin, cout, exclude_booking_id=exclude_id)
         return JsonResponse({"available": len(conflicts) == 0, "conflicts": conflicts})
 
 
@@ -193,7 +180,8 @@ def get(self, request):
 
 
 @method_decorator(login_required, name="dispatch")
-class AvailableRoomsAPI(RequireAnyRoleMixin, View):
+@method_decorator(etag_versions("bookings", "rooms"), name="get")
+class AvailableRoomsAPI(AsyncRequireAnyRoleMixin, View):
     """
     GET ?in=YYYY-MM-DD&out=YYYY-MM-DD[&exclude=<booking_id>]
     Returns ALL rooms with a 'disabled' flag.
@@ -202,7 +190,7 @@ class AvailableRoomsAPI(RequireAnyRoleMixin, View):
     """
     allowed_roles = (ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN)
 
-    def get(self, request):
+    async def get(self, request):
         cin_s      = request.GET.get("in")
         cout_s     = request.GET.get("out")
         exclude_id = request.GET.get("exclude")
@@ -217,16 +205,8 @@ def get(self, request):
             from datetime import timedelta
             cout = cin + timedelta(days=1)
 
-        # Bookings that block the window
-        busy_qs = (
-            Booking.objects
-            .exclude(status=Booking.Status.CANCELLED)
-            .filter(check_in__lt=cout, check_out__gt=cin)
-        )
-        if exclude_id:
-            busy_qs = busy_qs.exclude(pk=exclude_id)
-
-        busy_room_ids = set(busy_qs.values_list("room_id", flat=True))
+        # Rooms blocked in the window (in-memory occupancy index)
+        busy_room_ids = await sync_to_async(occupancy_index.busy_room_ids)(cin, cout, exclude_booking_id=exclude_id)
 
         rooms = (
             Room.objects
@@ -235,7 +215,7 @@ def get(self, request):
         )
 
         results = []
-        for r in rooms:
+        async for r in rooms:
             rate = int(getattr(r, "price", 0) or 0)
             label = f"{r.room_number} — {getattr(r.category, 'name', '') or '—'} — {rate}"
             results.append({
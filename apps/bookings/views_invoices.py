@@ -77,15 +77,26 @@ def booking_invoice_summary(request, pk: int):
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404, render
 from web_project import TemplateHelper
+from apps.core import pdf
+from . import invoices
 from .models import Booking
 
 @login_required
 def booking_invoice_summary(request, pk: int):
     booking = get_object_or_404(
-        Booking.objects.select_related("guest", "room", "room__category"),
+        Booking.objects.select_related("guest", "room", "room__category").prefetch_related("payments"),
         pk=pk
     )
 
+    # ?format=pdf: server-rendered PDF, cached until the booking (or its payments) change
+    if request.GET.get("format") == "pdf":
+        return pdf.pdf_response(
+            invoices.SUMMARY_PDF_TEMPLATE,
+            lambda: invoices.summary_context(booking),
+            key=invoices.summary_key(booking),
+            filename=f"Invoice_Booking_{booking.pk}.pdf",
+        )
+
     # Build context; site_settings will come from your context processor
     ctx = {
         "layout_path": TemplateHelper.set_layout("layout_blank.html", {}),  # print-friendly
@@ -9,6 +9,7 @@
 from django.urls import reverse, reverse_lazy
 from django.views.decorators.http import require_POST
 from apps.core.guards import RequireAnyRoleMixin
+from apps.core.pagination import KeysetPaginationMixin
 from apps.core.roles import ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN
 from web_project import TemplateLayout, TemplateHelper
 from apps.room.models import Room
@@ -16,18 +17,13 @@
 from .models import Payment
 from .forms import PaymentEditForm
 
-def _preserve_qs(request):
-    qs = request.GET.urlencode()
-    return qs
-
-
-
 @method_decorator(login_required, name="dispatch")
-class PaymentListPage(RequireAnyRoleMixin, ListView):
+class PaymentListPage(RequireAnyRoleMixin, KeysetPaginationMixin, ListView):
     model = Payment
     template_name = "payments/payment_list.html"
     context_object_name = "payments"
     paginate_by = 25
+    keyset_ordering = ("-received_at", "-id")
     allowed_roles = (ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN)
 
     def get_queryset(self):
@@ -69,7 +65,7 @@ def get_context_data(self, **kwargs):
         ctx.update({
             "layout_path": TemplateHelper.set_layout("layout_vertical.html", ctx),
             "page_title": "Payments History",
-            "preserved_qs": _preserve_qs(self.request),
+            "preserved_qs": self.preserved_querystring(),
             "rooms": rooms,                                     # 👈 pass to template
             "filter_values": {
                 "q": self.request.GET.get("q", ""),
@@ -159,6 +155,8 @@ def payment_delete(request, pk: int):
 from django.shortcuts import get_object_or_404, render
 from web_project import TemplateLayout, TemplateHelper
 
+from apps.core import pdf
+from . import invoices
 from .models import Payment
 
 @login_required
@@ -168,6 +166,16 @@ def payment_invoice(request, pk: int):
         pk=pk,
     )
 
+    # ?format=pdf: server-rendered receipt, cached until the payment or booking change
+    if request.GET.get("format") == "pdf":
+        return pdf.pdf_response(
+            invoices.PAYMENT_PDF_TEMPLATE,
+            lambda: invoices.payment_context(payment),
+            key=invoices.payment_key(payment),
+            filename=f"Invoice_{payment.pk}.pdf",
+            as_attachment=True,
+        )
+
     # TemplateLayout.init expects an object that has `.request`
     wrapper = SimpleNamespace(request=request)
 
@@ -1,19 +1,20 @@
 # apps/bookings/views_reports.py
-from datetime import date, timedelta, datetime, time
+from datetime import date, timedelta
 
-from django.db.models import Sum, Count
+from django.http import JsonResponse
 from django.utils.dateparse import parse_date
 from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required
-from django.views.generic import TemplateView
+from django.views.generic import TemplateView, View
 
 from apps.core.guards import RequireAnyRoleMixin
 from apps.core.roles import ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN
 from web_project import TemplateLayout, TemplateHelper
 
-from apps.guests.models import Guest
-from apps.room.models import Room
-from .models import Booking, Payment
+from apps.core.export_jobs import TabularExport, export_or_enqueue
+from apps.core.exports import queryset_rows
+
+from .reports import summary_report, window_bookings
 
 import re
 
@@ -52,14 +53,18 @@ def _parse_flexible_date(s: str):
 
 
 def _default_dates(request):
+    return _dates_from_params(request.GET)
+
+
+def _dates_from_params(params):
     """
     Returns (df, dt) as date objects.
     Default window: last 7 days including today, if no valid query is given.
     """
     today = date.today()
 
-    df_raw = (request.GET.get("from") or "").strip()
-    dt_raw = (request.GET.get("to") or "").strip()
+    df_raw = (params.get("from") or "").strip()
+    dt_raw = (params.get("to") or "").strip()
 
     df = _parse_flexible_date(df_raw)
     dt = _parse_flexible_date(dt_raw)
@@ -85,25 +90,6 @@ def _default_dates(request):
     return df, dt
 
 
-def _day_start(d: date) -> datetime:
-    return datetime.combine(d, time.min)
-
-
-def _day_end(d: date) -> datetime:
-    return datetime.combine(d, time.max)
-
-
-def _safe_guest_created_q(date_from, date_to):
-    """
-    Try commonly used timestamp fields on Guest for 'new registrations'.
-    Works for DateField or DateTimeField without using '__date'.
-    """
-    fields = {f.name for f in Guest._meta.get_fields()}
-    for fname in ["created_at", "created", "date_joined", "joined_at", "added_on", "updated_at"]:
-        if fname in fields:
-            return {f"{fname}__gte": _day_start(date_from), f"{fname}__lte": _day_end(date_to)}
-    return {}
-
 # -----------------------------
 # Report page
 # -----------------------------
@@ -118,68 +104,91 @@ def get_context_data(self, **kwargs):
         ctx = TemplateLayout.init(self, super().get_context_data(**kwargs))
 
         df, dt = _default_dates(self.request)
+        report = summary_report(df, dt, page=self.request.GET.get("page"))
 
-        # --- Bookings in window ---
-        # Business rule: booking belongs to window if its check_in is within [df, dt]
-        booking_qs = (
-            Booking.objects
-            .select_related("guest", "room", "room__category")
-            .filter(check_in__gte=df, check_in__lte=dt)
-            .order_by("-check_in", "-id")
-        )
-        # যদি overlap logic চাও: .filter(check_in__lte=dt, check_out__gte=df)
-
-        # --- Payments in window ---
-        payment_qs = Payment.objects.filter(
-            received_at__gte=_day_start(df),
-            received_at__lte=_day_end(dt),
-        )
-
-        # KPI aggregates (guard None -> 0)
-        total_bookings = booking_qs.count()
-        sum_net        = booking_qs.aggregate(s=Sum("net_amount"))["s"] or 0
-        sum_discount   = booking_qs.aggregate(s=Sum("discount_amount"))["s"] or 0
-        sum_due        = booking_qs.aggregate(s=Sum("due_amount"))["s"] or 0
-
-        sum_received   = payment_qs.aggregate(s=Sum("amount"))["s"] or 0
-        total_invoices = payment_qs.count()
-
-        # New guests (defensive on field name & type)
-        gf = _safe_guest_created_q(df, dt)
-        new_guests = Guest.objects.filter(**gf).count() if gf else 0
-
-        # Per-room rollup
-        per_room = (
-            booking_qs
-            .values("room_id", "room__room_number", "room__category__name")
-            .annotate(
-                bookings=Count("id"),
-                net=Sum("net_amount"),
-                received=Sum("payment_amount"),
-                due=Sum("due_amount"),
-            )
-            .order_by("room__room_number")
-        )
-
-        rooms = Room.objects.select_related("category").order_by("room_number")
-
+        qs = self.request.GET.copy()
+        qs.pop("page", None)
         ctx.update({
             "layout_path": TemplateHelper.set_layout("layout_vertical.html", ctx),
             "page_title": "Reports — Summary",
             "date_from": df,
             "date_to": dt,
-            "rooms": rooms,
-            "kpi": {
-                "new_guests": int(new_guests),
-                "total_bookings": int(total_bookings),
-                "total_invoices": int(total_invoices),
-                "sum_net": int(sum_net),
-                "sum_discount": int(sum_discount),
-                "sum_received": int(sum_received),
-                "sum_due": int(sum_due),
-            },
-            "bookings": booking_qs,
-            "per_room": per_room,
-            "preserved_qs": self.request.GET.urlencode(),
+            "report": report,
+            "kpi": report.kpi,
+            "per_room": report.per_room,
+            "page_obj": report.page,
+            "page_range": report.page.paginator.get_elided_page_range(report.page.number),
+            "bookings": report.page.object_list,
+            "preserved_qs": qs.urlencode(),
         })
         return ctx
+
+
+@method_decorator(login_required, name="dispatch")
+class ReportSummaryAPI(RequireAnyRoleMixin, View):
+    """Same report as JSON: ?from=&to=&page="""
+    allowed_roles = (ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN)
+
+    def get(self, request):
+        df, dt = _default_dates(request)
+        report = summary_report(df, dt, page=request.GET.get("page"))
+        return JsonResponse(report.as_dict())
+
+
+# -----------------------------
+# Export (CSV / XLSX)
+# -----------------------------
+
+@method_decorator(login_required, name="dispatch")
+class ReportSummaryExportView(RequireAnyRoleMixin, View):
+    """KPIs, per-room totals and every booking of the window; ?from=&to=&format=xlsx"""
+    allowed_roles = (ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN)
+
+    def get(self, request):
+        # queued for the export worker above EXPORT_BACKGROUND_THRESHOLD rows
+        return export_or_enqueue(request, "report_summary", report_summary_export(request.GET))
+
+
+def report_summary_export(params) -> TabularExport:
+    df, dt = _dates_from_params(params)
+    detail = window_bookings(df, dt).order_by("-check_in", "-id")
+    fields = (
+        "id", "check_in", "check_out", "room__room_number", "room__category__name",
+        "guest__full_name", "status", "net_amount", "payment_amount", "due_amount",
+    )
+
+    def rows():
+        report = summary_report(df, dt)
+        kpi = report.kpi
+        yield ["Summary", df.isoformat(), dt.isoformat()]
+        for label, value in (
+            ("New guests", kpi.new_guests),
+            ("Bookings", kpi.total_bookings),
+            ("Invoices", kpi.total_invoices),
+            ("Net", kpi.sum_net),
+            ("Discount", kpi.sum_discount),
+            ("Received", kpi.sum_received),
+            ("Due", kpi.sum_due),
+            ("Room nights", kpi.room_nights),
+            ("Room night revenue", kpi.room_night_revenue),
+            ("Occupancy %", kpi.occupancy_pct),
+        ):
+            yield [label, value]
+
+        yield []
+        yield ["Room", "Category", "Bookings", "Net", "Discount", "Received", "Due"]
+        for r in report.per_room:
+            yield [r.room_number, r.category, r.bookings, r.net, r.discount, r.received, r.due]
+
+        yield []
+        yield ["ID", "Check In", "Check Out", "Room", "Category", "Guest", "Status", "Net", "Paid", "Due"]
+        for bid, ci, co, room_no, cat, guest, status, net, paid, due in queryset_rows(detail, fields):
+            yield [
+                bid,
+                ci.isoformat() if ci else "",
+                co.isoformat() if co else "",
+                room_no or "", cat or "", guest or "", status or "",
+                int(net or 0), int(paid or 0), int(due or 0),
+            ]
+
+    return TabularExport(f"report_summary_{df}_{dt}", None, rows, detail.count, title="Summary")
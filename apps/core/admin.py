@@ -1,7 +1,20 @@
 from django.contrib import admin
-from .models import SmsLog
+from .models import ExportJob, SmsLog, SmsOutbox
 @admin.register(SmsLog)
 class SmsLogAdmin(admin.ModelAdmin):
     list_display = ("created_at", "to", "result", "context", "booking_id")
     search_fields = ("to", "body", "result")
     list_filter = ("context", "provider")
+
+@admin.register(SmsOutbox)
+class SmsOutboxAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "to", "status", "attempts", "next_attempt_at", "context", "booking_id", "last_error")
+    search_fields = ("to", "body", "last_error")
+    list_filter = ("status", "context")
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "created_by", "rows_written", "rows_total", "size", "created_at", "finished_at", "expires_at")
+    list_filter = ("status", "kind")
+    search_fields = ("kind", "error", "created_by__phone_number")
+    readonly_fields = ("claimed_by", "started_at", "heartbeat_at", "finished_at")
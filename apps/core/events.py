@@ -0,0 +1,219 @@
+# apps/core/events.py
+"""
+Live front-desk events, pushed to browsers over server-sent events.
+
+Booking / payment signals publish small deltas once the write commits:
+
+    booking.created   booking.updated   booking.status   room.freed
+    payment.added
+
+and every open dashboard / room overview tab receives them on one long-lived
+GET (core:live_events), instead of each terminal polling the pulse and
+availability APIs on a timer.
+
+Brokers (EVENTS_BROKER_URL):
+    ""              in-process fan-out (default). Each worker process only
+                    sees events published by itself: fine for a single
+                    ASGI worker, use Redis for more.
+    "redis://..."   Redis (or any server speaking its pub/sub protocol);
+                    needs the optional `redis` package.
+
+Every event carries an increasing id. A reconnecting EventSource sends
+Last-Event-ID; the in-process broker replays the last EVENTS_REPLAY events
+from its buffer, and when that is not enough (or with Redis) the client gets
+a "resync" event telling it to refetch in full. A subscriber that falls more
+than EVENTS_QUEUE_SIZE events behind is resynced the same way.
+
+The stream holds its connection open: serve it through config.asgi.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+EVENTS_BROKER_URL = getattr(settings, "EVENTS_BROKER_URL", "")
+EVENTS_CHANNEL = getattr(settings, "EVENTS_CHANNEL", "hotel:live")
+EVENTS_QUEUE_SIZE = getattr(settings, "EVENTS_QUEUE_SIZE", 256)
+EVENTS_REPLAY = getattr(settings, "EVENTS_REPLAY", 200)
+
+RESYNC = "resync"
+
+
+def format_sse(event: dict | None) -> str:
+    """One SSE frame; None -> heartbeat comment."""
+    if event is None:
+        return ": ping\n\n"
+    data = json.dumps(event.get("data") or {}, separators=(",", ":"), default=str)
+    head = f"id: {event['id']}\n" if event.get("id") is not None else ""
+    return f"{head}event: {event['type']}\ndata: {data}\n\n"
+
+
+# ---------- in-process ----------
+class _Subscription:
+    """One stream's queue, owned by the event loop that created it."""
+    def __init__(self, broker, size):
+        self.broker = broker
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=size)
+
+    def offer(self, event):
+        """Called from any thread."""
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # too far behind: drop the backlog, tell the client to refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": RESYNC, "data": {"reason": "overflow"}})
+
+    async def get(self, timeout: float):
+        """Next event, or None after `timeout` seconds (time for a heartbeat)."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.broker._unsubscribe(self)
+
+
+class LocalBroker:
+    def __init__(self, replay=EVENTS_REPLAY, queue_size=EVENTS_QUEUE_SIZE):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._recent = deque(maxlen=replay)
+        self._subs = set()
+        self.queue_size = queue_size
+
+    def publish(self, type_: str, data: dict) -> dict:
+        with self._lock:
+            event = {"id": next(self._ids), "type": type_, "data": data}
+            self._recent.append(event)
+            subs = list(self._subs)
+        for sub in subs:
+            try:
+                sub.offer(event)
+            except RuntimeError:          # its loop is gone
+                self._unsubscribe(sub)
+        return event
+
+    def subscribe(self, last_event_id=None) -> _Subscription:
+        """Must be called from the event loop that will read the stream."""
+        sub = _Subscription(self, self.queue_size)
+        with self._lock:
+            self._subs.add(sub)
+            backlog = self._backlog(last_event_id)
+        for event in backlog:
+            sub._put(event)
+        return sub
+
+    def _backlog(self, last_event_id):
+        if last_event_id is None:
+            return []
+        recent = list(self._recent)
+        newest = recent[-1]["id"] if recent else 0
+        if last_event_id > newest:
+            # ids from before a restart: nothing here relates to them
+            return [{"type": RESYNC, "data": {"reason": "restart"}}]
+        missed = [e for e in recent if e["id"] > last_event_id]
+        if missed and missed[0]["id"] != last_event_id + 1:
+            return [{"type": RESYNC, "data": {"reason": "gap"}}]
+        return missed
+
+    def _unsubscribe(self, sub):
+        with self._lock:
+            self._subs.discard(sub)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subs)
+
+
+# ---------- redis ----------
+class _RedisSubscription:
+    def __init__(self, broker, last_event_id):
+        self.broker = broker
+        self.pubsub = None
+        self.pending = deque()
+        if last_event_id is not None:
+            self.pending.append({"type": RESYNC, "data": {"reason": "reconnect"}})
+
+    async def get(self, timeout: float):
+        if self.pending:
+            return self.pending.popleft()
+        msg = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if msg is None:
+            return None
+        return json.loads(msg["data"])
+
+    async def __aenter__(self):
+        self.pubsub = self.broker.async_client().pubsub()
+        await self.pubsub.subscribe(self.broker.channel)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.pubsub.unsubscribe(self.broker.channel)
+        await self.pubsub.aclose()
+
+
+class RedisBroker:
+    def __init__(self, url, channel=EVENTS_CHANNEL):
+        try:
+            import redis  # optional dependency
+        except ImportError as e:
+            raise ImproperlyConfigured("EVENTS_BROKER_URL points at Redis; install the `redis` package.") from e
+        self._redis = redis
+        self.url = url
+        self.channel = channel
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, type_: str, data: dict) -> dict:
+        event = {"id": self._client.incr(f"{self.channel}:seq"), "type": type_, "data": data}
+        self._client.publish(self.channel, json.dumps(event, default=str))
+        return event
+
+    def async_client(self):
+        return self._redis.asyncio.Redis.from_url(self.url)
+
+    def subscribe(self, last_event_id=None) -> _RedisSubscription:
+        return _RedisSubscription(self, last_event_id)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = RedisBroker(EVENTS_BROKER_URL) if EVENTS_BROKER_URL else LocalBroker()
+    return _broker
+
+
+def publish(type_: str, data: dict):
+    """Publish now; a broker failure is logged, never raised into the request."""
+    try:
+        return get_broker().publish(type_, data)
+    except Exception:
+        logger.exception("live event %s not published", type_)
+        return None
+
+
+def publish_on_commit(type_: str, data: dict, using=None):
+    transaction.on_commit(lambda: publish(type_, data), using=using)
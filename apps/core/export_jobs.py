@@ -0,0 +1,307 @@
+# apps/core/export_jobs.py
+"""
+Background exports: large exports run in `manage.py export_worker`
+instead of tying up a web worker.
+
+Each export view describes its output with a spec built from the GET
+params alone (so the worker can rebuild it later):
+
+    TabularExport(basename, header, rows, count)    CSV, or XLSX with ?format=xlsx
+    PdfExport(template, context, key, filename, count)
+    FileExport(filename, write, count)               any other file
+
+and returns `export_or_enqueue(request, kind, spec)`. Below
+EXPORT_BACKGROUND_THRESHOLD rows the export streams exactly as before;
+at or above it (or with ?background=1) an ExportJob is queued and the user
+is sent to the exports page, which polls progress (rows written, ETA) and
+links the download. ?background=0 forces the inline path.
+
+The worker claims one job at a time, writes the file to
+EXPORT_JOB_DIR/<random>/<name> (via a .part file) and updates progress
+about once a second. EXPORT_JOB_DIR is private, like PDF_CACHE_DIR: the
+files hold guest names and phones, so they are only ever handed out by
+the permission-checked core:export_job_download, never from MEDIA_ROOT.
+Files and rows are deleted EXPORT_JOB_TTL seconds after they finish; a
+job whose worker stopped reporting for EXPORT_JOB_STALE_SECONDS is
+picked up again.
+"""
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import JsonResponse, QueryDict
+from django.shortcuts import redirect
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import pdf
+from .exports import ChunkedFileResponse, csv_lines, export_response, write_xlsx
+from .models import ExportJob, export_storage
+from .roles import ROLE_ADMIN, ROLE_SUPER_ADMIN, in_any
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BACKGROUND_THRESHOLD = getattr(settings, "EXPORT_BACKGROUND_THRESHOLD", 20000)
+EXPORT_JOB_TTL = getattr(settings, "EXPORT_JOB_TTL", 24 * 3600)
+EXPORT_JOB_STALE_SECONDS = getattr(settings, "EXPORT_JOB_STALE_SECONDS", 30 * 60)
+EXPORT_JOB_DIR = Path(export_storage().location)
+LEGACY_EXPORT_DIR = Path(settings.MEDIA_ROOT) / "exports"     # publicly served; swept by cleanup_expired
+
+# kind -> builder(params: QueryDict) returning a TabularExport / PdfExport
+EXPORTERS = {
+    "bookings": "apps.bookings.views.booking_export",
+    "report_summary": "apps.bookings.views_reports.report_summary_export",
+    "ledger": "apps.finances.views.ledger_export",
+    "ledger_pdf": "apps.finances.views.ledger_pdf_export",
+    "sms_logs": "apps.accounts.views_smslog.sms_log_export",
+    "invoices": "apps.bookings.invoice_batch.invoice_export",
+}
+
+
+# ---------- export specs ----------
+class _Spec:
+    def __init__(self, count):
+        self._count_fn = count
+        self._count = None
+
+    @property
+    def total(self) -> int:
+        """Estimated row count (one COUNT query, cached)."""
+        if self._count is None:
+            self._count = self._count_fn()
+        return self._count
+
+
+class TabularExport(_Spec):
+    """A header and lazily produced rows: `rows` and `count` are callables."""
+    def __init__(self, basename, header, rows, count, title="Export"):
+        super().__init__(count)
+        self.basename, self.header, self.rows, self.title = basename, header, rows, title
+
+    def response(self, request):
+        return export_response(request, self.basename, self.header, self.rows(), title=self.title)
+
+    def filename(self, params):
+        return f"{self.basename}.{'xlsx' if _is_xlsx(params) else 'csv'}"
+
+    def write(self, fh, params, progress):
+        rows = _counted(self.rows(), progress)
+        if _is_xlsx(params):
+            write_xlsx(fh, self.header, rows, title=self.title)
+        else:
+            for chunk in csv_lines(self.header, rows):
+                fh.write(chunk.encode("utf-8"))
+
+
+class PdfExport(_Spec):
+    """A template rendered through the PDF cache (apps.core.pdf)."""
+    def __init__(self, template, context, key, filename, count):
+        super().__init__(count)
+        self.template, self.context, self.key, self._filename = template, context, key, filename
+
+    def response(self, request):
+        return pdf.pdf_response(self.template, self.context, key=self.key, filename=self._filename)
+
+    def filename(self, params):
+        return self._filename
+
+    def write(self, fh, params, progress):
+        path = pdf.cached_pdf(self.template, self.context, self.key)
+        if path is None:
+            raise RuntimeError("PDF generation failed.")
+        with open(path, "rb") as src:
+            shutil.copyfileobj(src, fh)
+        progress(self.total)
+
+
+class FileExport(_Spec):
+    """A file produced by `write(fh, progress)`; progress takes the items done so far."""
+    def __init__(self, filename, write, count):
+        super().__init__(count)
+        self._filename, self._write = filename, write
+
+    def response(self, request):
+        tmp = tempfile.TemporaryFile()
+        self._write(tmp, lambda n: None)
+        tmp.seek(0)
+        return ChunkedFileResponse(tmp, as_attachment=True, filename=self._filename)
+
+    def filename(self, params):
+        return self._filename
+
+    def write(self, fh, params, progress):
+        self._write(fh, progress)
+
+
+def _is_xlsx(params):
+    return (params.get("format") or "").lower() == "xlsx"
+
+
+def _counted(rows, progress, every=500):
+    n = 0
+    for n, row in enumerate(rows, 1):
+        yield row
+        if n % every == 0:
+            progress(n)
+    progress(n)
+
+
+def build(kind, params):
+    if kind not in EXPORTERS:
+        raise ValueError(f"Unknown export kind {kind!r}.")
+    return import_string(EXPORTERS[kind])(params)
+
+
+def _querydict(params) -> QueryDict:
+    qd = QueryDict(mutable=True)
+    for key, values in (params or {}).items():
+        qd.setlist(key, values)
+    return qd
+
+
+# ---------- request side ----------
+def enqueue(kind, params, user, total=None) -> ExportJob:
+    kept = {k: v for k, v in params.lists() if k != "background"}
+    return ExportJob.objects.create(kind=kind, params=kept, created_by=user, rows_total=total)
+
+
+def export_or_enqueue(request, kind, spec):
+    """Stream `spec` now, or queue it for the export worker when it is large."""
+    mode = request.GET.get("background")
+    if mode != "0" and request.user.is_authenticated:
+        if mode == "1" or spec.total >= EXPORT_BACKGROUND_THRESHOLD:
+            job = enqueue(kind, request.GET, request.user, total=spec.total)
+            if request.headers.get("x-requested-with") == "XMLHttpRequest":
+                return JsonResponse(job_payload(job), status=202)
+            return redirect(f"{reverse('core:export_jobs')}?job={job.pk}")
+    return spec.response(request)
+
+
+def visible_jobs(user):
+    qs = ExportJob.objects.select_related("created_by")
+    if user.is_superuser or in_any(getattr(user, "role", None), (ROLE_ADMIN, ROLE_SUPER_ADMIN)):
+        return qs
+    return qs.filter(created_by=user)
+
+
+def job_payload(job) -> dict:
+    done = job.status == ExportJob.Status.DONE
+    return {
+        "id": job.pk,
+        "kind": job.kind,
+        "status": job.status,
+        "status_display": job.get_status_display(),
+        "rows_written": job.rows_written,
+        "rows_total": job.rows_total,
+        "percent": job.percent,
+        "eta_seconds": job.eta_seconds,
+        "size": job.size,
+        "error": job.error,
+        "status_url": reverse("core:export_job_status", args=[job.pk]),
+        "download_url": reverse("core:export_job_download", args=[job.pk]) if done else None,
+        "expires_at": job.expires_at.isoformat() if job.expires_at else None,
+    }
+
+
+# ---------- worker side ----------
+def _claimable(now):
+    stale = now - timedelta(seconds=EXPORT_JOB_STALE_SECONDS)
+    return Q(status=ExportJob.Status.PENDING) | Q(status=ExportJob.Status.RUNNING, heartbeat_at__lt=stale)
+
+
+def claim() -> ExportJob | None:
+    """Atomically take the oldest queued job (or one whose worker went quiet)."""
+    token = uuid.uuid4().hex
+    now = timezone.now()
+    for pk in ExportJob.objects.filter(_claimable(now)).order_by("id").values_list("id", flat=True)[:5]:
+        # the condition is repeated so two workers can never claim the same job
+        claimed = ExportJob.objects.filter(_claimable(now), pk=pk).update(
+            status=ExportJob.Status.RUNNING, claimed_by=token,
+            started_at=now, heartbeat_at=now, rows_written=0, error="",
+        )
+        if claimed:
+            return ExportJob.objects.get(pk=pk)
+    return None
+
+
+class _Progress:
+    """Row counter written back to the job at most once per `interval` seconds."""
+    def __init__(self, job, interval=1.0):
+        self.job, self.interval, self.rows, self._last = job, interval, 0, 0.0
+
+    def __call__(self, rows):
+        self.rows = rows
+        if time.monotonic() - self._last >= self.interval:
+            self._last = time.monotonic()
+            ExportJob.objects.filter(pk=self.job.pk, claimed_by=self.job.claimed_by).update(
+                rows_written=rows, heartbeat_at=timezone.now(),
+            )
+
+
+def run(job) -> bool:
+    """Write the job's file; returns True when it finished."""
+    params = _querydict(job.params)
+    progress = _Progress(job)
+    tmp = None
+    try:
+        spec = build(job.kind, params)
+        name = f"{uuid.uuid4().hex}/{spec.filename(params)}"
+        path = EXPORT_JOB_DIR / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".part")
+        with open(tmp, "wb") as fh:
+            spec.write(fh, params, progress)
+        os.replace(tmp, path)
+    except Exception as e:
+        logger.exception("Export job %s (%s) failed", job.pk, job.kind)
+        if tmp is not None:
+            shutil.rmtree(tmp.parent, ignore_errors=True)
+        now = timezone.now()
+        ExportJob.objects.filter(pk=job.pk, claimed_by=job.claimed_by).update(
+            status=ExportJob.Status.FAILED, error=str(e)[:255],
+            finished_at=now, expires_at=now + timedelta(seconds=EXPORT_JOB_TTL),
+        )
+        return False
+
+    now = timezone.now()
+    ExportJob.objects.filter(pk=job.pk, claimed_by=job.claimed_by).update(
+        status=ExportJob.Status.DONE, file=name, size=path.stat().st_size,
+        rows_written=progress.rows, heartbeat_at=now, finished_at=now,
+        expires_at=now + timedelta(seconds=EXPORT_JOB_TTL),
+    )
+    return True
+
+
+def cleanup_expired(now=None) -> int:
+    """Delete expired jobs with their files, and export dirs no job points at."""
+    now = now or timezone.now()
+    removed = 0
+    for job in ExportJob.objects.filter(expires_at__lt=now).only("id", "file"):
+        if job.file:
+            shutil.rmtree(EXPORT_JOB_DIR / os.path.dirname(job.file.name), ignore_errors=True)
+        job.delete()
+        removed += 1
+
+    # leftovers of jobs a worker died on (re-run into a fresh dir) or rows deleted by hand
+    if EXPORT_JOB_DIR.is_dir():
+        cutoff = time.time() - EXPORT_JOB_TTL - EXPORT_JOB_STALE_SECONDS
+        live = {
+            os.path.dirname(name)
+            for name in ExportJob.objects.exclude(file="").values_list("file", flat=True)
+        }
+        for entry in EXPORT_JOB_DIR.iterdir():
+            if entry.is_dir() and entry.name not in live and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    # files written before exports moved out of MEDIA_ROOT
+    if LEGACY_EXPORT_DIR.is_dir():
+        shutil.rmtree(LEGACY_EXPORT_DIR, ignore_errors=True)
+    return removed
@@ -0,0 +1,120 @@
+# apps/core/exports.py
+"""
+Shared streaming export layer (CSV / XLSX).
+
+Exports take a header and an iterable of rows. Feed them from
+`queryset_rows()` (values_list + iterator) so nothing is materialized:
+CSV bytes start flowing with the first chunk and memory stays flat no
+matter how many rows there are. XLSX uses openpyxl's write-only mode,
+spooled to a temp file, then streamed back.
+"""
+import csv
+import tempfile
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = getattr(settings, "EXPORT_CHUNK_SIZE", 2000)
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class _ChunkedAsyncIteration:
+    """ASGI: read the sync iterator chunk by chunk (Django buffers it with list())."""
+    async def __aiter__(self):
+        if self.is_async:
+            async for part in self.streaming_content:
+                yield part
+            return
+        # thread-sensitive: the chunks run in the request's sync thread, on
+        # the DB connection (and server-side cursor) the view opened
+        chunks = iter(self.streaming_content)
+        while True:
+            part = await sync_to_async(next)(chunks, None)
+            if part is None:
+                return
+            yield part
+
+
+class ChunkedStreamingHttpResponse(_ChunkedAsyncIteration, StreamingHttpResponse):
+    pass
+
+
+class ChunkedFileResponse(_ChunkedAsyncIteration, FileResponse):
+    block_size = 64 * 1024   # one thread hop per block under ASGI
+
+
+class Echo:
+    """File-like object whose write() just hands the value back (for csv.writer)."""
+    def write(self, value):
+        return value
+
+
+def queryset_rows(qs, fields, chunk_size=None):
+    """values_list projection streamed with .iterator() (server-side cursor where supported)."""
+    return qs.values_list(*fields).iterator(chunk_size=chunk_size or EXPORT_CHUNK_SIZE)
+
+
+def csv_lines(header, rows, bom=True, lines_per_chunk=500):
+    """Encode rows as CSV text, yielded in chunks of `lines_per_chunk` lines."""
+    writer = csv.writer(Echo())
+    head = "\ufeff" if bom else ""  # Excel-friendly UTF-8 BOM
+    if header:
+        head += writer.writerow(header)
+    if head:
+        yield head
+    buf = []
+    for row in rows:
+        buf.append(writer.writerow(row))
+        if len(buf) >= lines_per_chunk:
+            yield "".join(buf)
+            buf = []
+    if buf:
+        yield "".join(buf)
+
+
+def stream_csv(filename, header, rows, bom=True) -> StreamingHttpResponse:
+    resp = ChunkedStreamingHttpResponse(csv_lines(header, rows, bom=bom), content_type="text/csv; charset=utf-8")
+    resp["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return resp
+
+
+def _xlsx_value(v):
+    # Excel has no time zones: aware datetimes go out as naive local time
+    if isinstance(v, datetime) and timezone.is_aware(v):
+        return timezone.make_naive(v)
+    return v
+
+
+def write_xlsx(fh, header, rows, title="Export"):
+    """Write rows to `fh` with a constant-memory (write-only) workbook."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=title[:31])
+    if header:
+        ws.append(list(header))
+    for row in rows:
+        ws.append([_xlsx_value(v) for v in row])
+    wb.save(fh)
+
+
+def stream_xlsx(filename, header, rows, title="Export"):
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        return HttpResponse("XLSX export needs openpyxl installed.", status=501, content_type="text/plain")
+
+    tmp = tempfile.TemporaryFile()
+    write_xlsx(tmp, header, rows, title=title)
+    tmp.seek(0)
+    return ChunkedFileResponse(tmp, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+
+
+def export_response(request, basename, header, rows, title="Export"):
+    """CSV by default; `?format=xlsx` switches to the XLSX writer."""
+    if (request.GET.get("format") or "").lower() == "xlsx":
+        return stream_xlsx(f"{basename}.xlsx", header, rows, title=title)
+    return stream_csv(f"{basename}.csv", header, rows)
@@ -105,6 +105,27 @@ def dispatch(self, request, *args, **kwargs):
         return _deny(request)
 
 
+class AsyncRequireAnyRoleMixin:
+    """
+    RequireAnyRoleMixin for views whose handlers are `async def`:
+      @method_decorator(login_required, name="dispatch")
+      class MyAPI(AsyncRequireAnyRoleMixin, View):
+          allowed_roles = ("receptionist", "manager")
+          async def get(self, request): ...
+    The user is loaded with request.auser(), never through the sync ORM.
+    """
+    allowed_roles: Iterable[str] = ()
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+        request.user = user  # loaded: later sync access (etag, templates) is query-free
+        if not user.is_authenticated:
+            return redirect("login")
+        if _is_super(user) or in_any(_user_role(user), self.allowed_roles):
+            return await super().dispatch(request, *args, **kwargs)
+        return _deny(request)
+
+
 class RequireMinRoleMixin:
     """
     Example:
@@ -120,3 +141,16 @@ def dispatch(self, request, *args, **kwargs):
         if _is_super(user) or at_least(_user_role(user), self.min_role):
             return super().dispatch(request, *args, **kwargs)
         return _deny(request)
+
+
+class RequireStaffMixin:
+    """
+    Allow only is_staff / is_superuser accounts (ops & diagnostics pages).
+    """
+    def dispatch(self, request, *args, **kwargs):
+        user = request.user
+        if not user.is_authenticated:
+            return redirect("login")
+        if _is_super(user) or getattr(user, "is_staff", False):
+            return super().dispatch(request, *args, **kwargs)
+        return _deny(request)
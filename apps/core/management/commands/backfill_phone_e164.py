@@ -0,0 +1,29 @@
+# apps/core/management/commands/backfill_phone_e164.py
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from apps.core.phone import backfill_phone_e164
+from apps.guests.models import Guest, GuestCompanion
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the canonical phone_e164 column of users, guests and companions "
+        "(after bulk imports or raw updates). Safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **opts):
+        for model in (get_user_model(), Guest, GuestCompanion):
+            t0 = time.perf_counter()
+            changed = backfill_phone_e164(model, batch_size=opts["batch_size"])
+            blank = model._default_manager.filter(phone_e164="").exclude(phone_number="").count()
+            self.stdout.write(
+                f"{model._meta.label}: {changed} updated in {time.perf_counter() - t0:.1f}s"
+                + (f", {blank} without a canonical form" if blank else "")
+            )
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,100 @@
+# apps/core/management/commands/bench_async.py
+import asyncio
+import statistics
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.http import JsonResponse
+from django.test import AsyncClient, override_settings
+from django.urls import path
+
+from apps.room.models import Room
+
+
+# ---- the two endpoints under test (mounted only while the benchmark runs) ----
+def _delay(request) -> float:
+    return float(request.GET.get("delay") or 0)
+
+
+def sync_endpoint(request):
+    time.sleep(_delay(request))           # slow downstream (SMS gateway, payment API, ...)
+    return JsonResponse({"rooms": Room.objects.count()})
+
+
+async def async_endpoint(request):
+    await asyncio.sleep(_delay(request))  # same downstream, awaited
+    return JsonResponse({"rooms": await Room.objects.acount()})
+
+
+urlpatterns = [
+    path("bench/sync/", sync_endpoint),
+    path("bench/async/", async_endpoint),
+]
+
+
+def _summary(label, latencies, wall):
+    ms = sorted(x * 1000 for x in latencies)
+    p95 = ms[max(0, int(len(ms) * 0.95) - 1)]
+    return f"{label:>8} | {len(ms) / wall:>8.1f} | {statistics.median(ms):>8.1f} | {p95:>8.1f} | {wall:>7.2f}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Throughput of a sync vs an async view that waits on a slow downstream, "
+        "driven concurrently through Django's ASGI handler (one worker process, "
+        "like gunicorn workers=1). With --url, load-tests a running server instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--delay", type=float, default=0.05, help="Simulated downstream latency (s).")
+        parser.add_argument("--url", action="append", default=[],
+                            help="Load-test these URLs on a live server (repeatable).")
+        parser.add_argument("--cookie", default="", help="Cookie header for --url (e.g. sessionid=...).")
+
+    def handle(self, *args, **opts):
+        self.stdout.write(f"{opts['requests']} requests, concurrency {opts['concurrency']}")
+        self.stdout.write(f"{'view':>8} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'wall s':>7}")
+        if opts["url"]:
+            for i, url in enumerate(opts["url"], 1):
+                self.stdout.write(self._live(url, opts, label=f"url{i}"))
+            return
+
+        # in-process: route the two benchmark views through the real ASGI stack
+        with override_settings(ROOT_URLCONF=sys.modules[__name__]):
+            for label in ("sync", "async"):
+                url = f"/bench/{label}/?delay={opts['delay']}"
+                latencies, wall = asyncio.run(self._drive(url, opts["requests"], opts["concurrency"]))
+                self.stdout.write(_summary(label, latencies, wall))
+
+    async def _drive(self, url, total, concurrency):
+        client, gate, latencies = AsyncClient(), asyncio.Semaphore(concurrency), []
+
+        async def one():
+            async with gate:
+                t0 = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - t0)
+                assert response.status_code == 200, response.status_code
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return latencies, time.perf_counter() - t0
+
+    def _live(self, url, opts, label):
+        headers = {"Cookie": opts["cookie"]} if opts["cookie"] else {}
+
+        def one(_):
+            t0 = time.perf_counter()
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as r:
+                r.read()
+            return time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(opts["concurrency"]) as pool:
+            latencies = list(pool.map(one, range(opts["requests"])))
+        return _summary(label, latencies, time.perf_counter() - t0)
@@ -0,0 +1,153 @@
+# apps/core/management/commands/bench_exports.py
+import csv
+import gc
+import tempfile
+import time
+import tracemalloc
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+
+from apps.core.exports import csv_lines, queryset_rows, stream_csv, write_xlsx
+from apps.core.models import SmsLog
+
+HEADER = ["ID", "To", "Context", "Result", "Body", "Provider", "Booking ID", "Created At"]
+FIELDS = ("id", "to", "context", "result", "body", "provider", "booking_id", "created_at")
+
+
+def _legacy_csv(qs):
+    """The old shape: model instances written into an in-memory HttpResponse."""
+    resp = HttpResponse(content_type="text/csv; charset=utf-8")
+    w = csv.writer(resp)
+    w.writerow(HEADER)
+    for r in qs:
+        w.writerow([r.id, r.to, r.context, r.result, r.body, r.provider, r.booking_id, r.created_at])
+    return len(resp.content)
+
+
+def _streaming_csv(qs):
+    size = 0
+    for chunk in csv_lines(HEADER, queryset_rows(qs, FIELDS)):
+        size += len(chunk.encode("utf-8"))  # what the WSGI server would send
+    return size
+
+
+def _asgi_body(response):
+    """Consume the response the way config.asgi does (ASGIHandler.send_response)."""
+    async def consume():
+        size = 0
+        async for chunk in response:
+            size += len(chunk)
+        return size
+    return async_to_sync(consume)()
+
+
+def _asgi_csv(qs):
+    return _asgi_body(stream_csv("bench.csv", HEADER, queryset_rows(qs, FIELDS)))
+
+
+def _asgi_plain_csv(qs):
+    """Same rows in a plain StreamingHttpResponse: Django buffers it under ASGI."""
+    return _asgi_body(StreamingHttpResponse(csv_lines(HEADER, queryset_rows(qs, FIELDS))))
+
+
+def _streaming_xlsx(qs):
+    with tempfile.TemporaryFile() as fh:
+        write_xlsx(fh, HEADER, queryset_rows(qs, FIELDS), title="SMS Logs")
+        return fh.tell()
+
+
+def _reset_peak_rss():
+    # Linux: writing "5" resets VmHWM (peak RSS) for this process
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb():
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark exports: in-memory HttpResponse vs streaming CSV (WSGI and ASGI "
+        "iteration) vs write-only XLSX. "
+        "Reports peak RSS and peak Python heap per row count. Synthetic SmsLog rows "
+        "are created inside a transaction and rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", default="10000,50000,100000", help="Comma-separated row counts.")
+        parser.add_argument("--skip-xlsx", action="store_true")
+        parser.add_argument("--heap", action="store_true",
+                            help="Also record peak Python heap via tracemalloc (slows every mode down).")
+
+    def handle(self, *args, **opts):
+        counts = [int(x) for x in opts["rows"].split(",") if x.strip()]
+        # streaming modes first: RSS never shrinks back once the legacy run has grown it
+        modes = [("stream csv", _streaming_csv), ("asgi csv", _asgi_csv)]
+        if not opts["skip_xlsx"]:
+            try:
+                import openpyxl  # noqa: F401
+                modes.append(("stream xlsx", _streaming_xlsx))
+            except ImportError:
+                self.stdout.write(self.style.WARNING("openpyxl not installed; skipping XLSX."))
+        modes += [("asgi plain", _asgi_plain_csv), ("legacy csv", _legacy_csv)]
+        trace = opts["heap"]
+
+        can_reset = _reset_peak_rss()
+        if not can_reset:
+            self.stdout.write(self.style.WARNING("Peak RSS reset unsupported here; RSS column is cumulative."))
+
+        self.stdout.write(f"{'rows':>8} | {'mode':<12} | {'ms':>8} | {'heap MB':>8} | {'peak RSS MB':>11} | {'bytes':>12}")
+        for n in counts:
+            try:
+                with transaction.atomic():
+                    self._seed(n)
+                    qs = SmsLog.objects.filter(provider="__bench__").order_by("id")
+                    for label, fn in modes:
+                        gc.collect()
+                        _reset_peak_rss()
+                        if trace:
+                            tracemalloc.start()
+                        t0 = time.perf_counter()
+                        size = fn(qs)
+                        ms = (time.perf_counter() - t0) * 1000
+                        heap = "n/a"
+                        if trace:
+                            heap = f"{tracemalloc.get_traced_memory()[1] / 2**20:.1f}"
+                            tracemalloc.stop()
+                        rss = _peak_rss_mb()
+                        self.stdout.write(
+                            f"{n:>8} | {label:<12} | {ms:>8.0f} | {heap:>8} | "
+                            f"{(f'{rss:.1f}' if rss is not None else 'n/a'):>11} | {size:>12}"
+                        )
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _seed(self, n):
+        body = "Dear guest, your booking #12345 at Room 101 is confirmed. Check-in 12 Jan, check-out 14 Jan."
+        batch = 5000
+        for start in range(0, n, batch):
+            SmsLog.objects.bulk_create([
+                SmsLog(to=f"017{i:08d}", body=body, result="SENT", provider="__bench__",
+                       context=SmsLog.Kind.CREATED, booking_id=i)
+                for i in range(start, min(n, start + batch))
+            ])
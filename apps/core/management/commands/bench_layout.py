@@ -0,0 +1,114 @@
+# apps/core/management/commands/bench_layout.py
+import contextlib
+import io
+import json
+import os
+import time
+from importlib import import_module, util
+from pprint import pprint
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from templates.layout.bootstrap.layout_vertical import get_menu_file_path
+from web_project import TemplateHelper, TemplateLayout
+from web_project.template_helpers import registry
+from web_project.template_helpers.theme import MAP_CONTEXT_KEYS, _map_values
+
+
+# ---- the per-request path as it was before the layout registry ----
+def _legacy_init_context(context):
+    context.update({key: settings.TEMPLATE_CONFIG.get(key) for key in (
+        "layout", "theme", "style", "rtl_support", "rtl_mode", "has_customizer",
+        "display_customizer", "content_layout", "navbar_type", "header_type",
+        "menu_fixed", "menu_collapsed", "footer_fixed", "show_dropdown_onhover",
+        "customizer_controls",
+    )})
+    return context
+
+
+def _legacy_map_context(context):
+    context.update(_map_values({key: context.get(key) for key in MAP_CONTEXT_KEYS}))
+
+
+def _legacy_set_layout(view, context):
+    layout = os.path.splitext(view)[0].split("/")[0]
+    module = f"templates.{settings.THEME_LAYOUT_DIR.replace('/', '.')}.bootstrap.{layout}"
+    assert util.find_spec(module) is not None
+    class_name = f"TemplateBootstrap{layout.title().replace('_', '')}"
+    pprint(f"Loading {class_name} from {module}")
+    getattr(import_module(module), class_name)
+
+    # TemplateBootstrapLayoutVertical.init
+    context.update({"layout": "vertical", "content_navbar": True, "is_navbar": True,
+                    "is_menu": True, "is_footer": True, "navbar_detached": True})
+    _legacy_map_context(context)
+    user = context.get("user")
+    role = user.role.lower()
+    print(f"DEBUG: User: {user}, Role: {role}")
+    with open(get_menu_file_path(role), "r", encoding="utf-8") as file:
+        context["menu_data"] = json.load(file)
+    return f"{settings.THEME_LAYOUT_DIR}/{view}"
+
+
+def legacy_layout_init(view, context):
+    context = _legacy_init_context(context)
+    context["user"] = view.request.user
+    context.update({
+        "layout_path": _legacy_set_layout(f"layout_{context['layout']}.html", context),
+        "rtl_mode": settings.TEMPLATE_CONFIG.get("rtl_mode"),
+    })
+    _legacy_map_context(context)
+    return context
+
+
+class _View:
+    def __init__(self, request):
+        self.request = request
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark of a page view's layout setup: TemplateLayout.init followed by the "
+        "explicit TemplateHelper.set_layout most views make, before (import lookup, menu JSON "
+        "read and debug prints per call) vs after (layout registry)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=5000)
+        parser.add_argument("--role", default="admin", help="Role whose vertical menu is loaded.")
+
+    def handle(self, *args, **opts):
+        n = opts["iterations"]
+        request = RequestFactory().get("/")
+        request.user = get_user_model()(role=opts["role"])
+        view = _View(request)
+
+        def before():
+            ctx = legacy_layout_init(view, {})
+            _legacy_set_layout("layout_vertical.html", ctx)
+
+        def after():
+            ctx = TemplateLayout.init(view, {})
+            TemplateHelper.set_layout("layout_vertical.html", ctx)
+
+        after()  # first call builds the registry; time the steady state
+        self.stdout.write(f"{n} page setups, role {opts['role']!r}")
+        self.stdout.write(f"{'path':>14} | {'us/page':>8} | {'pages/s':>9}")
+        reload = registry.THEME_MENU_RELOAD
+        try:
+            for label, fn, registry.THEME_MENU_RELOAD in (
+                ("before", before, reload),
+                ("after, reload", after, True),   # DEBUG: one stat() per menu lookup
+                ("after", after, False),
+            ):
+                with contextlib.redirect_stdout(io.StringIO()):  # the old prints still cost their formatting
+                    t0 = time.perf_counter()
+                    for _ in range(n):
+                        fn()
+                    wall = time.perf_counter() - t0
+                self.stdout.write(f"{label:>14} | {wall / n * 1e6:>8.1f} | {n / wall:>9.0f}")
+        finally:
+            registry.THEME_MENU_RELOAD = reload
@@ -0,0 +1,83 @@
+# apps/core/management/commands/bench_pagination.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+
+from apps.core.models import SmsLog
+from apps.core.pagination import KeysetPaginator
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        ms = (time.perf_counter() - t0) * 1000
+        best = ms if best is None else min(best, ms)
+    return best
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark list pagination: OFFSET + COUNT(*) (django Paginator) vs keyset cursors, "
+        "at shallow and deep pages. Synthetic SmsLog rows are created inside a transaction "
+        "and rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000)
+        parser.add_argument("--per-page", type=int, default=25)
+        parser.add_argument("--pages", default="1,100,2000", help="Comma-separated page numbers.")
+        parser.add_argument("--repeat", type=int, default=5, help="Best of N runs per cell.")
+
+    def handle(self, *args, **opts):
+        per_page = opts["per_page"]
+        pages = [int(x) for x in opts["pages"].split(",") if x.strip()]
+        repeat = opts["repeat"]
+        ordering = ("-created_at", "-id")
+
+        try:
+            with transaction.atomic():
+                self._seed(opts["rows"])
+                if connection.vendor == "sqlite":
+                    with connection.cursor() as cur:
+                        cur.execute("ANALYZE")
+                qs = SmsLog.objects.filter(provider="__bench__")
+                self.stdout.write(f"{opts['rows']} rows, {per_page} per page, best of {repeat} (ms)")
+                self.stdout.write(f"{'page':>6} | {'offset+count':>12} | {'offset':>8} | {'keyset':>8}")
+                for n in pages:
+                    def offset_page():
+                        list(Paginator(qs.order_by(*ordering), per_page).page(n).object_list)
+
+                    def offset_only():
+                        list(qs.order_by(*ordering)[(n - 1) * per_page: n * per_page])
+
+                    # the cursor the previous page would have handed out (not timed)
+                    prev = KeysetPaginator(qs, ordering, per_page=per_page, count=None)
+                    token = prev.page(offset=(n - 2) * per_page).next_cursor if n > 1 else None
+
+                    def keyset_page():
+                        KeysetPaginator(qs, ordering, per_page=per_page, count=None).page(token)
+
+                    self.stdout.write(
+                        f"{n:>6} | {_timed(offset_page, repeat):>12.2f} | "
+                        f"{_timed(offset_only, repeat):>8.2f} | {_timed(keyset_page, repeat):>8.2f}"
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, n):
+        batch = 5000
+        for start in range(0, n, batch):
+            SmsLog.objects.bulk_create([
+                SmsLog(to=f"017{i:08d}", body="bench", result="SENT", provider="__bench__",
+                       context=SmsLog.Kind.OTHER, booking_id=i)
+                for i in range(start, min(n, start + batch))
+            ])
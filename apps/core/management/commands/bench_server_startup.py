@@ -0,0 +1,102 @@
+# apps/core/management/commands/bench_server_startup.py
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter. cold: every worker imports the app itself.
+# preload: import once, fork N workers (gunicorn preload_app) and measure
+# each child; its pages stay shared with the parent until written.
+_PROBE = textwrap.dedent("""
+    import json, os, sys, time
+
+    def mem():
+        out = {}
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty", "Shared_Clean", "Shared_Dirty"):
+                    out[key] = int(rest.split()[0]) / 1024   # MB
+        out["Private"] = out.pop("Private_Clean") + out.pop("Private_Dirty")
+        out["Shared"] = out.pop("Shared_Clean") + out.pop("Shared_Dirty")
+        return out
+
+    mode, app, workers = sys.argv[1], sys.argv[2], int(sys.argv[3])
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    t0 = time.perf_counter()
+    __import__(app)
+    from django.urls import get_resolver
+    get_resolver().url_patterns   # views/forms/models: what the first request would import
+    import_s = time.perf_counter() - t0
+
+    if mode == "cold":
+        print(json.dumps({"import_s": import_s, **mem()}), flush=True)
+        sys.exit(0)
+
+    children = []
+    for _ in range(workers):
+        r, w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(r)
+            os.write(w, json.dumps({"import_s": 0.0, **mem()}).encode())
+            os._exit(0)
+        os.close(w)
+        children.append((pid, r))
+    for pid, r in children:
+        with os.fdopen(r) as f:
+            print(f.read(), flush=True)
+        os.waitpid(pid, 0)
+    print(json.dumps({"master": True, "import_s": import_s, **mem()}), flush=True)
+""")
+
+
+class Command(BaseCommand):
+    help = (
+        "Cold start cost per gunicorn worker: every worker importing the app (no preload) "
+        "vs importing once in the master and forking (preload_app). Reports import time and "
+        "RSS / PSS / private memory per worker (Linux /proc)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--app", default="config.asgi", help="Module gunicorn loads (config.asgi / config.wsgi).")
+
+    def handle(self, *args, **opts):
+        if not os.path.exists("/proc/self/smaps_rollup"):
+            raise CommandError("Needs Linux /proc/<pid>/smaps_rollup.")
+        n, app = opts["workers"], opts["app"]
+
+        cold = [self._run("cold", app, 1)[0] for _ in range(n)]
+        forked = self._run("preload", app, n)
+        master = next(r for r in forked if r.get("master"))
+        forked = [r for r in forked if not r.get("master")]
+
+        self.stdout.write(f"{n} workers of {app} (MB, mean per worker)")
+        self.stdout.write(f"{'mode':>8} | {'import s':>8} | {'RSS':>7} | {'PSS':>7} | {'private':>7} | {'total private':>13}")
+        for label, rows, import_s in (
+            ("cold", cold, sum(r["import_s"] for r in cold) / n),
+            ("preload", forked, master["import_s"]),
+        ):
+            def avg(key):
+                return sum(r[key] for r in rows) / len(rows)
+            total = sum(r["Private"] for r in rows) + (master["Private"] if label == "preload" else 0)
+            self.stdout.write(
+                f"{label:>8} | {import_s:>8.2f} | {avg('Rss'):>7.1f} | {avg('Pss'):>7.1f} | "
+                f"{avg('Private'):>7.1f} | {total:>13.1f}"
+            )
+        self.stdout.write("preload: the import is paid once by the master (its private memory is in the total).")
+
+    def _run(self, mode, app, workers):
+        proc = subprocess.run(
+            [sys.executable, "-c", _PROBE, mode, app, str(workers)],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings")},
+        )
+        if proc.returncode != 0:
+            raise CommandError(proc.stderr.strip()[-2000:])
+        return [json.loads(line) for line in proc.stdout.splitlines() if line.startswith("{")]
@@ -0,0 +1,63 @@
+# apps/core/management/commands/bench_sms.py
+import statistics
+import time
+
+import requests
+import urllib3
+from django.core.management.base import BaseCommand
+
+from apps.core.sms import JBDSmsClient
+from apps.core.sms_stub import StubGateway
+
+
+def _stats(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return statistics.mean(samples), statistics.median(samples), p95
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark of per-message SMS latency against a local stub gateway: "
+        "a fresh connection per message (module-level requests.post) vs the pooled JBDSmsClient."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=200)
+        parser.add_argument("--latency-ms", type=float, default=0.0, help="Artificial server latency.")
+        parser.add_argument("--no-tls", action="store_true", help="Plain HTTP stub (no handshake cost).")
+
+    def handle(self, *args, **opts):
+        gateway = StubGateway(latency=opts["latency_ms"] / 1000, tls=not opts["no_tls"]).start()
+        scheme = "https" if gateway.tls else "http"
+        if gateway.tls:
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        url = gateway.url
+        payload = {"api_token": "bench", "recipient": "8801700000000", "sender_id": "bench",
+                   "type": "plain", "message": "Benchmark message"}
+
+        n = opts["messages"]
+        try:
+            fresh = []
+            for _ in range(n):
+                t0 = time.perf_counter()
+                requests.post(url, json=payload, timeout=(3.05, 10), verify=False).json()
+                fresh.append((time.perf_counter() - t0) * 1000)
+
+            client = JBDSmsClient(url=url, verify=False)
+            pooled = []
+            for _ in range(n):
+                t0 = time.perf_counter()
+                result, _ = client.send(payload["recipient"], payload["message"], "bench", "bench")
+                pooled.append((time.perf_counter() - t0) * 1000)
+                if result != "SENT":
+                    self.stderr.write(f"unexpected result: {result}")
+            client.close()
+        finally:
+            gateway.stop()
+
+        self.stdout.write(f"{n} messages over {scheme.upper()} (server latency {opts['latency_ms']:.0f} ms)")
+        self.stdout.write(f"{'mode':<22} | {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for label, samples in (("fresh connection", fresh), ("pooled JBDSmsClient", pooled)):
+            mean, p50, p95 = _stats(samples)
+            self.stdout.write(f"{label:<22} | {mean:>8.2f} {p50:>8.2f} {p95:>8.2f}")
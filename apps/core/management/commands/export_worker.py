@@ -0,0 +1,62 @@
+# apps/core/management/commands/export_worker.py
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.core.export_jobs import claim, cleanup_expired, run
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background exports (ExportJob) one at a time, writing files under "
+        "the private EXPORT_JOB_DIR, and delete expired export files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll", type=float, default=2.0, help="Idle sleep in seconds.")
+        parser.add_argument("--cleanup-every", type=float, default=600, help="Seconds between expiry sweeps.")
+        parser.add_argument("--once", action="store_true", help="Run what is queued, then exit.")
+        parser.add_argument("--cleanup", action="store_true", help="Only delete expired exports, then exit.")
+
+    def handle(self, *args, **opts):
+        if opts["cleanup"]:
+            self.stdout.write(f"removed {cleanup_expired()} expired exports")
+            return
+
+        self._stop = False
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        done = failed = 0
+        next_cleanup = 0.0
+        while not self._stop:
+            close_old_connections()
+            if time.monotonic() >= next_cleanup:
+                removed = cleanup_expired()
+                if removed:
+                    self.stdout.write(f"removed {removed} expired exports")
+                next_cleanup = time.monotonic() + opts["cleanup_every"]
+
+            job = claim()
+            if job is None:
+                if opts["once"]:
+                    break
+                time.sleep(opts["poll"])
+                continue
+
+            t0 = time.perf_counter()
+            ok = run(job)
+            job.refresh_from_db()
+            done += ok
+            failed += not ok
+            self.stdout.write(
+                f"job #{job.pk} {job.kind}: {job.get_status_display()} — {job.rows_written} rows, "
+                f"{job.size} bytes in {time.perf_counter() - t0:.1f}s"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Export worker stopped: done={done} failed={failed}"))
+
+    def _request_stop(self, *_):
+        self._stop = True
@@ -0,0 +1,64 @@
+# apps/core/management/commands/sms_worker.py
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.core.outbox import MAX_ATTEMPTS, claim_batch, record_result
+from apps.core.sms import JBDSmsClient, post_sms_jbd
+
+
+class Command(BaseCommand):
+    help = (
+        "Drain the SMS outbox: claims due messages in batches and sends them through "
+        "one pooled gateway client with a concurrency limit, retrying with backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=50, help="Messages claimed per round.")
+        parser.add_argument("--concurrency", type=int, default=4, help="Parallel provider calls.")
+        parser.add_argument("--poll", type=float, default=2.0, help="Idle sleep in seconds.")
+        parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS)
+        parser.add_argument("--once", action="store_true", help="Process what is due, then exit.")
+
+    def handle(self, *args, **opts):
+        self._stop = False
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        conc = max(1, opts["concurrency"])
+        client = JBDSmsClient(pool_size=conc)
+
+        sent = failed = retried = 0
+        with ThreadPoolExecutor(max_workers=conc, thread_name_prefix="sms") as pool:
+            while not self._stop:
+                close_old_connections()
+                batch = claim_batch(opts["batch"])
+                if not batch:
+                    if opts["once"]:
+                        break
+                    time.sleep(opts["poll"])
+                    continue
+
+                t0 = time.perf_counter()
+                results = pool.map(lambda m: post_sms_jbd(m.to, m.body, client=client), batch)
+                for msg, (result, retryable) in zip(batch, results):
+                    final = record_result(msg, result, retryable, max_attempts=opts["max_attempts"])
+                    if result.upper().startswith("SENT"):
+                        sent += 1
+                    elif final:
+                        failed += 1
+                    else:
+                        retried += 1
+                self.stdout.write(
+                    f"batch of {len(batch)} in {(time.perf_counter() - t0) * 1000:.0f} ms "
+                    f"(sent={sent} failed={failed} retrying={retried})"
+                )
+
+        client.close()
+        self.stdout.write(self.style.SUCCESS(f"SMS worker stopped: sent={sent} failed={failed} retrying={retried}"))
+
+    def _request_stop(self, *_):
+        self._stop = True
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_smsoutbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='smslog',
+            index=models.Index(fields=['-created_at', '-id'], name='smslog_created_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=40)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('PENDING', 'Queued'), ('RUNNING', 'Running'), ('DONE', 'Ready'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('rows_total', models.PositiveIntegerField(blank=True, null=True)),
+                ('rows_written', models.PositiveIntegerField(default=0)),
+                ('file', models.FileField(blank=True, max_length=255, upload_to='exports/')),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('error', models.CharField(blank=True, default='', max_length=255)),
+                ('claimed_by', models.CharField(blank=True, default='', max_length=40)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('-id',),
+                'indexes': [models.Index(fields=['status', 'id'], name='exportjob_queue_idx'), models.Index(fields=['expires_at'], name='exportjob_expires_idx')],
+            },
+        ),
+    ]
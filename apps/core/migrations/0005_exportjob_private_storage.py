@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:38
+
+import apps.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_exportjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='file',
+            field=models.FileField(blank=True, max_length=255, storage=apps.core.models.export_storage, upload_to=''),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:41
+
+from django.db import migrations, models
+
+
+def rename_import_context(apps, schema_editor):
+    # rows the importer queued before IMPORT was a Kind
+    for name in ("SmsLog", "SmsOutbox"):
+        apps.get_model("core", name).objects.filter(context="IMPORT_SUMMARY").update(context="IMPORT")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_exportjob_private_storage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='smslog',
+            name='context',
+            field=models.CharField(choices=[('CREATED', 'Booking Created'), ('STATUS', 'Status Changed'), ('PAYMENT', 'Payment/Checkout'), ('IMPORT', 'Booking Import'), ('OTHER', 'Other')], default='OTHER', max_length=20),
+        ),
+        migrations.RunPython(rename_import_context, migrations.RunPython.noop),
+    ]
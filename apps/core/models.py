@@ -1,4 +1,9 @@
+import os
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
 class SmsLog(models.Model):
@@ -6,6 +11,7 @@ class Kind(models.TextChoices):
         CREATED   = "CREATED", "Booking Created"
         STATUS    = "STATUS",  "Status Changed"
         PAYMENT   = "PAYMENT", "Payment/Checkout"
+        IMPORT    = "IMPORT",  "Booking Import"
         OTHER     = "OTHER",   "Other"
 
     to = models.CharField(max_length=32, db_index=True)
@@ -18,3 +24,113 @@ class Kind(models.TextChoices):
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="smslog_created_keyset_idx"),
+        ]
+
+
+class SmsOutbox(models.Model):
+    """
+    Pending SMS. Rows are written inside the caller's transaction (so they
+    disappear on rollback) and sent by `manage.py sms_worker`.
+    """
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        SENDING = "SENDING", "Sending"
+        SENT    = "SENT",    "Sent"
+        FAILED  = "FAILED",  "Failed"
+
+    to = models.CharField(max_length=32)
+    body = models.TextField()
+    context = models.CharField(max_length=20, default=SmsLog.Kind.OTHER)
+    booking_id = models.IntegerField(null=True, blank=True)
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=40, blank=True, default="")
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.CharField(max_length=255, blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("id",)
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="smsoutbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"SMS to {self.to} [{self.status}]"
+
+
+def export_storage():
+    """Export files hold guest PII: kept in EXPORT_JOB_DIR, outside MEDIA_ROOT (never served as /media/)."""
+    return FileSystemStorage(location=getattr(settings, "EXPORT_JOB_DIR", settings.BASE_DIR / "cache" / "exports"))
+
+
+class ExportJob(models.Model):
+    """
+    A large export run off the request path by `manage.py export_worker`
+    (apps.core.export_jobs). The file lands in the private EXPORT_JOB_DIR,
+    is served only by core:export_job_download, and is removed, with the
+    row, once expires_at passes.
+    """
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Queued"
+        RUNNING = "RUNNING", "Running"
+        DONE    = "DONE",    "Ready"
+        FAILED  = "FAILED",  "Failed"
+
+    kind = models.CharField(max_length=40)            # key of export_jobs.EXPORTERS
+    params = models.JSONField(default=dict, blank=True)   # the export view's GET params
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        null=True, blank=True, related_name="export_jobs",
+    )
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    rows_total = models.PositiveIntegerField(null=True, blank=True)    # estimate taken at enqueue
+    rows_written = models.PositiveIntegerField(default=0)
+    file = models.FileField(storage=export_storage, max_length=255, blank=True)     # <random>/<name>
+    size = models.PositiveBigIntegerField(default=0)
+    error = models.CharField(max_length=255, blank=True, default="")
+
+    claimed_by = models.CharField(max_length=40, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("-id",)
+        indexes = [
+            models.Index(fields=["status", "id"], name="exportjob_queue_idx"),
+            models.Index(fields=["expires_at"], name="exportjob_expires_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} export #{self.pk} [{self.status}]"
+
+    @property
+    def filename(self):
+        return os.path.basename(self.file.name) if self.file else ""
+
+    @property
+    def percent(self):
+        if self.status == self.Status.DONE:
+            return 100
+        if not self.rows_total:
+            return None
+        return min(99, int(100 * self.rows_written / self.rows_total))
+
+    @property
+    def eta_seconds(self):
+        """Remaining seconds at the rate so far (None until there is a rate)."""
+        if self.status != self.Status.RUNNING or not (self.started_at and self.rows_written and self.rows_total):
+            return None
+        elapsed = (timezone.now() - self.started_at).total_seconds()
+        remaining = max(0, self.rows_total - self.rows_written)
+        return round(elapsed / self.rows_written * remaining)
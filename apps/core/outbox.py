@@ -0,0 +1,101 @@
+# apps/core/outbox.py
+"""
+SMS outbox: enqueue from request handlers / signals, send from a worker.
+
+    enqueue_sms(m01, msg, context="CREATED", booking_id=b.pk)
+
+The row is inserted in the current transaction, so the worker only ever
+sees it once that transaction commits, and a rollback drops it. With
+SMS_OUTBOX_ENABLED = False we fall back to sending on commit, in-process.
+"""
+import logging
+import random
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import SmsLog, SmsOutbox
+from .sms import post_sms_jbd
+from .sms_log import log_sms
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS  = getattr(settings, "SMS_OUTBOX_MAX_ATTEMPTS", 5)
+BACKOFF_BASE  = getattr(settings, "SMS_OUTBOX_BACKOFF_SECONDS", 10)
+BACKOFF_MAX   = getattr(settings, "SMS_OUTBOX_BACKOFF_MAX_SECONDS", 30 * 60)
+STALE_CLAIM   = getattr(settings, "SMS_OUTBOX_STALE_CLAIM_SECONDS", 5 * 60)
+
+
+def enqueue_sms(to: str, body: str, context: str = SmsLog.Kind.OTHER, booking_id=None):
+    """Queue one SMS (to = 01XXXXXXXXX). Returns the outbox row, or None in sync mode."""
+    if not getattr(settings, "SMS_OUTBOX_ENABLED", True):
+        def _send_now():
+            result, _ = post_sms_jbd(to, body)
+            log_sms(to=to, body=body, result=result, context=context, booking_id=booking_id)
+        transaction.on_commit(_send_now)
+        return None
+    return SmsOutbox.objects.create(to=to, body=body, context=context, booking_id=booking_id)
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff with jitter: base * 2^(n-1), capped."""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_batch(limit: int) -> list[SmsOutbox]:
+    """
+    Atomically mark up to `limit` due rows as SENDING under a fresh claim
+    token and return them. Rows stuck in SENDING past STALE_CLAIM (a worker
+    died mid-send) are picked up again.
+    """
+    token = uuid.uuid4().hex
+    now = timezone.now()
+    due = (
+        SmsOutbox.objects
+        .filter(
+            Q(status=SmsOutbox.Status.PENDING, next_attempt_at__lte=now)
+            | Q(status=SmsOutbox.Status.SENDING, claimed_at__lt=now - timedelta(seconds=STALE_CLAIM))
+        )
+        .order_by("next_attempt_at", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+    ids = list(due)
+    if not ids:
+        return []
+    # the status filter is repeated so two workers can never claim the same row
+    SmsOutbox.objects.filter(id__in=ids).filter(
+        Q(status=SmsOutbox.Status.PENDING)
+        | Q(status=SmsOutbox.Status.SENDING, claimed_at__lt=now - timedelta(seconds=STALE_CLAIM))
+    ).update(status=SmsOutbox.Status.SENDING, claimed_by=token, claimed_at=now)
+    return list(SmsOutbox.objects.filter(id__in=ids, claimed_by=token))
+
+
+def record_result(msg: SmsOutbox, result: str, retryable: bool, max_attempts: int = MAX_ATTEMPTS):
+    """Write one send outcome back to the outbox row (+ SmsLog when final)."""
+    now = timezone.now()
+    attempts = msg.attempts + 1
+    qs = SmsOutbox.objects.filter(pk=msg.pk)
+
+    if result.upper().startswith("SENT"):
+        qs.update(status=SmsOutbox.Status.SENT, attempts=F("attempts") + 1, sent_at=now, last_error="")
+        final = True
+    elif retryable and attempts < max_attempts:
+        qs.update(
+            status=SmsOutbox.Status.PENDING,
+            attempts=F("attempts") + 1,
+            next_attempt_at=now + timedelta(seconds=backoff_seconds(attempts)),
+            last_error=result[:255],
+        )
+        final = False
+    else:
+        qs.update(status=SmsOutbox.Status.FAILED, attempts=F("attempts") + 1, last_error=result[:255])
+        final = True
+
+    if final:
+        log_sms(to=msg.to, body=msg.body, result=result[:40], context=msg.context, booking_id=msg.booking_id)
+    return final
@@ -0,0 +1,292 @@
+# apps/core/pagination.py
+"""
+Keyset (cursor) pagination.
+
+OFFSET pagination reads and throws away every row before the requested page,
+and Django's Paginator adds a COUNT(*) on every request, so deep pages in a
+long history get slower and slower. Here a page is addressed by the sort key
+of its boundary row instead:
+
+    ORDER BY created_at DESC, id DESC
+    WHERE (created_at, id) < (<last row of previous page>)
+    LIMIT per_page + 1
+
+which is an index range scan wherever you are in the list.
+
+Cursors are opaque signed tokens carrying the boundary values, the direction,
+the row offset (for "21–40 of …" labels) and the total counted on the first
+page, so later pages never count again. A cursor minted under different
+filters (`scope`) is ignored and the list restarts at the first page.
+
+The ordering must end in a unique column (normally the pk), and the ordering
+columns must be non-null.
+"""
+import hashlib
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.db.models import Q
+
+KEYSET_COUNT_CAP = getattr(settings, "KEYSET_COUNT_CAP", 10000)
+_SALT = "core.pagination.keyset"
+
+
+def _encode(payload: dict) -> str:
+    return signing.dumps(payload, salt=_SALT, compress=True)
+
+
+def _decode(token: str | None) -> dict | None:
+    if not token:
+        return None
+    try:
+        payload = signing.loads(token, salt=_SALT)
+    except signing.BadSignature:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def scope_for(params, exclude=("cursor", "page")) -> str:
+    """Short fingerprint of the filter params (QueryDict or dict) a cursor belongs to."""
+    getlist = getattr(params, "getlist", lambda k: [params[k]])
+    items = sorted((k, str(v)) for k in params if k not in exclude for v in getlist(k))
+    return hashlib.sha1(repr(items).encode()).hexdigest()[:16]
+
+
+def approximate_count(qs, cap: int = KEYSET_COUNT_CAP) -> tuple[int, bool]:
+    """
+    (count, is_approximate). Unfiltered PostgreSQL tables use the planner
+    estimate; everything else counts at most `cap` + 1 rows.
+    """
+    conn = connections[qs.db]
+    if conn.vendor == "postgresql" and not qs.query.where:
+        with conn.cursor() as cur:
+            cur.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [qs.model._meta.db_table])
+            row = cur.fetchone()
+        if row and row[0] > cap:
+            return int(row[0]), True
+    n = qs.order_by()[: cap + 1].count()
+    return (cap, True) if n > cap else (n, False)
+
+
+class KeysetPage(Sequence):
+    """Page-like object (enough of django.core.paginator.Page for list templates)."""
+    def __init__(self, object_list, paginator, *, offset, has_next, has_previous,
+                 next_cursor=None, previous_cursor=None, count=None, count_is_approx=False, carry=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.offset = offset
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+        self.count_is_approx = count_is_approx
+        self.carry = carry
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def start_index(self):
+        return self.offset + 1 if self.object_list else 0
+
+    def end_index(self):
+        return self.offset + len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    paginator = KeysetPaginator(qs, ("-created_at", "-id"), per_page=25)
+    page = paginator.page(request.GET.get("cursor"))
+
+    count: "exact" | "approx" | None (no total at all)
+    carry: small JSON-able dict (totals, sums) computed on the first page and
+           handed back unchanged from every cursor (page.carry)
+    """
+    def __init__(self, queryset, ordering, per_page=25, count="approx", scope="", carry=None):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = max(1, int(per_page))
+        self.count_mode = count
+        self.scope = scope
+        self.carry = carry
+        self._fields = [
+            queryset.model._meta.get_field(name.lstrip("-")) for name in self.ordering
+        ]
+
+    # ---------- key handling ----------
+    def _values(self, obj) -> list:
+        out = []
+        for f in self._fields:
+            v = getattr(obj, f.attname)
+            out.append(v.isoformat() if hasattr(v, "isoformat") else v)
+        return out
+
+    def _parse(self, raw) -> list:
+        return [f.to_python(v) for f, v in zip(self._fields, raw)]
+
+    def _seek(self, values, forward=True) -> Q:
+        """Rows strictly after (forward) / before the boundary in list order."""
+        q = Q()
+        for i, (name, value) in enumerate(zip(self.ordering, values)):
+            desc = name.startswith("-")
+            op = "lt" if desc == forward else "gt"
+            term = Q(**{f"{name.lstrip('-')}__{op}": value})
+            for prev_name, prev_value in zip(self.ordering[:i], values[:i]):
+                term &= Q(**{prev_name.lstrip("-"): prev_value})
+            q |= term
+        # redundant, but a plain range on the leading column is what lets the
+        # planner turn the OR above into an index range scan
+        lead = self.ordering[0]
+        op = "lte" if lead.startswith("-") == forward else "gte"
+        return Q(**{f"{lead.lstrip('-')}__{op}": values[0]}) & q
+
+    def _reversed(self):
+        return tuple(n[1:] if n.startswith("-") else f"-{n}" for n in self.ordering)
+
+    def _count(self):
+        if self.count_mode == "exact":
+            return self.queryset.count(), False
+        if self.count_mode == "approx":
+            return approximate_count(self.queryset)
+        return None, False
+
+    # ---------- paging ----------
+    def cursor(self, token: str | None) -> dict | None:
+        """Decoded cursor if it belongs to this list (same scope and ordering), else None."""
+        cursor = _decode(token)
+        if cursor and (cursor.get("s") != self.scope or len(cursor.get("v", ())) != len(self.ordering)):
+            return None
+        return cursor
+
+    def page(self, token: str | None = None, offset: int = 0) -> KeysetPage:
+        """
+        Page addressed by `token`; without a (valid) token, the page starting
+        at row `offset` (plain OFFSET: first pages and legacy ?page=N links).
+        """
+        cursor = self.cursor(token)
+
+        limit = self.per_page + 1
+        if cursor is None:
+            count, approx = self._count()
+            carry = self.carry
+            offset = max(0, int(offset or 0))
+            rows = list(self.queryset.order_by(*self.ordering)[offset: offset + limit])
+            has_previous = offset > 0
+            has_next = len(rows) > self.per_page
+            rows = rows[: self.per_page]
+        else:
+            count, approx = cursor.get("c"), bool(cursor.get("a"))
+            carry = cursor.get("x")
+            values = self._parse(cursor["v"])
+            if cursor.get("d") == "p":
+                rows = list(
+                    self.queryset.filter(self._seek(values, forward=False)).order_by(*self._reversed())[:limit]
+                )
+                has_previous = len(rows) > self.per_page
+                rows = rows[: self.per_page][::-1]
+                has_next = True
+                offset = max(0, int(cursor.get("o", 0))) if has_previous else 0
+            else:
+                rows = list(self.queryset.filter(self._seek(values)).order_by(*self.ordering)[:limit])
+                has_next = len(rows) > self.per_page
+                rows = rows[: self.per_page]
+                has_previous = True
+                offset = max(0, int(cursor.get("o", 0)))
+
+        def mint(obj, direction, at):
+            return _encode({
+                "v": self._values(obj), "d": direction, "o": max(0, at),
+                "c": count, "a": int(approx), "s": self.scope, "x": carry,
+            })
+
+        return KeysetPage(
+            rows, self,
+            offset=offset,
+            has_next=has_next,
+            has_previous=has_previous,
+            next_cursor=mint(rows[-1], "n", offset + len(rows)) if has_next and rows else None,
+            previous_cursor=mint(rows[0], "p", offset - self.per_page) if has_previous and rows else None,
+            count=count,
+            count_is_approx=approx,
+            carry=carry,
+        )
+
+
+class KeysetPaginationMixin:
+    """
+    Drop-in for ListView's OFFSET pagination:
+
+        class MyList(KeysetPaginationMixin, ListView):
+            paginate_by = 25
+            keyset_ordering = ("-created_at", "-id")
+
+    Templates get page_obj.next_cursor / previous_cursor (see core/_keyset_pager.html).
+    """
+    keyset_ordering = ("-created_at", "-id")
+    keyset_count = "approx"
+    cursor_kwarg = "cursor"
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(
+            queryset, self.keyset_ordering, per_page=page_size,
+            count=self.keyset_count, scope=scope_for(self.request.GET),
+        )
+        # old ?page=N links still land on the right rows (via OFFSET)
+        try:
+            offset = (max(1, int(self.request.GET.get("page") or 1)) - 1) * page_size
+        except ValueError:
+            offset = 0
+        page = paginator.page(self.request.GET.get(self.cursor_kwarg), offset=offset)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def preserved_querystring(self) -> str:
+        params = self.request.GET.copy()
+        for key in (self.cursor_kwarg, "page"):
+            params.pop(key, None)
+        return params.urlencode()
+
+
+def datatables_page(request, queryset, ordering, filters: dict, stats):
+    """
+    Server-side DataTables paging. DataTables only knows `start`/`length`,
+    so each response also returns next_cursor / prev_cursor; the page script
+    sends one back as `cursor` when the user steps to the adjacent page, and
+    that request is served by keyset. Jumps to arbitrary pages use OFFSET.
+
+    `stats()` returns the counts/sums shown with the table; it runs only on
+    non-cursor requests and is carried in the cursors otherwise.
+    length <= 0 ("All" in a length menu) returns every row from `start` on.
+    Returns (page, stats dict).
+    """
+    try:
+        start = max(0, int(request.GET.get("start", 0)))
+        length = int(request.GET.get("length", 10))
+    except ValueError:
+        start, length = 0, 10
+    if length <= 0:
+        carry = stats()
+        rows = list(queryset.order_by(*ordering)[start:])
+        return KeysetPage(rows, None, offset=start, has_next=False, has_previous=start > 0, carry=carry), carry
+
+    scope = scope_for({**filters, "length": length})
+    paginator = KeysetPaginator(queryset, ordering, per_page=length, count=None, scope=scope)
+    token = request.GET.get("cursor")
+    cursor = paginator.cursor(token)
+    if cursor is None or cursor.get("o") != start:
+        token, paginator.carry = None, stats()
+    page = paginator.page(token, offset=start)
+    return page, page.carry
@@ -0,0 +1,205 @@
+# apps/core/pdf.py
+"""
+PDF rendering service with an on-disk cache.
+
+xhtml2pdf lays out the whole document on every call, which is most of the
+cost of a printed ledger or invoice. Rendered files are kept under
+PDF_CACHE_DIR, keyed on
+
+    template name + template file mtime + data fingerprint (+ PDF_CACHE_VERSION)
+
+where the fingerprint is whatever identifies the inputs: usually
+`fingerprint(qs, ...)` = row count and max(updated_at) of each queryset,
+plus the filter params. Re-printing unchanged data costs the fingerprint
+query, a stat and a file send; the context (and its queries) is only
+built on a miss, so pass it as a callable:
+
+    return pdf_response(
+        "ledger_pdf.html", lambda: {...},
+        key=("ledger", request.GET.urlencode(), fingerprint(payments, expenses)),
+        filename="ledger.pdf",
+    )
+
+The directory is bounded by PDF_CACHE_MAX_BYTES: a hit refreshes the file's
+mtime, and after each store the least recently used files are removed down
+to 90% of the limit. With PDF_SENDFILE_HEADER set ("X-Accel-Redirect" for
+nginx, "X-Sendfile" for Apache) hits are handed to the web server instead of
+being streamed by the worker.
+
+Only the named template's mtime is part of the key, not its {% include %}s,
+and queryset.update() does not touch updated_at: after editing a partial or
+a bulk update that keeps the row count, bump PDF_CACHE_VERSION (or clear()).
+"""
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.template.loader import get_template
+
+from .exports import ChunkedFileResponse
+
+logger = logging.getLogger(__name__)
+
+PDF_CACHE_DIR = Path(getattr(settings, "PDF_CACHE_DIR", settings.BASE_DIR / "cache" / "pdf"))
+PDF_CACHE_MAX_BYTES = getattr(settings, "PDF_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+PDF_CACHE_ENABLED = getattr(settings, "PDF_CACHE_ENABLED", True)
+PDF_CACHE_VERSION = getattr(settings, "PDF_CACHE_VERSION", 1)
+PDF_SENDFILE_HEADER = getattr(settings, "PDF_SENDFILE_HEADER", "")
+PDF_SENDFILE_PREFIX = getattr(settings, "PDF_SENDFILE_PREFIX", "/protected/pdf/")
+
+
+# ---------- rendering ----------
+def link_callback(uri, rel):
+    """Resolve {% static %} URLs to files for xhtml2pdf."""
+    result = finders.find(uri.replace(settings.STATIC_URL, ""))
+    if result:
+        return result
+    return uri
+
+
+def render_pdf_bytes(template_src, context) -> bytes | None:
+    """Render a template to PDF bytes (None if xhtml2pdf reports an error)."""
+    from xhtml2pdf import pisa
+
+    html = get_template(template_src).render(context)
+    result = io.BytesIO()
+    pdf = pisa.pisaDocument(io.BytesIO(html.encode("UTF-8")), result, link_callback=link_callback)
+    if pdf.err:
+        logger.warning("xhtml2pdf failed on %s (%s errors)", template_src, pdf.err)
+        return None
+    return result.getvalue()
+
+
+# ---------- keys ----------
+def fingerprint(*querysets, field="updated_at") -> list:
+    """[count, max(field)] per queryset, one aggregate query each."""
+    out = []
+    for qs in querysets:
+        agg = qs.order_by().aggregate(n=Count("pk"), last=Max(field))
+        out.append([agg["n"], agg["last"].isoformat() if agg["last"] else None])
+    return out
+
+
+def _template_mtime(template_src) -> int:
+    origin = getattr(get_template(template_src), "origin", None)
+    try:
+        return os.stat(origin.name).st_mtime_ns
+    except (AttributeError, TypeError, OSError):
+        return 0
+
+
+def cache_key(template_src, key) -> str:
+    raw = repr((PDF_CACHE_VERSION, template_src, _template_mtime(template_src), key))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+# ---------- on-disk cache ----------
+def _path(digest) -> Path:
+    return PDF_CACHE_DIR / digest[:2] / f"{digest}.pdf"
+
+
+def cached_path(digest) -> Path | None:
+    path = _path(digest)
+    try:
+        os.utime(path)  # LRU: a hit makes it recent
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def store(digest, data: bytes, evict_after=True) -> Path:
+    """Write a rendered PDF; batch writers pass evict_after=False and call evict() once."""
+    path = _path(digest)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)  # readers never see a partial file
+    if evict_after:
+        evict()
+    return path
+
+
+def evict(max_bytes=None):
+    """Remove least recently used PDFs until the cache is under 90% of max_bytes."""
+    max_bytes = PDF_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    files, total = [], 0
+    for path in PDF_CACHE_DIR.glob("*/*.pdf"):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        files.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+    if total <= max_bytes:
+        return 0
+    removed = 0
+    for _, size, path in sorted(files, key=lambda f: f[0]):
+        if total <= max_bytes * 0.9:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear():
+    for path in PDF_CACHE_DIR.glob("*/*.pdf"):
+        path.unlink(missing_ok=True)
+
+
+# ---------- responses ----------
+def _file_response(path: Path, filename, as_attachment):
+    if PDF_SENDFILE_HEADER:
+        response = HttpResponse(content_type="application/pdf")
+        rel = path.relative_to(PDF_CACHE_DIR).as_posix()
+        response[PDF_SENDFILE_HEADER] = (
+            f"{PDF_SENDFILE_PREFIX}{rel}" if PDF_SENDFILE_HEADER == "X-Accel-Redirect" else str(path)
+        )
+    else:
+        response = ChunkedFileResponse(open(path, "rb"), content_type="application/pdf")
+    disposition = "attachment" if as_attachment else "inline"
+    response["Content-Disposition"] = f'{disposition}; filename="{filename}"'
+    return response
+
+
+def cached_pdf(template_src, context, key) -> Path | None:
+    """Path of the rendered PDF for (template, key), rendering it on a miss."""
+    digest = cache_key(template_src, key)
+    path = cached_path(digest)
+    if path is not None:
+        return path
+    data = render_pdf_bytes(template_src, context() if callable(context) else context)
+    if data is None:
+        return None
+    return store(digest, data)
+
+
+def pdf_response(template_src, context, key=None, filename="document.pdf", as_attachment=False):
+    """
+    PDF response for the template. With a `key` the output is cached on disk
+    (see module docstring); without one it is rendered every time.
+    """
+    if key is None or not PDF_CACHE_ENABLED:
+        data = render_pdf_bytes(template_src, context() if callable(context) else context)
+        if data is None:
+            return HttpResponse("PDF generation failed.", status=500, content_type="text/plain")
+        response = HttpResponse(data, content_type="application/pdf")
+        disposition = "attachment" if as_attachment else "inline"
+        response["Content-Disposition"] = f'{disposition}; filename="{filename}"'
+        return response
+
+    path = cached_pdf(template_src, context, key)
+    if path is None:
+        return HttpResponse("PDF generation failed.", status=500, content_type="text/plain")
+    return _file_response(path, filename, as_attachment)
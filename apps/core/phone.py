@@ -0,0 +1,103 @@
+# apps/core/phone.py
+"""
+One canonical shape for phone numbers.
+
+The same mobile arrives as "+880 1711-223344", "8801711223344", "01711223344"
+or "1711223344". to_e164() maps all of them to "+8801711223344", and Guest,
+GuestCompanion and User keep that in an indexed `phone_e164` column (filled
+on save, backfilled by `manage.py backfill_phone_e164`), so a lookup is one
+equality probe whatever format was typed or stored.
+
+Numbers that are not Bangladeshi mobiles are kept only when written in
+international form ("+44 20 …" / "0044 20 …"); anything else has no
+canonical form ("").
+"""
+import re
+
+from django.db.models import Q
+
+BD_COUNTRY_CODE = "880"
+_BD_LOCAL = re.compile(r"^01\d{9}$")
+
+
+def digits_only(value) -> str:
+    return "".join(ch for ch in str(value or "") if ch.isdigit())
+
+
+def to_local(value) -> str | None:
+    """Bangladesh mobile as local 01XXXXXXXXX, or None."""
+    d = digits_only(value)
+    if d.startswith("00"):
+        d = d[2:]
+    if d.startswith(BD_COUNTRY_CODE) and len(d) == 13:
+        d = "0" + d[3:]
+    elif len(d) == 10 and d.startswith("1"):
+        d = "0" + d
+    return d if _BD_LOCAL.match(d) else None
+
+
+def to_e164(value) -> str | None:
+    """E.164 ("+8801711223344"), or None if the number can't be made canonical."""
+    local = to_local(value)
+    if local:
+        return f"+{BD_COUNTRY_CODE}{local[1:]}"
+    raw = str(value or "").strip()
+    d = digits_only(raw)
+    if raw.startswith("00"):
+        d = d[2:]
+    elif not raw.startswith("+"):
+        return None
+    return f"+{d}" if 8 <= len(d) <= 15 else None
+
+
+def gateway_number(value) -> str | None:
+    """Digits-only international form the SMS gateway expects ("8801711223344")."""
+    e164 = to_e164(value)
+    return e164[1:] if e164 else None
+
+
+def storage_number(value) -> str:
+    """
+    How Guest.phone_number is stored: BD mobiles as 8801XXXXXXXXX, anything
+    else as its digits prefixed with 88 (the historical GuestCreateForm rule).
+    """
+    digits = digits_only(value)
+    if not digits:
+        return ""
+    if to_local(value):
+        return gateway_number(value)
+    return digits if digits.startswith("88") else f"88{digits}"
+
+
+def phone_q(value, field: str = "phone_e164") -> Q:
+    """Indexed equality filter for any format of `value` (matches nothing if invalid)."""
+    e164 = to_e164(value)
+    return Q(**{field: e164}) if e164 else Q(pk__in=[])
+
+
+def fill_phone_e164(instance, save_kwargs: dict, source: str = "phone_number"):
+    """
+    For Model.save(): refresh instance.phone_e164 from `source`, and add it to
+    update_fields when the phone itself is being saved.
+    """
+    instance.phone_e164 = to_e164(getattr(instance, source)) or ""
+    update_fields = save_kwargs.get("update_fields")
+    if update_fields is not None and source in update_fields:
+        save_kwargs["update_fields"] = {*update_fields, "phone_e164"}
+
+
+def backfill_phone_e164(model, source: str = "phone_number", batch_size: int = 2000) -> int:
+    """Recompute phone_e164 for every row of `model`. Returns rows changed."""
+    changed, batch = 0, []
+    for obj in model._default_manager.only("pk", source, "phone_e164").order_by("pk").iterator(chunk_size=batch_size):
+        e164 = to_e164(getattr(obj, source)) or ""
+        if obj.phone_e164 != e164:
+            obj.phone_e164 = e164
+            batch.append(obj)
+        if len(batch) >= batch_size:
+            model._default_manager.bulk_update(batch, ["phone_e164"])
+            changed, batch = changed + len(batch), []
+    if batch:
+        model._default_manager.bulk_update(batch, ["phone_e164"])
+        changed += len(batch)
+    return changed
@@ -0,0 +1,227 @@
+# apps/core/profiling.py
+"""
+Opt-in request profiler (QUERY_PROFILING_ENABLED).
+
+QueryProfileMiddleware records for every request:
+    - view time and template render time (TemplateResponse views)
+    - SQL query count and total SQL time, via connection.execute_wrapper
+    - duplicate-query fingerprints (same statement shape run more than once:
+      the N+1 signature)
+and keeps the last QUERY_PROFILING_BUFFER records per process in a ring buffer.
+`report()` turns the buffer into p50/p95/p99 per URL name plus the worst
+duplicate offenders; core:query_profile renders it for staff.
+
+Disabled (the default) the middleware raises MiddlewareNotUsed, so Django
+drops it from the chain at startup and there is no per-request cost at all.
+
+Notes:
+    - views that call render() directly have their template time counted
+      as view time (only TemplateResponse rendering can be timed separately)
+    - SQL run while a StreamingHttpResponse is consumed is not recorded
+    - the buffer is per process; each gunicorn worker reports its own traffic
+"""
+import math
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+PROFILING_ENABLED = getattr(settings, "QUERY_PROFILING_ENABLED", False)
+BUFFER_SIZE       = getattr(settings, "QUERY_PROFILING_BUFFER", 2000)
+TOP_DUPLICATES    = 5   # fingerprints kept per request
+
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:%s|\?|[-\d.]+|'(?:[^']|'')*')\s*,?)+\)", re.I)
+_STRING  = re.compile(r"'(?:[^']|'')*'")
+_NUMBER  = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACES  = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """Statement shape: literals -> ?, IN lists collapsed, whitespace squeezed."""
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+class RequestProfile(NamedTuple):
+    view: str
+    method: str
+    path: str
+    status: int
+    at: float               # epoch seconds
+    total_ms: float
+    view_ms: float
+    template_ms: float
+    sql_count: int
+    sql_ms: float
+    duplicates: tuple       # ((fingerprint, count), ...) worst first
+
+
+class ProfileBuffer:
+    """Thread-safe ring buffer of RequestProfile records."""
+    def __init__(self, size: int = BUFFER_SIZE):
+        self._lock = threading.Lock()
+        self._items = deque(maxlen=size)
+
+    def add(self, record: RequestProfile):
+        with self._lock:
+            self._items.append(record)
+
+    def snapshot(self) -> list[RequestProfile]:
+        with self._lock:
+            return list(self._items)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    @property
+    def maxlen(self) -> int:
+        return self._items.maxlen
+
+
+profile_buffer = ProfileBuffer()
+
+
+class _QueryRecorder:
+    """execute_wrapper callable: counts, times and groups statements."""
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    def duplicates(self, limit=TOP_DUPLICATES) -> tuple:
+        shapes = Counter()
+        for sql, n in self.statements.items():
+            shapes[fingerprint(sql)] += n
+        return tuple((fp, n) for fp, n in shapes.most_common(limit) if n > 1)
+
+
+class _Timings:
+    __slots__ = ("view_start", "view_end", "render_start", "render_end")
+
+    def __init__(self):
+        self.view_start = self.view_end = self.render_start = self.render_end = None
+
+
+class QueryProfileMiddleware:
+    def __init__(self, get_response):
+        if not PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder, timings = _QueryRecorder(), _Timings()
+        request._profile_timings = timings
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(recorder))
+            response = self.get_response(request)
+        end = time.perf_counter()
+
+        view_end = timings.view_end or end
+        template_ms = 0.0
+        if timings.render_start is not None and timings.render_end is not None:
+            template_ms = (timings.render_end - timings.render_start) * 1000
+        match = getattr(request, "resolver_match", None)
+        profile_buffer.add(RequestProfile(
+            view=(match.view_name if match else "") or "<unresolved>",
+            method=request.method,
+            path=request.path,
+            status=response.status_code,
+            at=time.time(),
+            total_ms=(end - start) * 1000,
+            view_ms=(view_end - (timings.view_start or start)) * 1000,
+            template_ms=template_ms,
+            sql_count=recorder.count,
+            sql_ms=recorder.seconds * 1000,
+            duplicates=recorder.duplicates(),
+        ))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._profile_timings.view_start = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        timings = request._profile_timings
+        timings.view_end = timings.render_start = time.perf_counter()
+
+        def _rendered(_response):
+            timings.render_end = time.perf_counter()
+        response.add_post_render_callback(_rendered)
+        return response
+
+
+# ---- report ----
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values), max(1, math.ceil(pct / 100 * len(sorted_values)))) - 1
+    return sorted_values[k]
+
+
+def report(records=None, top=20) -> dict:
+    """
+    Aggregate buffer records:
+        views      -> per URL name: hits, p50/p95/p99 total ms, avg view/template/SQL
+        duplicates -> worst (view, fingerprint) pairs by repeated executions
+    """
+    records = profile_buffer.snapshot() if records is None else records
+    by_view: dict[str, list[RequestProfile]] = {}
+    for rec in records:
+        by_view.setdefault(rec.view, []).append(rec)
+
+    views = []
+    for name, recs in by_view.items():
+        totals = sorted(r.total_ms for r in recs)
+        n = len(recs)
+        views.append({
+            "view": name,
+            "hits": n,
+            "p50": percentile(totals, 50),
+            "p95": percentile(totals, 95),
+            "p99": percentile(totals, 99),
+            "max": totals[-1],
+            "avg_view_ms": sum(r.view_ms for r in recs) / n,
+            "avg_template_ms": sum(r.template_ms for r in recs) / n,
+            "avg_queries": sum(r.sql_count for r in recs) / n,
+            "max_queries": max(r.sql_count for r in recs),
+            "avg_sql_ms": sum(r.sql_ms for r in recs) / n,
+        })
+    views.sort(key=lambda v: v["p95"], reverse=True)
+
+    dups: dict[tuple, dict] = {}
+    for rec in records:
+        for fp, count in rec.duplicates:
+            row = dups.setdefault((rec.view, fp), {
+                "view": rec.view, "fingerprint": fp, "requests": 0, "executions": 0, "worst": 0,
+            })
+            row["requests"] += 1
+            row["executions"] += count
+            row["worst"] = max(row["worst"], count)
+    duplicates = sorted(dups.values(), key=lambda d: (d["executions"], d["worst"]), reverse=True)
+
+    return {
+        "records": len(records),
+        "capacity": profile_buffer.maxlen,
+        "views": views,
+        "duplicates": duplicates[:top],
+    }
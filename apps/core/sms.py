@@ -1,6 +1,12 @@
 import logging
+import threading
+import time
+
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .phone import gateway_number, to_local
 
 logger = logging.getLogger(__name__)
 JBD_URL = "https://sms.jbdit.net/api/http/sms/send"
@@ -8,49 +14,165 @@
 def normalize_bd_mobile(mobile: str) -> str | None:
     """
     Returns local 01XXXXXXXXX (11 digits), or None.
-    Accepts +8801XXXXXXXXX / 8801XXXXXXXXX / 01XXXXXXXXX.
+    Accepts +8801XXXXXXXXX / 8801XXXXXXXXX / 01XXXXXXXXX (see apps.core.phone).
+    """
+    return to_local(mobile)
+
+# ---------- gateway client ----------
+class JBDSmsClient:
     """
-    if not mobile:
-        return None
-    m = str(mobile).strip().replace(' ', '')
-    m = m.replace('+880', '').replace('880', '')
-    if not m.startswith('0'):
-        m = '0' + m
-    return m if m.isdigit() and len(m) == 11 and m.startswith('01') else None
+    JBD gateway client with a pooled keep-alive session and a circuit breaker.
+
+    After `failure_threshold` consecutive transport/5xx failures the breaker
+    opens and sends fail fast for `reset_after` seconds; then one trial call
+    is let through (half-open) and its outcome closes or re-opens it.
+    """
+    def __init__(self, url=None, pool_size=None, connect_timeout=None, read_timeout=None,
+                 failure_threshold=None, reset_after=None, verify=True):
+        self.url = url or getattr(settings, "JBD_SMS_URL", JBD_URL)
+        self.pool_size = pool_size or getattr(settings, "JBD_SMS_POOL_SIZE", 10)
+        self.timeout = (
+            connect_timeout or getattr(settings, "JBD_SMS_CONNECT_TIMEOUT", 3.05),
+            read_timeout or getattr(settings, "JBD_SMS_READ_TIMEOUT", 10),
+        )
+        self.failure_threshold = failure_threshold or getattr(settings, "JBD_SMS_BREAKER_THRESHOLD", 5)
+        self.reset_after = reset_after or getattr(settings, "JBD_SMS_BREAKER_RESET_SECONDS", 30)
+        self.verify = verify
+
+        self._lock = threading.Lock()
+        self._session = None
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    s = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True)
+                    s.mount("https://", adapter)
+                    s.mount("http://", adapter)
+                    s.headers.update({"Content-Type": "application/json", "Accept": "application/json"})
+                    self._session = s
+        return self._session
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    # ---- circuit breaker ----
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None and time.monotonic() - self._opened_at < self.reset_after
+
+    def _allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_after or self._trial_running:
+                return False
+            self._trial_running = True   # half-open: one trial call
+            return True
+
+    def _record(self, ok: bool):
+        with self._lock:
+            self._trial_running = False
+            if ok:
+                self._failures, self._opened_at = 0, None
+                return
+            self._failures += 1
+            if self._failures >= self.failure_threshold or self._opened_at is not None:
+                if self._opened_at is None:
+                    logger.warning("JBD circuit opened after %s consecutive failures", self._failures)
+                self._opened_at = time.monotonic()
+
+    # ---- send ----
+    def send(self, recipient: str, message: str, api_token: str, sender_id: str) -> tuple[str, bool]:
+        """
+        One provider call. Returns (result, retryable): transport errors / 5xx
+        are retryable, an explicit API rejection is not.
+        """
+        if not self._allow():
+            return "FAILED: circuit open", True
+
+        payload = {
+            "api_token": api_token,
+            "recipient": recipient,
+            "sender_id": sender_id,
+            "type": "plain",
+            "message": message,
+        }
+        try:
+            r = self.session.post(self.url, json=payload, timeout=self.timeout, verify=self.verify)
+            r.raise_for_status()
+        except requests.HTTPError as e:
+            logger.exception("JBD HTTP error")
+            status = getattr(e.response, "status_code", 0) or 0
+            retryable = status >= 500 or status == 429
+            self._record(not retryable)
+            return f"FAILED: {e}", retryable
+        except requests.RequestException as e:
+            logger.exception("JBD request error")
+            self._record(False)
+            return f"FAILED: {e}", True
+
+        # parsed on its own: requests.JSONDecodeError is also a RequestException.
+        # The gateway answered, so the breaker stays closed, and a resend of a
+        # message it may already have accepted could deliver it twice: permanent
+        try:
+            data = r.json()
+            if not isinstance(data, dict):
+                raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+        except ValueError as e:
+            logger.error("JBD unparseable response (HTTP %s): %.200r", r.status_code, r.text)
+            self._record(True)
+            return f"FAILED: bad response: {e}", False
+
+        self._record(True)   # gateway answered: healthy, even if it rejected the message
+        if str(data.get("status")).lower() == "success":
+            return "SENT", False
+        logger.error("JBD API error: %s", data)
+        return f"FAILED: {data.get('error_message', 'Unknown error')}", False
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_sms_client() -> JBDSmsClient:
+    """Process-wide client (one connection pool, one breaker)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = JBDSmsClient()
+    return _client
+
 
 def send_sms_jbd(phone_number_local_01: str, message: str) -> str:
     """
     phone_number_local_01: 01XXXXXXXXX (11 digits) -> will send as 8801XXXXXXXXX
     Returns "SENT" or "FAILED: <reason>"
     """
+    return post_sms_jbd(phone_number_local_01, message)[0]
+
+
+def post_sms_jbd(phone_number_local_01: str, message: str, client=None) -> tuple[str, bool]:
+    """Like send_sms_jbd but returns (result, retryable) for the outbox worker."""
     api_token = getattr(settings, "JBD_SMS_TOKEN", "")
     sender_id = getattr(settings, "JBD_SENDER_ID", "8809617615010")
 
     if not api_token:
         logger.info("JBD_SMS_TOKEN missing; skipping real send. Would send to %s: %s",
                     phone_number_local_01, message)
-        return "SENT"  # টোকেন না থাকলে ফ্লো ব্লক না করতে চাইলে: pretend success
-
-    headers = {"Content-Type": "application/json", "Accept": "application/json"}
-    payload = {
-        "api_token": api_token,
-        "recipient": f"880{phone_number_local_01[1:]}",
-        "sender_id": sender_id,
-        "type": "plain",
-        "message": message,
-    }
-
-    try:
-        r = requests.post(JBD_URL, json=payload, headers=headers, timeout=10)
-        r.raise_for_status()
-        data = r.json()
-        if str(data.get("status")).lower() == "success":
-            return "SENT"
-        logger.error("JBD API error: %s", data)
-        return f"FAILED: {data.get('error_message', 'Unknown error')}"
-    except requests.RequestException as e:
-        logger.exception("JBD request error")
-        return f"FAILED: {e}"
-    except ValueError as e:
-        logger.exception("JBD parse error")
-        return f"FAILED: {e}"
+        return "SENT", False  # টোকেন না থাকলে ফ্লো ব্লক না করতে চাইলে: pretend success
+
+    recipient = gateway_number(phone_number_local_01)
+    if not recipient:
+        return "FAILED: invalid phone", False
+    client = client or get_sms_client()
+    return client.send(recipient, message, api_token, sender_id)
@@ -0,0 +1,124 @@
+# apps/core/sms_stub.py
+"""
+Local stand-in for the JBD SMS gateway, for tests and `manage.py bench_sms`.
+
+    with StubGateway(responses=[(503, "busy"), (200, {"status": "success"})]) as gw:
+        JBDSmsClient(url=gw.url).send(...)
+
+Scripted responses are served in order, then every further call gets
+`default`. Bodies that are not str/bytes go out as JSON; `gw.received`
+holds the decoded JSON payloads.
+"""
+import datetime as dt
+import json
+import socket
+import ssl
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SUCCESS = (200, {"status": "success"})
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like the real gateway
+    gateway = None
+
+    def setup(self):
+        super().setup()
+        # headers and body go out as separate writes; without this, Nagle +
+        # delayed ACK adds ~40 ms to every keep-alive response
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        status, body = self.gateway._next(raw)
+        if self.gateway.latency:
+            time.sleep(self.gateway.latency)
+        if not isinstance(body, (str, bytes)):
+            body = json.dumps(body)
+        if isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _self_signed_context():
+    """In-memory self-signed cert so the stub can speak TLS (the handshake is the point)."""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = dt.datetime.now(dt.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - dt.timedelta(days=1))
+        .not_valid_after(now + dt.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    with tempfile.NamedTemporaryFile(suffix=".pem", delete=False) as fh:
+        fh.write(cert.public_bytes(serialization.Encoding.PEM))
+        fh.write(key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+        path = fh.name
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ctx.load_cert_chain(path)
+    return ctx
+
+
+class StubGateway:
+    """Threaded HTTP(S) server on 127.0.0.1 (random port) answering the send endpoint."""
+
+    def __init__(self, responses=(), default=SUCCESS, latency=0.0, tls=False):
+        self.responses = list(responses)
+        self.default = default
+        self.latency = latency
+        self.tls = tls
+        self.received = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _next(self, raw: bytes):
+        with self._lock:
+            try:
+                self.received.append(json.loads(raw))
+            except ValueError:
+                self.received.append(raw)
+            return self.responses.pop(0) if self.responses else self.default
+
+    @property
+    def url(self) -> str:
+        scheme = "https" if self.tls else "http"
+        return f"{scheme}://127.0.0.1:{self._server.server_port}/api/http/sms/send"
+
+    def start(self):
+        handler = type("Handler", (_StubHandler,), {"gateway": self})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        if self.tls:
+            self._server.socket = _self_signed_context().wrap_socket(self._server.socket, server_side=True)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -1,3 +1,539 @@
-from django.test import TestCase
+import asyncio
+import importlib
+import json
+import shutil
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404
+from django.shortcuts import resolve_url
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.bookings.models import Booking, Payment
+from apps.guests.models import Guest
+from apps.room.models import Category, Room
+
+from . import events, export_jobs, outbox, pagination, sms
+from .models import ExportJob, SmsLog, SmsOutbox
+from .outbox import enqueue_sms
+from .pagination import KeysetPaginator, datatables_page
+from .phone import gateway_number, phone_q, storage_number, to_e164, to_local
+from .roles import ROLE_RECEPTIONIST
+from .sms import JBDSmsClient, post_sms_jbd
+from .sms_stub import StubGateway
+from .views import export_job_download
+
+DATA_TABLES = ('"bookings_', '"room_', '"guests_')
+
+
+def _data_queries(ctx) -> list[str]:
+    """Captured SQL touching booking / room / guest tables."""
+    return [q["sql"] for q in ctx.captured_queries if any(t in q["sql"] for t in DATA_TABLES)]
+
+
+class EtagVersionTests(TestCase):
+    """
+    etag_versions on the polled front-desk APIs: a repeat GET with the
+    current ETag is a 304 without any booking / room / guest query, and a
+    committed write in one of the view's domains changes the ETag.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("01700000000", "pw")
+        category = Category.objects.create(name="Deluxe")
+        cls.room = Room.objects.create(room_number="101", category=category, price=1000)
+        Room.objects.create(room_number="102", category=category, price=1500)
+        cls.guest = Guest.objects.create(full_name="Test Guest", phone_number="8801711111111")
+        today = timezone.localdate()
+        cls.booking = Booking.objects.create(
+            guest=cls.guest, room=cls.room, status=Booking.Status.CHECKED_IN,
+            check_in=today, check_out=today + timedelta(days=2),
+        )
+        Payment.objects.create(booking=cls.booking, amount=500)
+        cls.endpoints = {
+            # name: (url, params, writes that must change the ETag)
+            "pulse (async)": (reverse("dashboard_pulse"), {}, {"booking", "payment", "guest"}),
+            "rooms overview (async)": (reverse("api_rooms_overview"), {}, {"booking", "payment", "guest"}),
+            "available rooms (async)": (
+                reverse("api_rooms_available"),
+                {"in": today.isoformat(), "out": (today + timedelta(days=1)).isoformat()},
+                {"booking", "payment"},
+            ),
+            "room calendar (sync)": (
+                reverse("api_room_calendar"), {"room": cls.room.pk, "ym": today.strftime("%Y-%m")},
+                {"booking", "payment", "guest"},
+            ),
+        }
+
+    def setUp(self):
+        cache.clear()       # fresh data versions for every test
+        self.client.force_login(self.user)
+
+    def etag(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ETag", response)
+        return response["ETag"]
+
+    def test_repeat_get_is_304_without_data_queries(self):
+        for name, (url, params, _) in self.endpoints.items():
+            with self.subTest(name):
+                etag = self.etag(url, params)
+                with CaptureQueriesContext(connection) as ctx:
+                    response = self.client.get(url, params, headers={"if-none-match": etag})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b"")
+                self.assertEqual(_data_queries(ctx), [])
+                self.assertEqual(len(ctx), 2)   # session + user (login_required)
+
+    def test_committed_writes_change_the_etag(self):
+        writes = {
+            "booking": lambda: Booking.objects.get(pk=self.booking.pk).save(),
+            "payment": lambda: Payment.objects.create(booking=Booking.objects.get(pk=self.booking.pk), amount=100),
+            "guest": lambda: Guest.objects.get(pk=self.guest.pk).save(),
+        }
+        for write, run in writes.items():
+            before = {name: self.etag(url, params) for name, (url, params, _) in self.endpoints.items()}
+            with self.captureOnCommitCallbacks(execute=True):
+                run()
+            for name, (url, params, invalidated_by) in self.endpoints.items():
+                with self.subTest(write=write, endpoint=name):
+                    response = self.client.get(url, params, headers={"if-none-match": before[name]})
+                    self.assertEqual(response.status_code, 200 if write in invalidated_by else 304)
+
+    def test_uncommitted_write_keeps_the_etag(self):
+        url, params, _ = self.endpoints["room calendar (sync)"]
+        etag = self.etag(url, params)
+        Booking.objects.get(pk=self.booking.pk).save()    # on_commit never runs in TestCase
+        self.assertEqual(self.client.get(url, params, headers={"if-none-match": etag}).status_code, 304)
+
+    def test_async_client(self):
+        # driven from this thread so the ORM work (thread-sensitive) lands
+        # on the connection CaptureQueriesContext is watching
+        async_to_sync(self.async_client.aforce_login)(self.user)
+        aget = async_to_sync(self.async_client.get)
+        for name, (url, params, _) in self.endpoints.items():
+            with self.subTest(name):
+                first = aget(url, params)
+                self.assertEqual(first.status_code, 200)
+                with CaptureQueriesContext(connection) as ctx:
+                    response = aget(url, params, headers={"if-none-match": first["ETag"]})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(_data_queries(ctx), [])
+
+
+def _frame(chunk: bytes) -> dict:
+    """Parse one SSE frame into its fields (data decoded)."""
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().splitlines())
+    if "data" in fields:
+        fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+class LiveEventsTests(TestCase):
+    """core:live_events through AsyncClient, against a fresh in-process broker."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("01700000000", "pw")
+        category = Category.objects.create(name="Deluxe")
+        cls.room = Room.objects.create(room_number="101", category=category, price=1000)
+        cls.guest = Guest.objects.create(full_name="Test Guest", phone_number="8801711111111")
+
+    def setUp(self):
+        self.url = reverse("core:live_events")
+        self.use_broker()
+
+    def use_broker(self, **kwargs):
+        self.broker = events.LocalBroker(**kwargs)
+        patcher = mock.patch.object(events, "_broker", self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def open_stream(self, **headers):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b"retry: "))
+        return stream
+
+    async def next_event(self, stream) -> dict:
+        while True:
+            chunk = await asyncio.wait_for(anext(stream), timeout=5)
+            if not chunk.startswith(b":"):     # skip heartbeats
+                return _frame(chunk)
+
+    async def subscribed(self, stream):
+        """Start reading; the stream subscribes on its first read past `retry:`."""
+        reader = asyncio.ensure_future(self.next_event(stream))
+        for _ in range(100):
+            if self.broker.subscriber_count:
+                return reader
+            await asyncio.sleep(0.01)
+        reader.cancel()
+        self.fail("the stream never subscribed")
+
+    @sync_to_async
+    def commit(self, write):
+        # in the ORM's thread: the publishes are on_commit hooks of its connection
+        with self.captureOnCommitCallbacks(execute=True):
+            return write()
+
+    async def test_booking_and_payment_events_arrive_in_order(self):
+        stream = await self.open_stream()
+        reader = await self.subscribed(stream)
+        today = timezone.localdate()
+        booking = await self.commit(lambda: Booking.objects.create(
+            guest=self.guest, room=self.room, status=Booking.Status.RESERVED,
+            check_in=today, check_out=today + timedelta(days=2),
+        ))
+        payment = await self.commit(lambda: Payment.objects.create(booking=booking, amount=500))
+
+        created, paid = await reader, await self.next_event(stream)
+        self.assertEqual((created["event"], paid["event"]), ("booking.created", "payment.added"))
+        self.assertLess(int(created["id"]), int(paid["id"]))
+        self.assertEqual((created["data"]["id"], created["data"]["room"]), (booking.pk, self.room.pk))
+        self.assertEqual(paid["data"]["id"], payment.pk)
+        self.assertEqual((paid["data"]["booking"], paid["data"]["paid"]), (booking.pk, 500))
+
+    async def test_last_event_id_replays_missed_events(self):
+        for n in range(1, 5):
+            self.broker.publish("booking.updated", {"id": n})
+        stream = await self.open_stream(**{"Last-Event-ID": "2"})
+        replayed = [await self.next_event(stream), await self.next_event(stream)]
+        self.assertEqual([(e["id"], e["data"]["id"]) for e in replayed], [("3", 3), ("4", 4)])
+
+    async def test_resync_on_gap(self):
+        self.use_broker(replay=2)
+        for n in range(1, 5):
+            self.broker.publish("booking.updated", {"id": n})
+        stream = await self.open_stream(**{"Last-Event-ID": "1"})   # 2 already left the buffer
+        event = await self.next_event(stream)
+        self.assertEqual((event["event"], event["data"]), (events.RESYNC, {"reason": "gap"}))
+        self.assertNotIn("id", event)
+
+    async def test_resync_on_overflow(self):
+        self.use_broker(queue_size=2)
+        stream = await self.open_stream()
+        reader = await self.subscribed(stream)
+        for n in range(1, 4):       # one more than the queue holds, before the reader runs
+            self.broker.publish("booking.updated", {"id": n})
+        event = await reader
+        self.assertEqual((event["event"], event["data"]), (events.RESYNC, {"reason": "overflow"}))
+
+    async def test_anonymous_is_redirected_to_login(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith(resolve_url(settings.LOGIN_URL)))
+        self.assertEqual(self.broker.subscriber_count, 0)
+
+
+@override_settings(JBD_SMS_TOKEN="test-token", JBD_SENDER_ID="8809600000000")
+class SmsOutboxTests(TestCase):
+    """Outbox claim / retry / dead-letter, sending through JBDSmsClient to a local stub gateway."""
+
+    def setUp(self):
+        self.gateway = StubGateway().start()
+        self.addCleanup(self.gateway.stop)
+        self.client_ = JBDSmsClient(url=self.gateway.url, failure_threshold=100)
+        self.addCleanup(self.client_.close)
+        quiet = mock.patch.object(sms.logger, "disabled", True)     # expected gateway errors
+        quiet.start()
+        self.addCleanup(quiet.stop)
+
+    def drain(self, max_attempts=outbox.MAX_ATTEMPTS):
+        """One sms_worker round: claim what is due, send, record."""
+        batch = outbox.claim_batch(50)
+        for msg in batch:
+            result, retryable = post_sms_jbd(msg.to, msg.body, client=self.client_)
+            outbox.record_result(msg, result, retryable, max_attempts=max_attempts)
+        return batch
+
+    def make_due(self):
+        SmsOutbox.objects.update(next_attempt_at=timezone.now())
+
+    def test_claim_batch(self):
+        now = timezone.now()
+        due = enqueue_sms("01711111111", "due")
+        SmsOutbox.objects.create(to="01711111112", body="later", next_attempt_at=now + timedelta(minutes=5))
+        stale = SmsOutbox.objects.create(to="01711111113", body="stale", status=SmsOutbox.Status.SENDING,
+                                         claimed_at=now - timedelta(seconds=outbox.STALE_CLAIM + 1))
+        SmsOutbox.objects.create(to="01711111114", body="in flight", status=SmsOutbox.Status.SENDING,
+                                 claimed_at=now)
+
+        claimed = outbox.claim_batch(10)
+        self.assertEqual({m.pk for m in claimed}, {due.pk, stale.pk})
+        self.assertEqual(len({m.claimed_by for m in claimed}), 1)
+        self.assertTrue(all(m.status == SmsOutbox.Status.SENDING for m in claimed))
+        self.assertEqual(outbox.claim_batch(10), [])    # nobody claims them twice
+
+    def test_retry_with_backoff_then_sent(self):
+        self.gateway.responses = [(503, "busy")]
+        msg = enqueue_sms("01711111111", "Booking confirmed", context=SmsLog.Kind.CREATED)
+
+        before = timezone.now()
+        self.assertEqual(len(self.drain()), 1)
+        msg.refresh_from_db()
+        self.assertEqual((msg.status, msg.attempts), (SmsOutbox.Status.PENDING, 1))
+        self.assertIn("503", msg.last_error)
+        delay = (msg.next_attempt_at - before).total_seconds()
+        self.assertTrue(outbox.BACKOFF_BASE * 0.8 <= delay <= outbox.BACKOFF_BASE * 1.2 + 1, delay)
+        self.assertEqual(self.drain(), [])          # not due yet
+        self.assertFalse(SmsLog.objects.exists())   # logged only once final
+
+        self.make_due()
+        self.drain()
+        msg.refresh_from_db()
+        self.assertEqual((msg.status, msg.attempts, msg.last_error), (SmsOutbox.Status.SENT, 2, ""))
+        log = SmsLog.objects.get()
+        self.assertEqual((log.to, log.result, log.context), ("01711111111", "SENT", SmsLog.Kind.CREATED))
+        self.assertEqual(len(self.gateway.received), 2)
+        self.assertEqual(self.gateway.received[-1]["recipient"], "8801711111111")
+
+    def test_dead_letter_after_max_attempts(self):
+        self.gateway.default = (502, "bad gateway")
+        msg = enqueue_sms("01711111111", "Checked out")
+        for _ in range(3):
+            self.drain(max_attempts=3)
+            self.make_due()
+        msg.refresh_from_db()
+        self.assertEqual((msg.status, msg.attempts), (SmsOutbox.Status.FAILED, 3))
+        self.assertEqual(self.drain(max_attempts=3), [])     # dead: never claimed again
+        self.assertTrue(SmsLog.objects.get().result.startswith("FAILED"))
+        self.assertEqual(len(self.gateway.received), 3)
+
+    def test_rejection_is_not_retried(self):
+        self.gateway.responses = [(200, {"status": "error", "error_message": "Invalid number"})]
+        msg = enqueue_sms("01711111111", "Hello")
+        self.drain()
+        msg.refresh_from_db()
+        self.assertEqual((msg.status, msg.attempts, msg.last_error),
+                         (SmsOutbox.Status.FAILED, 1, "FAILED: Invalid number"))
+
+
+class ExportJobTests(TestCase):
+    """Background export files stay out of MEDIA_ROOT and are only served to the job's viewers."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("01700000000", "pw")
+        cls.other = User.objects.create_user("01700000001", "pw", role=ROLE_RECEPTIONIST)
+        SmsLog.objects.create(to="01711111111", body="Booking confirmed", result="SENT")
+
+    def test_file_is_private_and_downloaded_through_the_view(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("sms_log_export"), {"background": "1"})
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(export_jobs.run(export_jobs.claim()))
+
+        job = ExportJob.objects.get()
+        path = Path(job.file.path)
+        self.addCleanup(shutil.rmtree, path.parent, ignore_errors=True)
+        self.assertEqual(job.status, ExportJob.Status.DONE)
+        self.assertTrue(path.is_relative_to(export_jobs.EXPORT_JOB_DIR))
+        self.assertFalse(path.is_relative_to(Path(settings.MEDIA_ROOT).resolve()))
+
+        download = self.client.get(reverse("core:export_job_download", args=[job.pk]))
+        self.assertEqual(download.status_code, 200)
+        self.assertIn(b"01711111111", b"".join(download.streaming_content))
+
+        request = RequestFactory().get("/")
+        request.user = self.other       # not the job's owner, not an admin
+        with self.assertRaises(Http404):
+            export_job_download(request, job.pk)
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor round-trips, tampering and paging across runs of equal sort keys."""
+
+    ORDERING = ("-created_at", "-id")
+
+    @classmethod
+    def setUpTestData(cls):
+        SmsLog.objects.bulk_create(SmsLog(to=f"0171111{i:04d}", body="x", result="SENT") for i in range(11))
+        # three timestamps only: every page boundary falls inside a run of ties
+        base = timezone.now()
+        for i, pk in enumerate(SmsLog.objects.order_by("id").values_list("id", flat=True)):
+            SmsLog.objects.filter(pk=pk).update(created_at=base - timedelta(minutes=i % 3))
+        cls.expected = list(SmsLog.objects.order_by(*cls.ORDERING).values_list("id", flat=True))
+
+    def paginator(self, **kwargs):
+        return KeysetPaginator(SmsLog.objects.all(), self.ORDERING, per_page=4, count="exact", **kwargs)
+
+    @staticmethod
+    def ids(page):
+        return [obj.pk for obj in page]
+
+    def test_walk_forward_and_back(self):
+        paginator = self.paginator()
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        self.assertEqual([self.ids(p) for p in pages], [self.expected[i:i + 4] for i in (0, 4, 8)])
+        self.assertEqual([(p.start_index(), p.end_index()) for p in pages], [(1, 4), (5, 8), (9, 11)])
+        self.assertEqual({p.count for p in pages}, {11})
+
+        back = [pages[-1]]
+        while back[-1].has_previous():
+            back.append(paginator.page(back[-1].previous_cursor))
+        self.assertEqual([self.ids(p) for p in back], [self.ids(p) for p in reversed(pages)])
+        self.assertEqual(back[-1].start_index(), 1)
+        self.assertFalse(back[-1].has_previous())
+
+    def test_cursor_round_trip(self):
+        paginator = self.paginator(scope="a", carry={"total": 7})
+        first = paginator.page()
+        cursor = paginator.cursor(first.next_cursor)
+        self.assertEqual((cursor["d"], cursor["o"], cursor["c"], cursor["x"]), ("n", 4, 11, {"total": 7}))
+        last = SmsLog.objects.get(pk=self.expected[3])
+        self.assertEqual(paginator._parse(cursor["v"]), [last.created_at, last.pk])
+        self.assertEqual(paginator.page(first.next_cursor).carry, {"total": 7})
+
+    def test_tampered_or_foreign_cursor_restarts(self):
+        paginator = self.paginator(scope="a")
+        token = paginator.page().next_cursor
+        payload, sig = token.rsplit(":", 1)
+        tampered = f"{payload}:{sig[:-1]}{'A' if sig[-1] != 'A' else 'B'}"
+        for bad in (tampered, "garbage", self.paginator(scope="b").page().next_cursor):
+            with self.subTest(bad=bad[:12]):
+                self.assertIsNone(paginator.cursor(bad))
+                page = paginator.page(bad)
+                self.assertEqual((self.ids(page), page.offset), (self.expected[:4], 0))
+
+    def test_datatables_steps_by_cursor_and_honours_all(self):
+        rf, qs = RequestFactory(), SmsLog.objects.all()
+
+        def stats():
+            return {"recordsFiltered": qs.count()}
+
+        first, totals = datatables_page(rf.get("/", {"start": 0, "length": 4}), qs, self.ORDERING, {}, stats)
+        second, carried = datatables_page(
+            rf.get("/", {"start": 4, "length": 4, "cursor": first.next_cursor}), qs, self.ORDERING, {}, stats,
+        )
+        self.assertEqual((self.ids(second), carried), (self.expected[4:8], totals))
+
+        with mock.patch.object(pagination, "KEYSET_COUNT_CAP", 5):
+            everything, _ = datatables_page(rf.get("/", {"start": 0, "length": -1}), qs, self.ORDERING, {}, stats)
+        self.assertEqual(self.ids(everything), self.expected)
+        self.assertFalse(everything.has_next())
+
+
+class PhoneNormalizationTests(TestCase):
+    """apps.core.phone rules, and the frozen copies the phone_e164 migrations backfill with."""
+
+    # raw input -> (to_local, to_e164)
+    CASES = {
+        "01711223344": ("01711223344", "+8801711223344"),
+        "1711223344": ("01711223344", "+8801711223344"),
+        "8801711223344": ("01711223344", "+8801711223344"),
+        "+8801711223344": ("01711223344", "+8801711223344"),
+        "008801711223344": ("01711223344", "+8801711223344"),
+        "+880 1711-223344": ("01711223344", "+8801711223344"),
+        " 017 1122-3344 ": ("01711223344", "+8801711223344"),
+        "(+880) 1711 22 33 44": ("01711223344", "+8801711223344"),
+        "+880": (None, None),
+        "880": (None, None),
+        "0": (None, None),
+        "8801711": (None, None),              # 880 prefix, too short
+        "88017112233445": (None, None),       # 880 prefix, one digit too many
+        "0171122334": (None, None),           # 10 digits
+        "017112233445": (None, None),         # 12 digits
+        "02-9876543": (None, None),           # Dhaka landline, local form
+        "+44 20 7946 0958": (None, "+442079460958"),
+        "0044 20 7946 0958": (None, "+442079460958"),
+        "+1234567": (None, None),             # international, too short
+        "+1234567890123456": (None, None),    # international, too long
+        "abc": (None, None),
+        "": (None, None),
+        None: (None, None),
+    }
+
+    def test_to_local_and_to_e164(self):
+        for raw, (local, e164) in self.CASES.items():
+            with self.subTest(raw=raw):
+                self.assertEqual(to_local(raw), local)
+                self.assertEqual(to_e164(raw), e164)
+                self.assertEqual(gateway_number(raw), e164[1:] if e164 else None)
+
+    def test_migration_copies_match(self):
+        for label in ("apps.accounts.migrations.0003_phone_e164", "apps.guests.migrations.0006_phone_e164"):
+            frozen = importlib.import_module(label)._to_e164
+            for raw in self.CASES:
+                with self.subTest(migration=label, raw=raw):
+                    self.assertEqual(frozen(raw) or "", to_e164(raw) or "")
+
+    def test_storage_number(self):
+        cases = {
+            "+880 1711-223344": "8801711223344",
+            "01711223344": "8801711223344",
+            "02-9876543": "88029876543",
+            "88029876543": "88029876543",
+            "": "",
+            None: "",
+        }
+        for raw, stored in cases.items():
+            with self.subTest(raw=raw):
+                self.assertEqual(storage_number(raw), stored)
+
+    def test_phone_q_matches_any_format(self):
+        guest = Guest.objects.create(full_name="Test Guest", phone_number="01711223344")
+        self.assertEqual(guest.phone_e164, "+8801711223344")
+        for raw in ("+880 1711-223344", "8801711223344", "1711223344", "01711-223344"):
+            with self.subTest(raw=raw):
+                self.assertEqual(list(Guest.objects.filter(phone_q(raw))), [guest])
+        for raw in ("+880", "0171122334", ""):
+            with self.subTest(raw=raw):
+                self.assertFalse(Guest.objects.filter(phone_q(raw)).exists())
+
+
+class JBDSmsClientTests(SimpleTestCase):
+    """How gateway answers map to (result, retryable) and the circuit breaker."""
+
+    def setUp(self):
+        self.gateway = StubGateway().start()
+        self.addCleanup(self.gateway.stop)
+        self.sms = JBDSmsClient(url=self.gateway.url, failure_threshold=2, reset_after=60)
+        self.addCleanup(self.sms.close)
+        quiet = mock.patch.object(sms.logger, "disabled", True)
+        quiet.start()
+        self.addCleanup(quiet.stop)
+
+    def send(self):
+        return self.sms.send("8801711111111", "Hello", "token", "8809600000000")
+
+    def test_malformed_body_is_permanent_and_keeps_the_breaker_closed(self):
+        for body in ("<html>maintenance</html>", "", "[1, 2]", "null"):
+            with self.subTest(body=body):
+                self.gateway.responses = [(200, body)]
+                result, retryable = self.send()
+                self.assertTrue(result.startswith("FAILED: bad response"), result)
+                self.assertFalse(retryable)
+        self.assertFalse(self.sms.is_open)
+        self.assertEqual(self.send(), ("SENT", False))
+
+    def test_server_errors_are_retryable_and_open_the_breaker(self):
+        self.gateway.default = (503, "busy")
+        self.assertTrue(self.send()[1])
+        self.assertTrue(self.send()[1])
+        self.assertTrue(self.sms.is_open)
+        self.assertEqual(self.send(), ("FAILED: circuit open", True))
+        self.assertEqual(len(self.gateway.received), 2)     # fails fast while open
+
+    def test_client_error_is_permanent(self):
+        self.gateway.responses = [(400, {"error": "bad request"})]
+        result, retryable = self.send()
+        self.assertIn("400", result)
+        self.assertFalse(retryable)
+        self.assertFalse(self.sms.is_open)
@@ -1,9 +1,16 @@
 from django.urls import path
-from .views import NoAccessPage
+from .views import (
+    ExportJobsPage, NoAccessPage, QueryProfilePage,
+    export_job_download, export_job_status, live_events,
+)
 
 app_name = "core"
 
 urlpatterns = [
     path("no-access/", NoAccessPage.as_view(), name="no_access"),
-
+    path("ops/profile/", QueryProfilePage.as_view(), name="query_profile"),
+    path("live/events/", live_events, name="live_events"),
+    path("exports/", ExportJobsPage.as_view(), name="export_jobs"),
+    path("exports/<int:pk>/status/", export_job_status, name="export_job_status"),
+    path("exports/<int:pk>/download/", export_job_download, name="export_job_download"),
 ]
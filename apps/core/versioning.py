@@ -0,0 +1,139 @@
+# apps/core/versioning.py
+"""
+Data versions for conditional GETs on the polled front-desk APIs.
+
+Each domain (bookings, payments, rooms, guests) has a counter in the Django
+cache that only ever goes up: model signals bump it once the write commits
+(see bump()). A view decorated with
+
+    @method_decorator(etag_versions("bookings", "rooms"), name="get")
+
+answers If-None-Match from those counters alone: one cache read, and a
+matching client gets 304 before the view runs a single query of its own.
+
+The ETag also covers the URL, the user and today's date (the APIs default
+their windows to "today"). A counter that vanished from the cache (restart,
+eviction) is reseeded from the clock, so it never repeats an old value.
+With the default LocMem cache the counters are per process — configure a
+shared cache when running several workers.
+
+bulk_create / queryset.update() skip the signals: call bump() after them.
+"""
+import hashlib
+import time
+from datetime import date
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+DOMAINS = ("bookings", "payments", "rooms", "guests")
+KEY_PREFIX = "data_version:"
+
+
+def _key(domain: str) -> str:
+    if domain not in DOMAINS:
+        raise ValueError(f"Unknown data domain: {domain!r}")
+    return KEY_PREFIX + domain
+
+
+def _seed() -> int:
+    return time.time_ns() // 1000
+
+
+def versions(*domains: str) -> dict | None:
+    """{domain: version} in one cache round trip, or None if the cache is unavailable."""
+    keys = {d: _key(d) for d in domains}
+    try:
+        found = cache.get_many(list(keys.values()))
+        for domain, key in keys.items():
+            if key not in found:
+                cache.add(key, _seed(), timeout=None)
+                found[key] = cache.get(key)
+    except Exception:
+        return None
+    return {d: found[k] for d, k in keys.items()}
+
+
+def _bump_now(domains):
+    try:
+        for domain in domains:
+            key = _key(domain)
+            cache.add(key, _seed(), timeout=None)
+            cache.incr(key)
+    except Exception:
+        pass
+
+
+def bump(*domains: str, using=None):
+    """Advance the given domains once the current transaction commits."""
+    for d in domains:
+        _key(d)  # fail fast on typos, not inside on_commit
+    transaction.on_commit(lambda: _bump_now(domains), using=using)
+
+
+def data_etag(request, domains) -> str | None:
+    """Quoted ETag for this request under the current domain versions."""
+    current = versions(*domains)
+    if current is None:
+        return None
+    user = getattr(request, "user", None)
+    parts = [
+        request.get_full_path(),
+        str(getattr(user, "pk", "") or ""),
+        date.today().isoformat(),
+        *(f"{d}={current[d]}" for d in sorted(current)),
+    ]
+    return '"%s"' % hashlib.md5("|".join(parts).encode()).hexdigest()
+
+
+def etag_versions(*domains: str):
+    """
+    View decorator: ETag from the domain versions, 304 on a matching
+    If-None-Match without calling the view. Only GET/HEAD 200s are tagged.
+    Works on sync and async views.
+    """
+    for d in domains:
+        _key(d)
+
+    def _tag(response, etag):
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def deco(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _awrapped(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return await view_func(request, *args, **kwargs)
+                etag = await sync_to_async(data_etag)(request, domains)
+                if etag is None:
+                    return await view_func(request, *args, **kwargs)
+
+                response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                    if response.status_code != 200:
+                        return response
+                return _tag(response, etag)
+            return _awrapped
+
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view_func(request, *args, **kwargs)
+            etag = data_etag(request, domains)
+            if etag is None:
+                return view_func(request, *args, **kwargs)
+
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            return _tag(response, etag)
+        return _wrapped
+    return deco
@@ -1,6 +1,23 @@
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
 from web_project import TemplateLayout, TemplateHelper
 
+from .events import format_sse, get_broker
+from .export_jobs import job_payload, visible_jobs
+from .exports import ChunkedFileResponse
+from .guards import RequireAnyRoleMixin, RequireStaffMixin
+from .models import ExportJob
+from .profiling import PROFILING_ENABLED, profile_buffer, report
+from .roles import ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN, in_any
+
+EVENTS_HEARTBEAT_SECONDS = getattr(settings, "EVENTS_HEARTBEAT_SECONDS", 15)
+LIVE_EVENT_ROLES = (ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN)
+
 class NoAccessPage(TemplateView):
     template_name = "core/no_access.html"
 
@@ -11,3 +28,91 @@ def get_context_data(self, **kwargs):
             "page_title": "No Access",
         })
         return context
+
+
+@method_decorator(login_required, name="dispatch")
+class QueryProfilePage(RequireStaffMixin, TemplateView):
+    """Per-view latency percentiles + duplicate-query offenders (this process)."""
+    template_name = "core/query_profile.html"
+
+    def get_context_data(self, **kwargs):
+        context = TemplateLayout.init(self, super().get_context_data(**kwargs))
+        context.update({
+            "layout_path": TemplateHelper.set_layout("layout_vertical.html", context),
+            "page_title": "Request Profile",
+            "enabled": PROFILING_ENABLED,
+            "report": report(),
+        })
+        return context
+
+    def post(self, request, *args, **kwargs):
+        profile_buffer.clear()
+        messages.success(request, "Profile buffer cleared.")
+        return redirect("core:query_profile")
+
+
+# ---- live front-desk events (SSE, serve via config.asgi) ----
+def _last_event_id(request):
+    raw = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        return int(raw) if raw else None
+    except ValueError:
+        return None
+
+
+async def _event_stream(last_event_id):
+    # subscribe inside the generator: the queue must belong to the loop that reads it
+    yield f"retry: {EVENTS_HEARTBEAT_SECONDS * 1000}\n\n"
+    async with get_broker().subscribe(last_event_id) as sub:
+        while True:
+            yield format_sse(await sub.get(timeout=EVENTS_HEARTBEAT_SECONDS))
+
+
+@login_required
+async def live_events(request):
+    """text/event-stream of booking / payment deltas (apps/core/events.py)."""
+    user = await request.auser()
+    if not (user.is_superuser or in_any(getattr(user, "role", None), LIVE_EVENT_ROLES)):
+        return HttpResponseForbidden("You do not have permission to access this page.")
+
+    response = StreamingHttpResponse(_event_stream(_last_event_id(request)), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"   # nginx: pass events through unbuffered
+    return response
+
+
+# ---- background exports (apps/core/export_jobs.py) ----
+EXPORT_ROLES = (ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN)
+
+
+@method_decorator(login_required, name="dispatch")
+class ExportJobsPage(RequireAnyRoleMixin, TemplateView):
+    """The user's recent export jobs; running ones poll export_job_status."""
+    template_name = "core/export_jobs.html"
+    allowed_roles = EXPORT_ROLES
+
+    def get_context_data(self, **kwargs):
+        context = TemplateLayout.init(self, super().get_context_data(**kwargs))
+        context.update({
+            "layout_path": TemplateHelper.set_layout("layout_vertical.html", context),
+            "page_title": "Exports",
+            "jobs": visible_jobs(self.request.user)[:50],
+            "highlight": self.request.GET.get("job", ""),
+        })
+        return context
+
+
+@login_required
+def export_job_status(request, pk):
+    job = get_object_or_404(visible_jobs(request.user), pk=pk)
+    return JsonResponse(job_payload(job))
+
+
+@login_required
+def export_job_download(request, pk):
+    job = get_object_or_404(visible_jobs(request.user), pk=pk, status=ExportJob.Status.DONE)
+    try:
+        fh = job.file.open("rb")
+    except (FileNotFoundError, ValueError):
+        raise Http404("This export has expired.")
+    return ChunkedFileResponse(fh, as_attachment=True, filename=job.filename)
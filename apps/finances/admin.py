@@ -1,12 +1,13 @@
 from __future__ import annotations
 from django.contrib import admin
 from django.db.models import Sum
-from django.http import HttpResponse
-import csv
+
+from apps.core.exports import queryset_rows, stream_csv
 
 from .models import (
     ExpenseCategory, Expense,
     IncomeCategory, Income,
+    DailyFinanceRollup,
 )
 
 # -----------------------------
@@ -77,23 +78,12 @@ def short_note(self, obj):
 
     @admin.action(description="Export selected expenses (CSV)")
     def export_csv(self, request, queryset):
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = "attachment; filename=expenses.csv"
-        writer = csv.writer(response)
-
-        writer.writerow(["ID", "Date", "Category", "Name", "Amount", "Note"])
-
-        for e in queryset.select_related("exp_category"):
-            writer.writerow([
-                e.id,
-                e.date,
-                e.exp_category.name if e.exp_category else "",
-                e.exp_name,
-                e.amount,
-                (e.note or "").replace("\n", " ").strip(),
-            ])
-
-        return response
+        fields = ("id", "date", "exp_category__name", "exp_name", "amount", "note")
+        rows = (
+            [eid, d, cat or "", name, amount, (note or "").replace("\n", " ").strip()]
+            for eid, d, cat, name, amount, note in queryset_rows(queryset, fields)
+        )
+        return stream_csv("expenses.csv", ["ID", "Date", "Category", "Name", "Amount", "Note"], rows, bom=False)
 
     def changelist_view(self, request, extra_context=None):
         """
@@ -167,23 +157,12 @@ def short_note(self, obj):
 
     @admin.action(description="Export selected incomes (CSV)")
     def export_csv(self, request, queryset):
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = "attachment; filename=incomes.csv"
-        writer = csv.writer(response)
-
-        writer.writerow(["ID", "Date", "Category", "Name", "Amount", "Note"])
-
-        for i in queryset.select_related("income_category"):
-            writer.writerow([
-                i.id,
-                i.date,
-                i.income_category.name if i.income_category else "",
-                i.income_name,
-                i.amount,
-                (i.note or "").replace("\n", " ").strip(),
-            ])
-
-        return response
+        fields = ("id", "date", "income_category__name", "income_name", "amount", "note")
+        rows = (
+            [iid, d, cat or "", name, amount, (note or "").replace("\n", " ").strip()]
+            for iid, d, cat, name, amount, note in queryset_rows(queryset, fields)
+        )
+        return stream_csv("incomes.csv", ["ID", "Date", "Category", "Name", "Amount", "Note"], rows, bom=False)
 
     def changelist_view(self, request, extra_context=None):
         """
@@ -197,3 +176,26 @@ def changelist_view(self, request, extra_context=None):
         except Exception:
             pass
         return response
+
+
+# =============================
+# REPORTING ROLLUP (read-only)
+# =============================
+
+@admin.register(DailyFinanceRollup)
+class DailyFinanceRollupAdmin(admin.ModelAdmin):
+    list_display = (
+        "date", "room_category_id", "method", "expense_category_id", "income_category_id",
+        "charges", "refunds", "bookings", "net_booked", "due", "expenses", "income",
+    )
+    list_filter = ("method",)
+    date_hierarchy = "date"
+    ordering = ("-date",)
+    list_per_page = 50
+
+    # rows are derived data: rebuilt by signals / `manage.py rebuild_finance_rollup`
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
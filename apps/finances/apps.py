@@ -4,3 +4,7 @@
 class FinancesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.finances'
+
+    def ready(self):
+        # DailyFinanceRollup maintenance
+        from . import signals  # noqa
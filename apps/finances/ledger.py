@@ -0,0 +1,378 @@
+# apps/finances/ledger.py
+"""
+Ledger engine: booking payments, other income and expenses as one dated
+stream with a running balance.
+
+Each source is read in date order with a server-side iterator and the
+three are merged with a heap (heapq.merge), so a ten-year ledger streams
+in constant memory:
+
+    ledger = Ledger(start, end, search="", expense_category=None, income_category=None)
+    ledger.opening            balance carried from before `start`
+    ledger.rows()             every row of the window, running balance included
+    ledger.page(cursor, 50)   one page for the HTML view (keyset cursors)
+    ledger.totals()           window sums (rollup table unless searching)
+
+Rows are ordered by (day, source, time, id): within a day payments come
+first (by received_at), then income, then expenses. Payments are dated in
+the local time zone, like the daily rollup.
+
+A page cursor carries the sort key of its boundary row and the balance at
+that point, so every page (forward or back) is an index range read of at
+most per_page + 1 rows per source, however deep into the history it is.
+"""
+import heapq
+from datetime import date, datetime, time, timedelta
+from operator import attrgetter
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from apps.core import pdf
+from apps.core.pagination import KeysetPage
+
+from . import rollup
+from .models import Expense, Income
+
+LEDGER_PAGE_SIZE = getattr(settings, "LEDGER_PAGE_SIZE", 50)
+LEDGER_CHUNK_SIZE = getattr(settings, "LEDGER_CHUNK_SIZE", 2000)
+_SALT = "finances.ledger"
+
+
+class LedgerRow(NamedTuple):
+    key: tuple          # (day, source rank, time or None, id): merge / cursor order
+    day: date
+    kind: str           # "payment" | "refund" | "income" | "expense"
+    category: str
+    name: str
+    phone: str
+    note: str
+    amount: int         # signed: money in > 0, money out < 0
+    balance: int = 0    # after this row
+
+    # refunds count against income (negative inflow), so the income column
+    # and its total are booking receipts net of refunds
+    @property
+    def inflow(self):
+        return self.amount if self.amount > 0 or self.kind == "refund" else 0
+
+    @property
+    def outflow(self):
+        return -self.amount if self.amount < 0 and self.kind != "refund" else 0
+
+
+def _aware(d: date) -> datetime:
+    return timezone.make_aware(datetime.combine(d, time.min))
+
+
+# ---------- sources ----------
+class _PaymentSource:
+    rank = 0
+    fields = (
+        "id", "received_at", "kind", "amount", "txn_ref",
+        "booking__guest__full_name", "booking__guest__phone_number",
+        "booking__room__room_number", "booking__check_in", "booking__check_out",
+    )
+
+    def queryset(self, ledger):
+        from apps.bookings.models import Payment
+
+        qs = Payment.objects.all()
+        if ledger.search:
+            qs = qs.filter(
+                Q(booking__guest__full_name__icontains=ledger.search) |
+                Q(booking__room__room_number__icontains=ledger.search) |
+                Q(txn_ref__icontains=ledger.search)
+            )
+        return qs
+
+    def window(self, day_from, day_to) -> Q:
+        q = Q()
+        if day_from:
+            q &= Q(received_at__gte=_aware(day_from))
+        if day_to:
+            q &= Q(received_at__lt=_aware(day_to + timedelta(days=1)))
+        return q
+
+    def seek(self, key, forward) -> Q:
+        day, rank, ts, pk = key
+        if rank != self.rank:
+            # another source's boundary: only the day matters (payments sort first)
+            return Q(received_at__gte=_aware(day + timedelta(days=1))) if forward else Q(received_at__lt=_aware(day + timedelta(days=1)))
+        op = "gt" if forward else "lt"
+        return Q(**{f"received_at__{op}": ts}) | Q(received_at=ts, **{f"id__{op}": pk})
+
+    def ordering(self, forward):
+        return ("received_at", "id") if forward else ("-received_at", "-id")
+
+    def row(self, values) -> LedgerRow:
+        pk, at, kind, amount, ref, guest, phone, room, check_in, check_out = values
+        refund = kind == "REFUND"
+        note = f"Room {room}" if room else ""
+        if check_in and check_out:
+            note += f" | {check_in:%d/%m/%Y} → {check_out:%d/%m/%Y}"
+        return LedgerRow(
+            key=(rollup.local_date(at), self.rank, at, pk),
+            day=rollup.local_date(at),
+            kind="refund" if refund else "payment",
+            category="Refund" if refund else "Booking",
+            name=guest or "Guest",
+            phone=phone or "",
+            note=f"{note} | Ref {ref}" if ref else note,
+            amount=-amount if refund else amount,
+        )
+
+
+class _DatedSource:
+    """Income / Expense: a DateField, a category and a name."""
+    def __init__(self, rank, kind, model, category, name, filter_attr, sign):
+        self.rank, self.kind, self.model, self.sign = rank, kind, model, sign
+        self.category, self.name, self.filter_attr = category, name, filter_attr
+        self.fields = ("id", "date", f"{category}__name", name, "amount", "note")
+
+    def queryset(self, ledger):
+        qs = self.model.objects.all()
+        category = getattr(ledger, self.filter_attr)
+        if category:
+            qs = qs.filter(**{f"{self.category}_id": category})
+        if ledger.search:
+            qs = qs.filter(Q(**{f"{self.name}__icontains": ledger.search}) | Q(note__icontains=ledger.search))
+        return qs
+
+    def window(self, day_from, day_to) -> Q:
+        q = Q()
+        if day_from:
+            q &= Q(date__gte=day_from)
+        if day_to:
+            q &= Q(date__lte=day_to)
+        return q
+
+    def seek(self, key, forward) -> Q:
+        day, rank, _, pk = key
+        if rank == self.rank:
+            op = "gt" if forward else "lt"
+            return Q(**{f"date__{op}": day}) | Q(date=day, **{f"id__{op}": pk})
+        # same day sorts before (forward: skip it) or after (forward: include it) the boundary
+        if forward:
+            return Q(date__gt=day) if self.rank < rank else Q(date__gte=day)
+        return Q(date__lte=day) if self.rank < rank else Q(date__lt=day)
+
+    def ordering(self, forward):
+        return ("date", "id") if forward else ("-date", "-id")
+
+    def row(self, values) -> LedgerRow:
+        pk, day, category, name, amount, note = values
+        return LedgerRow(
+            key=(day, self.rank, None, pk),
+            day=day,
+            kind=self.kind,
+            category=category or "",
+            name=name or "",
+            phone="",
+            note=note or "",
+            amount=self.sign * amount,
+        )
+
+
+SOURCES = (
+    _PaymentSource(),
+    _DatedSource(1, "income", Income, "income_category", "income_name", "income_category", +1),
+    _DatedSource(2, "expense", Expense, "exp_category", "exp_name", "expense_category", -1),
+)
+
+
+# ---------- cursors ----------
+def _dump_key(key) -> list:
+    day, rank, ts, pk = key
+    return [day.isoformat(), rank, ts.isoformat() if ts else None, pk]
+
+
+def _load_key(raw) -> tuple:
+    day, rank, ts, pk = raw
+    return (date.fromisoformat(day), int(rank), datetime.fromisoformat(ts) if ts else None, int(pk))
+
+
+# ---------- engine ----------
+class Ledger:
+    def __init__(self, start=None, end=None, search="", expense_category=None, income_category=None):
+        self.start = start
+        self.end = end
+        self.search = (search or "").strip()
+        self.expense_category = int(expense_category) if expense_category else None
+        self.income_category = int(income_category) if income_category else None
+        self._opening = None
+
+    # ---- sums ----
+    def sums(self, day_from=None, day_to=None) -> dict:
+        """{"charges", "refunds", "income", "expenses"} over [day_from, day_to] (None = open)."""
+        if self.search:
+            return self._scan_sums(day_from, day_to)
+        out = rollup.totals(day_from, day_to)
+        if self.expense_category:
+            out["expenses"] = rollup.totals(day_from, day_to, expense_category_id=self.expense_category)["expenses"]
+        if self.income_category:
+            out["income"] = rollup.totals(day_from, day_to, income_category_id=self.income_category)["income"]
+        return {k: out[k] for k in ("charges", "refunds", "income", "expenses")}
+
+    def _scan_sums(self, day_from, day_to) -> dict:
+        payments, income, expenses = (
+            source.queryset(self).filter(source.window(day_from, day_to)) for source in SOURCES
+        )
+        p = payments.aggregate(
+            charges=Sum("amount", filter=Q(kind="CHARGE"), default=0),
+            refunds=Sum("amount", filter=Q(kind="REFUND"), default=0),
+        )
+        return {
+            "charges": p["charges"],
+            "refunds": p["refunds"],
+            "income": income.aggregate(s=Sum("amount", default=0))["s"],
+            "expenses": expenses.aggregate(s=Sum("amount", default=0))["s"],
+        }
+
+    @property
+    def opening(self) -> int:
+        """Balance carried from everything before the window."""
+        if self._opening is None:
+            if self.start is None:
+                self._opening = 0
+            else:
+                s = self.sums(None, self.start - timedelta(days=1))
+                self._opening = s["charges"] - s["refunds"] + s["income"] - s["expenses"]
+        return self._opening
+
+    def totals(self) -> dict:
+        s = self.sums(self.start, self.end)
+        s["received"] = s["charges"] - s["refunds"]
+        s["inflow"] = s["received"] + s["income"]     # net of refunds, like the old ledger
+        s["outflow"] = s["expenses"]
+        s["opening"] = self.opening
+        s["closing"] = self.opening + s["inflow"] - s["outflow"]
+        return s
+
+    def count(self) -> int:
+        """Rows in the window (one COUNT per source)."""
+        return sum(
+            source.queryset(self).filter(source.window(self.start, self.end)).count()
+            for source in SOURCES
+        )
+
+    def fingerprint(self) -> list:
+        """
+        Count and last update of every row up to `end` (the opening balance
+        depends on all of them) plus the guests and rooms payments are labelled
+        with: the PDF cache key for this ledger.
+        """
+        from apps.guests.models import Guest
+        from apps.room.models import Room
+
+        return pdf.fingerprint(
+            *(source.queryset(self).filter(source.window(None, self.end)) for source in SOURCES),
+            Guest.objects.all(), Room.objects.all(),
+        )
+
+    # ---- streams ----
+    def _stream(self, source, boundary=None, forward=True, limit=None):
+        qs = source.queryset(self).filter(source.window(self.start, self.end))
+        if boundary is not None:
+            qs = qs.filter(source.seek(boundary, forward))
+        qs = qs.order_by(*source.ordering(forward)).values_list(*source.fields)
+        if limit:
+            qs = qs[:limit]
+        for values in qs.iterator(chunk_size=LEDGER_CHUNK_SIZE):
+            yield source.row(values)
+
+    def merged(self, boundary=None, forward=True, limit=None):
+        """Rows of every source after (forward) / before `boundary`, merged by key."""
+        return heapq.merge(
+            *(self._stream(s, boundary, forward, limit) for s in SOURCES),
+            key=attrgetter("key"), reverse=not forward,
+        )
+
+    def rows(self, balance=None):
+        """Every row of the window in order, with the running balance."""
+        balance = self.opening if balance is None else balance
+        for row in self.merged():
+            balance += row.amount
+            yield row._replace(balance=balance)
+
+    # ---- pages ----
+    def page(self, token=None, per_page=LEDGER_PAGE_SIZE, scope="") -> KeysetPage:
+        """
+        One page of rows. page.carry holds the window totals (computed on
+        the first page, then carried in the cursors); page.brought_forward
+        is the balance before its first row.
+        """
+        limit = per_page + 1
+        cursor = self._cursor(token, scope)
+        if cursor is None:
+            carry = self.totals()
+            offset, balance = 0, carry["opening"]
+            rows = self._forward(None, balance, limit)
+            has_previous = False
+        else:
+            carry, offset, balance = cursor["x"], cursor["o"], cursor["b"]
+            boundary = _load_key(cursor["k"])
+            if cursor["d"] == "p":
+                rows = self._backward(boundary, balance, limit)
+                has_previous = len(rows) > per_page
+                rows = rows[-per_page:]
+                offset = max(0, offset) if has_previous else 0
+            else:
+                rows = self._forward(boundary, balance, limit)
+                has_previous = True
+        has_next = len(rows) > per_page if cursor is None or cursor["d"] != "p" else True
+        rows = rows[:per_page]
+
+        def mint(boundary_row, direction, at, balance):
+            return signing.dumps({
+                "k": _dump_key(boundary_row.key), "d": direction, "o": max(0, at),
+                "b": balance, "x": carry, "s": scope,
+            }, salt=_SALT, compress=True)
+
+        page = KeysetPage(
+            rows, None,
+            offset=offset,
+            has_next=has_next,
+            has_previous=has_previous,
+            next_cursor=mint(rows[-1], "n", offset + len(rows), rows[-1].balance) if has_next and rows else None,
+            previous_cursor=(
+                mint(rows[0], "p", offset - per_page, rows[0].balance - rows[0].amount)
+                if has_previous and rows else None
+            ),
+            carry=carry,
+        )
+        page.brought_forward = rows[0].balance - rows[0].amount if rows else balance
+        return page
+
+    def _cursor(self, token, scope):
+        if not token:
+            return None
+        try:
+            cursor = signing.loads(token, salt=_SALT)
+        except signing.BadSignature:
+            return None
+        if not isinstance(cursor, dict) or cursor.get("s") != scope:
+            return None
+        return cursor
+
+    def _forward(self, boundary, balance, limit) -> list:
+        out = []
+        for row in self.merged(boundary, forward=True, limit=limit):
+            balance += row.amount
+            out.append(row._replace(balance=balance))
+            if len(out) == limit:
+                break
+        return out
+
+    def _backward(self, boundary, balance, limit) -> list:
+        """Rows before `boundary` in ledger order; `balance` is the balance just before it."""
+        out = []
+        for row in self.merged(boundary, forward=False, limit=limit):
+            out.append(row._replace(balance=balance))
+            balance -= row.amount
+            if len(out) == limit:
+                break
+        return out[::-1]
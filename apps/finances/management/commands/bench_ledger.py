@@ -0,0 +1,101 @@
+# apps/finances/management/commands/bench_ledger.py
+import random
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.bookings.models import Booking, Payment
+from apps.finances import rollup
+from apps.finances.ledger import Ledger
+from apps.finances.models import Expense, ExpenseCategory, Income, IncomeCategory
+from apps.guests.models import Guest
+from apps.room.models import Room
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    n = fn()
+    wall = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return n, wall, peak
+
+
+class Command(BaseCommand):
+    help = (
+        "Ledger over a long synthetic history (rolled back): the old list + zip build vs the "
+        "streamed heap merge (peak Python memory, time), and a deep keyset page."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--years", type=int, default=10)
+        parser.add_argument("--per-day", type=int, default=30, help="Rows per day across the three sources.")
+
+    def handle(self, *args, **opts):
+        try:
+            with transaction.atomic():
+                n = self._seed(opts["years"], opts["per_day"])
+                self.stdout.write(f"{n} ledger rows over {opts['years']} years (MB = tracemalloc peak)")
+                self.stdout.write(f"{'path':>10} | {'rows':>8} | {'seconds':>8} | {'peak MB':>8}")
+
+                def old():
+                    # what LedgerView did: both querysets in lists, padded and zipped
+                    incomes = list(Payment.objects.select_related("booking__guest", "booking__room").order_by("received_at"))
+                    expenses = list(Expense.objects.select_related("exp_category").order_by("date"))
+                    return sum(1 for _ in zip(incomes, expenses)) + abs(len(incomes) - len(expenses))
+
+                def streamed():
+                    return sum(1 for _ in Ledger().rows())
+
+                for label, fn in (("list+zip", old), ("stream", streamed)):
+                    rows, wall, peak = _measure(fn)
+                    self.stdout.write(f"{label:>10} | {rows:>8} | {wall:>8.2f} | {peak:>8.1f}")
+
+                ledger = Ledger()
+                page = ledger.page(None)
+                for _ in range(50):
+                    page = ledger.page(page.next_cursor)
+                t0 = time.perf_counter()
+                page = ledger.page(page.next_cursor)
+                self.stdout.write(
+                    f"keyset page at row {page.offset:,}: {(time.perf_counter() - t0) * 1000:.1f} ms"
+                )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, years, per_day):
+        rnd = random.Random(7)
+        room = Room.objects.order_by("id").first() or Room.objects.create(room_number="bench")
+        guest = Guest.objects.create(full_name="Bench Guest", phone_number="01799999999")
+        booking = Booking.objects.create(room=room, guest=guest, check_in=date(2020, 1, 1), check_out=date(2020, 1, 2))
+        exp_cat = ExpenseCategory.objects.create(name="__bench__")
+        inc_cat = IncomeCategory.objects.create(name="__bench__")
+
+        first = timezone.localdate() - timedelta(days=365 * years)
+        payments, expenses, incomes = [], [], []
+        for day in range(365 * years):
+            d = first + timedelta(days=day)
+            for _ in range(per_day):
+                pick = rnd.random()
+                if pick < 0.5:
+                    at = timezone.make_aware(datetime.combine(d, datetime.min.time()) + timedelta(minutes=rnd.randint(0, 1439)))
+                    payments.append(Payment(booking=booking, amount=rnd.randint(500, 5000), received_at=at))
+                elif pick < 0.8:
+                    expenses.append(Expense(exp_category=exp_cat, exp_name="bench", date=d, amount=rnd.randint(100, 3000)))
+                else:
+                    incomes.append(Income(income_category=inc_cat, income_name="bench", date=d, amount=rnd.randint(100, 3000)))
+        Payment.objects.bulk_create(payments, batch_size=5000)
+        Expense.objects.bulk_create(expenses, batch_size=5000)
+        Income.objects.bulk_create(incomes, batch_size=5000)
+        rollup.rebuild()
+        return len(payments) + len(expenses) + len(incomes)
@@ -0,0 +1,43 @@
+# apps/finances/management/commands/rebuild_finance_rollup.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from apps.finances.rollup import rebuild, repair_stale
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the DailyFinanceRollup table (whole history, or --from/--to), or with --stale "
+        "only the dates whose on-commit recompute failed. Safe to re-run (e.g. --stale from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="day_from", help="YYYY-MM-DD (inclusive)")
+        parser.add_argument("--to", dest="day_to", help="YYYY-MM-DD (inclusive)")
+        parser.add_argument("--stale", action="store_true", help="Only repair dates flagged stale.")
+
+    def handle(self, *args, **opts):
+        if opts["stale"]:
+            t0 = time.perf_counter()
+            written = repair_stale()
+            self.stdout.write(self.style.SUCCESS(
+                f"Stale rollup dates repaired: {written} rows in {time.perf_counter() - t0:.1f}s."
+            ))
+            return
+
+        bounds = []
+        for key in ("day_from", "day_to"):
+            raw = opts[key]
+            d = parse_date(raw) if raw else None
+            if raw and d is None:
+                raise CommandError(f"Invalid date: {raw!r} (expected YYYY-MM-DD)")
+            bounds.append(d)
+
+        t0 = time.perf_counter()
+        written = rebuild(*bounds)
+        scope = "all dates" if bounds == [None, None] else f"{bounds[0] or '…'} → {bounds[1] or '…'}"
+        self.stdout.write(self.style.SUCCESS(
+            f"Rollup rebuilt for {scope}: {written} rows in {time.perf_counter() - t0:.1f}s."
+        ))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyFinanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('room_category_id', models.PositiveIntegerField(default=0)),
+                ('method', models.CharField(blank=True, default='', max_length=10)),
+                ('expense_category_id', models.PositiveIntegerField(default=0)),
+                ('income_category_id', models.PositiveIntegerField(default=0)),
+                ('charges', models.BigIntegerField(default=0)),
+                ('charge_count', models.PositiveIntegerField(default=0)),
+                ('refunds', models.BigIntegerField(default=0)),
+                ('refund_count', models.PositiveIntegerField(default=0)),
+                ('bookings', models.PositiveIntegerField(default=0)),
+                ('new_bookings', models.PositiveIntegerField(default=0)),
+                ('net_booked', models.BigIntegerField(default=0)),
+                ('discount', models.BigIntegerField(default=0)),
+                ('due', models.BigIntegerField(default=0)),
+                ('expenses', models.BigIntegerField(default=0)),
+                ('expense_count', models.PositiveIntegerField(default=0)),
+                ('income', models.BigIntegerField(default=0)),
+                ('income_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('date',),
+                'constraints': [models.UniqueConstraint(fields=('date', 'room_category_id', 'method', 'expense_category_id', 'income_category_id'), name='uniq_finance_rollup_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0002_dailyfinancerollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['-date', '-id'], name='expense_date_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['-date', '-id'], name='income_date_keyset_idx'),
+        ),
+    ]
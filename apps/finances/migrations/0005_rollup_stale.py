@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finances', '0004_expense_income_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyfinancerollup',
+            name='stale',
+            field=models.BooleanField(default=False),
+        ),
+    ]
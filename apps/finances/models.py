@@ -18,6 +18,12 @@ class Expense(models.Model):
     amount = models.IntegerField(verbose_name="Expense Amount")
     note = models.TextField(blank=True, null=True, verbose_name="Expense Note")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-date", "-id"], name="expense_date_keyset_idx"),
+        ]
 
     def __str__(self):
         return f"{self.exp_name} - {self.amount} ৳"
@@ -41,6 +47,69 @@ class Income(models.Model):
     amount = models.IntegerField(verbose_name="Income Amount")
     note = models.TextField(blank=True, null=True, verbose_name="Income Note")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-date", "-id"], name="income_date_keyset_idx"),
+        ]
 
     def __str__(self):
         return f"{self.income_name} - {self.amount} ৳"
+
+
+
+# Reporting rollup
+class DailyFinanceRollup(models.Model):
+    """
+    Precomputed daily totals: one row per date × room category × payment
+    method (payment / booking measures) or × expense / income category.
+    Maintained per affected date from Payment, Booking, Expense and Income
+    writes (see rollup.py / signals.py); `manage.py rebuild_finance_rollup`
+    recomputes any range from scratch (or, with --stale, the dates whose
+    on-commit recompute failed).
+
+    Dimension ids are plain integers, 0 = none (keeps the unique key NULL-free).
+    Booking measures are dated by check_in (bookings) and created_at (new_bookings);
+    payment measures by received_at.
+    """
+    date                = models.DateField()
+    room_category_id    = models.PositiveIntegerField(default=0)
+    method              = models.CharField(max_length=10, blank=True, default="")
+    expense_category_id = models.PositiveIntegerField(default=0)
+    income_category_id  = models.PositiveIntegerField(default=0)
+
+    # payments (BDT integers)
+    charges       = models.BigIntegerField(default=0)
+    charge_count  = models.PositiveIntegerField(default=0)
+    refunds       = models.BigIntegerField(default=0)
+    refund_count  = models.PositiveIntegerField(default=0)
+
+    # bookings
+    bookings      = models.PositiveIntegerField(default=0)
+    new_bookings  = models.PositiveIntegerField(default=0)
+    net_booked    = models.BigIntegerField(default=0)
+    discount      = models.BigIntegerField(default=0)
+    due           = models.BigIntegerField(default=0)
+
+    # finances
+    expenses      = models.BigIntegerField(default=0)
+    expense_count = models.PositiveIntegerField(default=0)
+    income        = models.BigIntegerField(default=0)
+    income_count  = models.PositiveIntegerField(default=0)
+
+    # set on the date's all-zero "day" row when an on-commit recompute failed;
+    # `manage.py rebuild_finance_rollup --stale` repairs those dates
+    stale         = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ("date",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "room_category_id", "method", "expense_category_id", "income_category_id"],
+                name="uniq_finance_rollup_bucket",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Rollup {self.date} (cat {self.room_category_id}/{self.method or '—'})"
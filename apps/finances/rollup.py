@@ -0,0 +1,314 @@
+# apps/finances/rollup.py
+"""
+Maintenance + query helpers for DailyFinanceRollup.
+
+Writes never adjust totals by deltas. Each write marks the dates it touched
+(old and new values). After commit those dates are recomputed from the
+transactional tables: a handful of grouped queries for the whole set, one
+delete and one bulk insert. Edits, deletes, status changes and moved dates
+therefore always land on the right buckets.
+
+Recomputes of the same date are serialised: each one first locks a zero
+"day" row per date (inserted if missing), and only then reads the source
+tables, so the last writer always read the newest committed data.
+
+The on-commit recompute runs after the user's write is already durable, so
+it never raises: a failure is logged and its dates are flagged `stale` for
+`manage.py rebuild_finance_rollup --stale` (repair_stale) to redo.
+
+Reports then read ~N rows per day instead of every payment / booking /
+expense row in the window.
+"""
+import logging
+import threading
+from datetime import date, datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import DailyFinanceRollup, Expense, Income
+
+MEASURES = (
+    "charges", "charge_count", "refunds", "refund_count",
+    "bookings", "new_bookings", "net_booked", "discount", "due",
+    "expenses", "expense_count", "income", "income_count",
+)
+
+logger = logging.getLogger(__name__)
+_local = threading.local()
+
+
+def _booking_models():
+    from apps.bookings.models import Booking, Payment
+    return Booking, Payment
+
+
+# ---------- date spans ----------
+def _spans(days) -> list[tuple[date, date]]:
+    """Collapse a set of dates into sorted inclusive (first, last) runs."""
+    out = []
+    for d in sorted(set(days)):
+        if out and d == out[-1][1] + timedelta(days=1):
+            out[-1] = (out[-1][0], d)
+        else:
+            out.append((d, d))
+    return out
+
+
+def _aware(d: date) -> datetime:
+    return timezone.make_aware(datetime.combine(d, time.min))
+
+
+def _span_q(field: str, spans, is_datetime=False) -> Q:
+    """OR of inclusive date runs; a None bound leaves that side open."""
+    q = Q()
+    for lo, hi in spans:
+        part = Q()
+        if lo is not None:
+            part &= Q(**{f"{field}__gte": _aware(lo) if is_datetime else lo})
+        if hi is not None:
+            if is_datetime:
+                part &= Q(**{f"{field}__lt": _aware(hi + timedelta(days=1))})
+            else:
+                part &= Q(**{f"{field}__lte": hi})
+        q |= part
+    return q
+
+
+def _in_spans(d: date, spans) -> bool:
+    return any((lo is None or lo <= d) and (hi is None or d <= hi) for lo, hi in spans)
+
+
+# ---------- compute ----------
+def _collect(spans=None) -> dict:
+    """{bucket key: {measure: value}} for the given spans (None = everything)."""
+    Booking, Payment = _booking_models()
+    rows: dict[tuple, dict] = {}
+
+    def bucket(day, room_cat=0, method="", exp_cat=0, inc_cat=0):
+        key = (day, room_cat or 0, method or "", exp_cat or 0, inc_cat or 0)
+        return rows.setdefault(key, dict.fromkeys(MEASURES, 0))
+
+    def scoped(qs, field, is_datetime=False):
+        return qs if spans is None else qs.filter(_span_q(field, spans, is_datetime))
+
+    charge, refund = Q(kind=Payment.Kind.CHARGE), Q(kind=Payment.Kind.REFUND)
+    payments = (
+        scoped(Payment.objects.all(), "received_at", is_datetime=True)
+        .annotate(day=TruncDate("received_at"))
+        .values("day", "booking__room__category_id", "method")
+        .annotate(
+            charges=Sum("amount", filter=charge, default=0),
+            charge_count=Count("id", filter=charge),
+            refunds=Sum("amount", filter=refund, default=0),
+            refund_count=Count("id", filter=refund),
+        )
+        .order_by()
+    )
+    for r in payments:
+        b = bucket(r["day"], r["booking__room__category_id"], r["method"])
+        for m in ("charges", "charge_count", "refunds", "refund_count"):
+            b[m] += r[m]
+
+    arrivals = (
+        scoped(Booking.objects.all(), "check_in")
+        .values("check_in", "room__category_id")
+        .annotate(
+            bookings=Count("id"),
+            net_booked=Sum("net_amount", default=0),
+            discount=Sum("discount_amount", default=0),
+            due=Sum("due_amount", default=0),
+        )
+        .order_by()
+    )
+    for r in arrivals:
+        b = bucket(r["check_in"], r["room__category_id"])
+        for m in ("bookings", "net_booked", "discount", "due"):
+            b[m] += r[m]
+
+    created = (
+        scoped(Booking.objects.all(), "created_at", is_datetime=True)
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "room__category_id")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    for r in created:
+        bucket(r["day"], r["room__category_id"])["new_bookings"] += r["n"]
+
+    for r in (
+        scoped(Expense.objects.all(), "date")
+        .values("date", "exp_category_id")
+        .annotate(total=Sum("amount", default=0), n=Count("id"))
+        .order_by()
+    ):
+        b = bucket(r["date"], exp_cat=r["exp_category_id"])
+        b["expenses"] += r["total"]
+        b["expense_count"] += r["n"]
+
+    for r in (
+        scoped(Income.objects.all(), "date")
+        .values("date", "income_category_id")
+        .annotate(total=Sum("amount", default=0), n=Count("id"))
+        .order_by()
+    ):
+        b = bucket(r["date"], inc_cat=r["income_category_id"])
+        b["income"] += r["total"]
+        b["income_count"] += r["n"]
+
+    # spans are the source of truth: drop anything a tz edge put outside them
+    if spans is not None:
+        rows = {k: v for k, v in rows.items() if _in_spans(k[0], spans)}
+    return rows
+
+
+def _day_rows(days):
+    return DailyFinanceRollup.objects.filter(
+        date__in=days, room_category_id=0, method="", expense_category_id=0, income_category_id=0,
+    )
+
+
+def _lock_days(spans):
+    """Row-lock one bucket per date (in date order) until the transaction ends."""
+    days = [lo + timedelta(days=n) for lo, hi in spans for n in range((hi - lo).days + 1)]
+    DailyFinanceRollup.objects.bulk_create([DailyFinanceRollup(date=d) for d in days], ignore_conflicts=True)
+    list(_day_rows(days).select_for_update().order_by("date").values_list("pk", flat=True))
+
+
+def _recompute(spans=None, batch_size=1000) -> int:
+    with transaction.atomic():
+        if spans is not None and all(lo is not None and hi is not None for lo, hi in spans):
+            _lock_days(spans)
+        # read after the lock: a concurrent recompute of these dates has committed by now
+        rows = _collect(spans)
+        objs = [
+            DailyFinanceRollup(
+                date=day, room_category_id=rc, method=method,
+                expense_category_id=ec, income_category_id=ic, **measures,
+            )
+            for (day, rc, method, ec, ic), measures in rows.items()
+            if any(measures.values())
+        ]
+        old = DailyFinanceRollup.objects.all()
+        if spans is not None:
+            old = old.filter(_span_q("date", spans))
+        old.delete()
+        DailyFinanceRollup.objects.bulk_create(objs, batch_size=batch_size)
+    return len(objs)
+
+
+def recompute_days(days) -> int:
+    """Recompute the rollup rows of the given dates. Returns rows written."""
+    spans = _spans(d for d in days if d)
+    if not spans:
+        return 0
+    return _recompute(spans)
+
+
+def mark_stale(days):
+    """Flag dates for repair_stale(). Best effort: the database may be what failed."""
+    days = sorted(set(days))
+    try:
+        with transaction.atomic():
+            DailyFinanceRollup.objects.bulk_create([DailyFinanceRollup(date=d) for d in days], ignore_conflicts=True)
+            _day_rows(days).update(stale=True)
+    except Exception:
+        logger.exception("could not flag finance rollup dates %s as stale", days)
+
+
+def repair_stale() -> int:
+    """Recompute every date flagged stale (a recompute clears the flag). Returns rows written."""
+    days = DailyFinanceRollup.objects.filter(stale=True).values_list("date", flat=True).distinct()
+    return recompute_days(list(days))
+
+
+def rebuild(day_from: date | None = None, day_to: date | None = None) -> int:
+    """Recompute [day_from, day_to] (inclusive) or, with no bounds, the whole table."""
+    if day_from is None and day_to is None:
+        return _recompute()
+    return _recompute([(day_from, day_to)])
+
+
+# ---------- incremental maintenance ----------
+def _flush():
+    days = getattr(_local, "pending", None)
+    _local.pending = set()
+    if not days:
+        return
+    try:
+        recompute_days(days)
+    except Exception:
+        # the write that marked these dates has committed: no 500 for the user
+        logger.exception("finance rollup recompute failed for %s; flagged stale", sorted(days))
+        mark_stale(days)
+
+
+def mark_dirty(*days):
+    """
+    Queue dates for recompute once the current transaction commits.
+    Every call registers a cheap on_commit hook; the first one to run
+    recomputes everything pending, so rolled-back marks are simply picked up
+    by the next flush.
+    """
+    days = {local_date(d) for d in days if d}
+    if not days:
+        return
+    pending = getattr(_local, "pending", None)
+    if pending is None:
+        pending = _local.pending = set()
+    pending.update(days)
+    transaction.on_commit(_flush)
+
+
+def local_date(value) -> date | None:
+    """Calendar date of a (possibly aware) datetime in the current time zone."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value
+
+
+# ---------- queries ----------
+def rollup_rows(day_from: date | None = None, day_to: date | None = None, **dims):
+    qs = DailyFinanceRollup.objects.filter(**dims)
+    if day_from:
+        qs = qs.filter(date__gte=day_from)
+    if day_to:
+        qs = qs.filter(date__lte=day_to)
+    return qs
+
+
+def _totals(agg) -> dict:
+    out = {m: int(agg[m]) for m in MEASURES}
+    out["net_received"] = out["charges"] - out["refunds"]
+    return out
+
+
+def totals(day_from: date | None = None, day_to: date | None = None, **dims) -> dict:
+    """Sum of every measure over the window (None bound = open)."""
+    return _totals(rollup_rows(day_from, day_to, **dims).aggregate(
+        **{m: Sum(m, default=0) for m in MEASURES}
+    ))
+
+
+async def atotals(day_from: date | None = None, day_to: date | None = None, **dims) -> dict:
+    """totals() for async views."""
+    return _totals(await rollup_rows(day_from, day_to, **dims).aaggregate(
+        **{m: Sum(m, default=0) for m in MEASURES}
+    ))
+
+
+def series(day_from, day_to, by: str = "day", measures=("charges", "refunds"), **dims) -> list[dict]:
+    """
+    Grouped totals: by="day" | "month" | "room_category_id" | "method" |
+    "expense_category_id" | "income_category_id".
+    """
+    qs = rollup_rows(day_from, day_to, **dims)
+    if by == "month":
+        qs = qs.annotate(key=TruncMonth("date")).values("key")
+    else:
+        qs = qs.values(key=F("date" if by == "day" else by))
+    return list(qs.annotate(**{m: Sum(m, default=0) for m in measures}).order_by("key"))
@@ -0,0 +1,78 @@
+# apps/finances/signals.py
+"""
+Keep DailyFinanceRollup current: every write marks the dates it touched
+(before and after the change) and rollup.mark_dirty() recomputes them on commit.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.bookings.models import Booking, Payment
+from apps.room.models import Room
+
+from .models import Expense, Income
+from .rollup import local_date, mark_dirty
+
+
+def _old_values(sender, instance, *fields):
+    if not instance.pk:
+        return None
+    return sender.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+# ---- payments: bucketed by received_at (local date) ----
+@receiver(pre_save, sender=Payment)
+def _payment_old_date(sender, instance: Payment, **kwargs):
+    old = _old_values(sender, instance, "received_at")
+    instance._old_rollup_day = local_date(old["received_at"]) if old else None
+
+
+@receiver([post_save, post_delete], sender=Payment)
+def _payment_rollup(sender, instance: Payment, **kwargs):
+    mark_dirty(getattr(instance, "_old_rollup_day", None), local_date(instance.received_at))
+
+
+# ---- bookings: bucketed by check_in and created_at ----
+@receiver([post_save, post_delete], sender=Booking)
+def _booking_rollup(sender, instance: Booking, **kwargs):
+    # bookings.signals._capture_old_status stores the pre-save room/dates
+    old = getattr(instance, "_old_room_night_key", None) or {}
+    days = [old.get("check_in"), instance.check_in, local_date(instance.created_at)]
+    if old and old.get("room_id") != instance.room_id:
+        # room (hence category) changed -> payment buckets move too
+        days += [local_date(d) for d in instance.payments.values_list("received_at", flat=True)]
+    mark_dirty(*days)
+
+
+# ---- a room changing category re-labels all of its history ----
+@receiver(pre_save, sender=Room)
+def _room_old_category(sender, instance: Room, **kwargs):
+    old = _old_values(sender, instance, "category_id")
+    instance._category_changed = bool(old) and old["category_id"] != instance.category_id
+
+
+@receiver(post_save, sender=Room)
+def _room_rollup(sender, instance: Room, **kwargs):
+    if not getattr(instance, "_category_changed", False):
+        return
+    days = set()
+    for ci, created in Booking.objects.filter(room=instance).values_list("check_in", "created_at"):
+        days.update((ci, local_date(created)))
+    days.update(
+        local_date(d) for d in
+        Payment.objects.filter(booking__room=instance).values_list("received_at", flat=True)
+    )
+    mark_dirty(*days)
+
+
+# ---- expenses / other income: bucketed by their date ----
+@receiver(pre_save, sender=Expense)
+@receiver(pre_save, sender=Income)
+def _finance_old_date(sender, instance, **kwargs):
+    old = _old_values(sender, instance, "date")
+    instance._old_rollup_day = old["date"] if old else None
+
+
+@receiver([post_save, post_delete], sender=Expense)
+@receiver([post_save, post_delete], sender=Income)
+def _finance_rollup(sender, instance, **kwargs):
+    mark_dirty(getattr(instance, "_old_rollup_day", None), instance.date)
@@ -1,3 +1,185 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from itertools import accumulate
+from unittest import mock
+
+from django.db.models import Sum
 from django.test import TestCase
+from django.utils import timezone
+
+from apps.bookings.models import Booking, Payment
+from apps.guests.models import Guest
+from apps.room.models import Category, Room
+
+from . import rollup
+from .ledger import Ledger
+from .models import DailyFinanceRollup, Expense, ExpenseCategory, Income, IncomeCategory
+
+MEASURES = ("charges", "refunds", "expenses", "income")
+
+
+class FinanceRollupTests(TestCase):
+    """DailyFinanceRollup, maintained on commit, against direct aggregates of the source tables."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Deluxe")
+        room = Room.objects.create(room_number="101", category=category, price=1000)
+        guest = Guest.objects.create(full_name="Test Guest", phone_number="8801711111111")
+        cls.today = timezone.localdate()
+        cls.booking = Booking.objects.create(
+            guest=guest, room=room, status=Booking.Status.CHECKED_IN,
+            check_in=cls.today, check_out=cls.today + timedelta(days=3),
+        )
+        cls.expense_category = ExpenseCategory.objects.create(name="Laundry")
+        cls.income_category = IncomeCategory.objects.create(name="Restaurant")
+        rollup.rebuild()
+
+    def committed(self, write):
+        with self.captureOnCommitCallbacks(execute=True):
+            return write()
+
+    def direct(self) -> dict:
+        out = defaultdict(lambda: dict.fromkeys(MEASURES, 0))
+        for p in Payment.objects.all():
+            measure = "charges" if p.kind == Payment.Kind.CHARGE else "refunds"
+            out[rollup.local_date(p.received_at)][measure] += p.amount
+        for model, measure in ((Expense, "expenses"), (Income, "income")):
+            for r in model.objects.values("date").annotate(total=Sum("amount")):
+                out[r["date"]][measure] += r["total"]
+        return {day: m for day, m in out.items() if any(m.values())}
+
+    def rolled(self) -> dict:
+        rows = DailyFinanceRollup.objects.values("date").annotate(**{m: Sum(m) for m in MEASURES})
+        return {r.pop("date"): r for r in rows if any(r.values())}
+
+    def assertRollupMatches(self):
+        self.assertEqual(self.rolled(), self.direct())
+        self.assertFalse(DailyFinanceRollup.objects.filter(stale=True).exists())
+
+    def test_create_edit_delete(self):
+        yesterday = timezone.now() - timedelta(days=1)
+        first = self.committed(lambda: Payment.objects.create(booking=self.booking, amount=1000))
+        second = self.committed(lambda: Payment.objects.create(booking=self.booking, amount=500, received_at=yesterday))
+        refund = self.committed(lambda: Payment.objects.create(booking=self.booking, amount=200, kind=Payment.Kind.REFUND))
+        expense = self.committed(lambda: Expense.objects.create(exp_category=self.expense_category, date=self.today, amount=300))
+        self.committed(lambda: Income.objects.create(income_category=self.income_category, date=self.today, amount=700))
+        self.assertRollupMatches()
+
+        def edit_payments():
+            first.amount = 1200
+            first.save()
+            second.received_at = timezone.now() - timedelta(days=2)     # moves to another day
+            second.save()
+
+        self.committed(edit_payments)
+        self.assertRollupMatches()
+
+        def edit_expense():
+            expense.date = self.today - timedelta(days=1)
+            expense.amount = 350
+            expense.save()
+
+        self.committed(edit_expense)
+        self.assertRollupMatches()
+
+        self.committed(second.delete)
+        self.committed(refund.delete)
+        self.assertRollupMatches()
+        self.assertEqual(self.rolled()[self.today], {"charges": 1200, "refunds": 0, "expenses": 0, "income": 700})
+
+    def test_failed_recompute_is_flagged_and_repaired(self):
+        with mock.patch.object(rollup, "recompute_days", side_effect=RuntimeError("disk full")), \
+                self.assertLogs("apps.finances.rollup", "ERROR"):
+            self.committed(lambda: Payment.objects.create(booking=self.booking, amount=800))   # no exception
+
+        self.assertEqual(
+            list(DailyFinanceRollup.objects.filter(stale=True).values_list("date", flat=True)), [self.today],
+        )
+        self.assertNotEqual(self.rolled(), self.direct())
+
+        rollup.repair_stale()
+        self.assertRollupMatches()
+
+
+class LedgerTests(TestCase):
+    """The heapq-merged ledger stream and its keyset pages against a plain sort of the rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Deluxe")
+        room = Room.objects.create(room_number="101", category=category, price=1000)
+        guest = Guest.objects.create(full_name="Test Guest", phone_number="8801711111111")
+        today = timezone.localdate()
+        booking = Booking.objects.create(
+            guest=guest, room=room, status=Booking.Status.CHECKED_IN,
+            check_in=today, check_out=today + timedelta(days=3),
+        )
+        cls.days = [today - timedelta(days=n) for n in (4, 3, 2, 1)]
+        d0, d1, d2, d3 = cls.days
+
+        def at(day, hour):
+            return timezone.make_aware(datetime.combine(day, time(hour)))
+
+        def pay(amount, received_at, kind=Payment.Kind.CHARGE):
+            Payment.objects.create(booking=booking, amount=amount, received_at=received_at, kind=kind)
+
+        pay(5000, at(d0, 12))                   # before the window: opening balance
+        pay(400, at(d1, 9))
+        for amount in (100, 200, 300):          # same timestamp: ordered by id
+            pay(amount, at(d1, 12))
+        pay(150, at(d1, 12), Payment.Kind.REFUND)
+        pay(700, at(d3, 18))
+
+        expense_category = ExpenseCategory.objects.create(name="Laundry")
+        income_category = IncomeCategory.objects.create(name="Restaurant")
+        for day, amount in ((d1, 50), (d2, 60), (d2, 70), (d3, 80)):
+            Income.objects.create(income_category=income_category, date=day, amount=amount)
+        for day, amount in ((d1, 90), (d1, 95), (d2, 110), (d2, 120), (d3, 130)):
+            Expense.objects.create(exp_category=expense_category, date=day, amount=amount)
+        rollup.rebuild()
+
+    def expected(self, start):
+        """(key, signed amount) of every row from `start`, sorted without the merge."""
+        rows = [
+            ((rollup.local_date(p.received_at), 0, p.received_at, p.pk),
+             -p.amount if p.kind == Payment.Kind.REFUND else p.amount)
+            for p in Payment.objects.all()
+        ]
+        rows += [((i.date, 1, None, i.pk), i.amount) for i in Income.objects.all()]
+        rows += [((e.date, 2, None, e.pk), -e.amount) for e in Expense.objects.all()]
+        return sorted(r for r in rows if r[0][0] >= start)
+
+    def test_rows_merge_sources_in_key_order(self):
+        ledger = Ledger(self.days[1], self.days[3])
+        expected = self.expected(self.days[1])
+        self.assertEqual(ledger.opening, 5000)
+        rows = list(ledger.rows())
+        self.assertEqual([r.key for r in rows], [key for key, _ in expected])
+        self.assertEqual(
+            [r.balance for r in rows],
+            list(accumulate((amount for _, amount in expected), initial=5000))[1:],
+        )
+        self.assertEqual(rows[-1].balance, ledger.totals()["closing"])
+
+    def test_pages_across_boundaries_and_ties(self):
+        ledger = Ledger(self.days[1], self.days[3])
+        full = list(ledger.rows())
+        for per_page in (1, 2, 3, 4, 7, len(full), len(full) + 1):
+            with self.subTest(per_page=per_page):
+                pages = [ledger.page(None, per_page)]
+                while pages[-1].next_cursor:
+                    pages.append(ledger.page(pages[-1].next_cursor, per_page))
+                walked = [row for page in pages for row in page]
+                self.assertEqual(walked, full)      # keys and running balances
+                for page in pages:
+                    rows = list(page)
+                    before = full[page.offset - 1].balance if page.offset else ledger.opening
+                    self.assertEqual(page.brought_forward, before)
+                    self.assertEqual(rows, full[page.offset:page.offset + len(rows)])
 
-# Create your tests here.
+                back = [pages[-1]]
+                while back[-1].previous_cursor:
+                    back.append(ledger.page(back[-1].previous_cursor, per_page))
+                self.assertEqual([row for page in reversed(back) for row in page], full)
+                self.assertEqual(len(back), len(pages))
@@ -2,11 +2,11 @@
 from .models import Guest
 from .services import create_guest_user_for_profile
 from django.contrib.auth import get_user_model
+from django.db.models import Q
 
-User = get_user_model()
+from apps.core.phone import digits_only, phone_q, storage_number, to_local
 
-def _digits_only(s: str) -> str:
-    return "".join(ch for ch in (s or "") if ch.isdigit())
+User = get_user_model()
 
 
 class GuestCreateForm(forms.ModelForm):
@@ -73,21 +73,21 @@ def __init__(self, *args, **kwargs):
 
     def clean_phone_number(self):
         given = self.cleaned_data.get("phone_number", "")
-        digits = _digits_only(given)  # strips +, spaces, dashes, etc.
+        digits = digits_only(given)  # strips +, spaces, dashes, etc.
 
         if not digits:
             raise forms.ValidationError("Please provide a valid phone number.")
 
-        # Normalize: keep if already starts with 88, else prefix it.
-        if digits.startswith("88"):
-            normalized = digits
-            raw_local = digits[2:] if len(digits) > 2 else ""
-        else:
-            normalized = f"88{digits}"
-            raw_local = digits
-
-        # Duplicate check: exclude self when editing
-        exists = Guest.objects.exclude(pk=self.instance.pk).filter(phone_number=normalized).exists()
+        # Normalize: BD mobiles -> 8801XXXXXXXXX, else keep if already starts with 88, else prefix it.
+        normalized = storage_number(given)
+        raw_local = to_local(given) or (digits[2:] if digits.startswith("88") else digits)
+
+        # Duplicate check (any stored format): exclude self when editing
+        exists = (
+            Guest.objects.exclude(pk=self.instance.pk)
+            .filter(Q(phone_number=normalized) | phone_q(normalized))
+            .exists()
+        )
         if exists:
             raise forms.ValidationError("This phone number is already registered.")
 
@@ -103,7 +103,7 @@ def save(self, commit=True, request_user=None, auto_create_user=True):
             guest.save()
 
         if auto_create_user:
-            existing = User.objects.filter(phone_number=guest.phone_number).first()
+            existing = User.objects.filter(phone_q(guest.phone_number)).first()
             if existing and not guest.user_account_id:
                 guest.user_account = existing
                 guest.save(update_fields=["user_account"])
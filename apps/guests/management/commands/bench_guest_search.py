@@ -0,0 +1,68 @@
+# apps/guests/management/commands/bench_guest_search.py
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.guests.models import Guest
+from apps.guests.search import BasicSearch, get_backend
+
+FIRST = ["Rahim", "Karim", "Mohammad", "Abdul", "Nusrat", "Farhana", "Tanvir", "Sadia", "Imran", "Ayesha"]
+LAST = ["Hossain", "Rahman", "Islam", "Ahmed", "Chowdhury", "Khan", "Akter", "Sarkar", "Uddin", "Begum"]
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _timed(fn, repeat):
+    best, n = None, 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n = len(fn())
+        ms = (time.perf_counter() - t0) * 1000
+        best = ms if best is None else min(best, ms)
+    return best, n
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark guest typeahead: plain icontains vs the configured search backend. "
+        "Synthetic guests are created inside a transaction and rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--guests", type=int, default=200000)
+        parser.add_argument("--repeat", type=int, default=5, help="Best of N runs per query.")
+
+    def handle(self, *args, **opts):
+        basic, backend = BasicSearch(), get_backend()
+        queries = ["rah", "Karim Kh", "mohammad isl", "01711", "4455", "8801700004455", "zzq"]
+        try:
+            with transaction.atomic():
+                self._seed(opts["guests"])
+                backend.rebuild()
+                self.stdout.write(f"{Guest.objects.count()} guests, backend={backend.name}, best of {opts['repeat']} (ms)")
+                self.stdout.write(f"{'query':<16} | {'icontains':>9} | {backend.name:>9} | {'hits':>4}")
+                for q in queries:
+                    slow, _ = _timed(lambda: basic.typeahead(q), opts["repeat"])
+                    fast, n = _timed(lambda: backend.typeahead(q), opts["repeat"])
+                    self.stdout.write(f"{q:<16} | {slow:>9.2f} | {fast:>9.2f} | {n:>4}")
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, n):
+        rnd = random.Random(42)
+        batch = 5000
+        for start in range(0, n, batch):
+            Guest.objects.bulk_create([
+                Guest(
+                    full_name=f"{rnd.choice(FIRST)} {rnd.choice(LAST)} {''.join(rnd.choices(string.ascii_lowercase, k=5))}",
+                    phone_number=f"88017{i:09d}",
+                    nid_passport=str(rnd.randrange(10**9, 10**10)),
+                )
+                for i in range(start, min(n, start + batch))
+            ], ignore_conflicts=True)
@@ -0,0 +1,20 @@
+# apps/guests/management/commands/rebuild_guest_search.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.guests.search import get_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the guest search index from the guests table (after bulk writes). Safe to re-run."
+
+    def handle(self, *args, **opts):
+        backend = get_backend()
+        t0 = time.perf_counter()
+        with transaction.atomic():
+            indexed = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Guest search ({backend.name}) rebuilt: {indexed} guests in {time.perf_counter() - t0:.1f}s."
+        ))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guests', '0003_guest_company'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='guest',
+            index=models.Index(fields=['-created_at', '-id'], name='guest_created_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# Self-contained copy of the search index DDL as of this migration
+# (apps/guests/search.py reads these tables but does not create them).
+NAME_TABLE = "guests_guest_fts"
+PHONE_TABLE = "guests_guest_phone_fts"
+TRGM_COLUMNS = ("full_name", "phone_number", "email", "nid_passport")
+
+
+def install(apps, schema_editor):
+    # FTS5 side tables on SQLite, pg_trgm indexes on PostgreSQL; nothing elsewhere
+    connection = schema_editor.connection
+    with connection.cursor() as cur:
+        if connection.vendor == "sqlite":
+            try:
+                cur.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {NAME_TABLE} USING fts5("
+                    "full_name, email, nid_passport, "
+                    "tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3')"
+                )
+            except OperationalError:
+                return  # no FTS5 in this SQLite build; search falls back to icontains
+            try:
+                cur.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {PHONE_TABLE} USING fts5("
+                    "phone, tokenize = 'trigram')"
+                )
+            except OperationalError:
+                # FTS5 without the trigram tokenizer (SQLite < 3.34): no index at all
+                cur.execute(f"DROP TABLE IF EXISTS {NAME_TABLE}")
+                return
+            cur.execute(
+                f"INSERT INTO {NAME_TABLE} (rowid, full_name, email, nid_passport) "
+                "SELECT id, full_name, COALESCE(email, ''), nid_passport FROM guests_guest"
+            )
+            cur.execute(f"INSERT INTO {PHONE_TABLE} (rowid, phone) SELECT id, phone_number FROM guests_guest")
+        elif connection.vendor == "postgresql":
+            cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for col in TRGM_COLUMNS:
+                cur.execute(
+                    f"CREATE INDEX IF NOT EXISTS guests_guest_{col}_trgm "
+                    f"ON guests_guest USING gin (UPPER({col}::text) gin_trgm_ops)"
+                )
+
+
+def uninstall(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cur:
+        if connection.vendor == "sqlite":
+            cur.execute(f"DROP TABLE IF EXISTS {NAME_TABLE}")
+            cur.execute(f"DROP TABLE IF EXISTS {PHONE_TABLE}")
+        elif connection.vendor == "postgresql":
+            for col in TRGM_COLUMNS:
+                cur.execute(f"DROP INDEX IF EXISTS guests_guest_{col}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guests', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -2,6 +2,8 @@
 from django.db import models
 from django.utils import timezone
 
+from apps.core.phone import fill_phone_e164
+
 def guest_photo_path(instance, filename):
     # media/guests/<phone or id>/photo_<timestamp>.ext
     base = instance.phone_number or f"guest_{instance.id or 'new'}"
@@ -11,6 +13,7 @@ class Guest(models.Model):
     # Core identity
     full_name     = models.CharField(max_length=150)
     phone_number  = models.CharField(max_length=20, db_index=True, unique=True)
+    phone_e164    = models.CharField(max_length=16, blank=True, db_index=True, editable=False)  # see apps/core/phone.py
     email         = models.EmailField(blank=True, null=True)
     father_name   = models.CharField(max_length=150, blank=True)
     nid_passport  = models.CharField(max_length=64, blank=True, help_text="NID or Passport")
@@ -45,6 +48,7 @@ class Meta:
         indexes = [
             models.Index(fields=["phone_number"]),
             models.Index(fields=["full_name"]),
+            models.Index(fields=["-created_at", "-id"], name="guest_created_keyset_idx"),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -56,6 +60,10 @@ class Meta:
     def __str__(self):
         return f"{self.full_name} ({self.phone_number})"
 
+    def save(self, *args, **kwargs):
+        fill_phone_e164(self, kwargs)
+        super().save(*args, **kwargs)
+
 
 class GuestCompanion(models.Model):
     guest = models.ForeignKey(
@@ -71,6 +79,7 @@ class GuestCompanion(models.Model):
     email        = models.EmailField(blank=True, null=True)
     father_name  = models.CharField(max_length=150, blank=True)
     phone_number = models.CharField(max_length=20, blank=True)  # not unique
+    phone_e164   = models.CharField(max_length=16, blank=True, db_index=True, editable=False)
     relation     = models.CharField(max_length=80, blank=True, help_text="Relation to main guest (optional)")
 
     created_at   = models.DateTimeField(default=timezone.now)
@@ -81,3 +90,7 @@ class Meta:
 
     def __str__(self):
         return f"{self.name} — Companion of {self.guest.full_name}"
+
+    def save(self, *args, **kwargs):
+        fill_phone_e164(self, kwargs)
+        super().save(*args, **kwargs)
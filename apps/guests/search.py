@@ -0,0 +1,232 @@
+# apps/guests/search.py
+"""
+Guest search index (GuestSearchAPI typeahead + GuestListPage ?q=).
+
+`icontains` over name / phone / email / NID is a full table scan. The backend
+for the configured database answers the same questions from an index instead:
+
+    sqlite      FTS5 side tables, written from the Guest signals:
+                  guests_guest_fts        full_name, email, nid_passport
+                                          (unicode61, prefix indexes) -> "rah ka" = rah* AND ka*
+                  guests_guest_phone_fts  phone digits (trigram)     -> any 3+ digit substring
+    postgresql  pg_trgm GIN indexes on UPPER(col), which is exactly what
+                Django's icontains compiles to, so the plain lookups use them
+    other       plain icontains
+
+A complete phone number in any format ("+8801…", "8801…", "01…") also
+matches through the indexed phone_e164 column (apps/core/phone.py).
+
+GUEST_SEARCH_BACKEND = "auto" (default) | "fts5" | "trigram" | "basic".
+bulk_create / queryset.update() skip the signals: call index_guests() after
+them, or run `manage.py rebuild_guest_search`.
+"""
+import re
+
+from django.conf import settings
+from django.db import OperationalError, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from apps.core.phone import to_e164
+
+GUEST_SEARCH_BACKEND = getattr(settings, "GUEST_SEARCH_BACKEND", "auto")
+
+NAME_TABLE = "guests_guest_fts"
+PHONE_TABLE = "guests_guest_phone_fts"
+TRGM_COLUMNS = ("full_name", "phone_number", "email", "nid_passport")
+
+_PHONE_LIKE = re.compile(r"^[\d\s()+\-]+$")
+_TOKEN = re.compile(r"\w+")
+
+
+def phone_digits(q: str) -> str:
+    """'+880 1711-000000' -> '8801711000000' when q looks like a phone number, else ''."""
+    return re.sub(r"\D", "", q) if _PHONE_LIKE.match(q) else ""
+
+
+def _icontains(q: str) -> Q:
+    cond = (
+        Q(full_name__icontains=q) | Q(phone_number__icontains=q)
+        | Q(email__icontains=q) | Q(nid_passport__icontains=q)
+    )
+    digits = phone_digits(q)
+    if digits and digits != q:
+        cond |= Q(phone_number__icontains=digits)
+    return cond
+
+
+def _exact_phone(q: str) -> Q | None:
+    e164 = to_e164(q) if phone_digits(q) else None
+    return Q(phone_e164=e164) if e164 else None
+
+
+# ---------- backends ----------
+class BasicSearch:
+    """No index: icontains on every column."""
+    name = "basic"
+
+    def __init__(self, using="default"):
+        self.using = using
+
+    def match(self, q: str) -> Q:
+        return _icontains(q)
+
+    def filter(self, qs, q: str):
+        q = (q or "").strip()
+        if not q:
+            return qs
+        cond, exact = self.match(q), _exact_phone(q)
+        return qs.filter(cond | exact if exact else cond)
+
+    def typeahead(self, q: str, limit: int = 10):
+        from .models import Guest
+        exact = self.lookup(q)
+        if exact:
+            return exact[:limit]
+        return list(self.filter(Guest.objects.using(self.using), q).order_by("full_name")[:limit])
+
+    def lookup(self, q: str):
+        """A complete phone number in any format -> its guests via the phone_e164 index, else None."""
+        from .models import Guest
+        exact = _exact_phone((q or "").strip())
+        if exact is None:
+            return None
+        return list(Guest.objects.using(self.using).filter(exact).order_by("full_name"))
+
+    # index maintenance (nothing to maintain here)
+    def index(self, guests):
+        pass
+
+    def remove(self, ids):
+        pass
+
+    def rebuild(self) -> int:
+        return 0
+
+
+class TrigramSearch(BasicSearch):
+    """PostgreSQL: icontains served by pg_trgm GIN indexes (created by migration guests 0005)."""
+    name = "trigram"
+
+
+class FTS5Search(BasicSearch):
+    """SQLite: FTS5 side tables keyed by guest id (rowid)."""
+    name = "fts5"
+
+    def _ids_sql(self, q: str, limit: int | None = None):
+        """(sql, params) selecting matching guest ids, or None if q has nothing indexable."""
+        digits = phone_digits(q)
+        tokens = [digits] if digits else _TOKEN.findall(q)
+        words = [t for t in tokens if not (t.isdigit() and len(t) >= 3)]
+        numbers = [t for t in tokens if t not in words]
+
+        parts, params = [], []
+        if words:
+            # one MATCH for all words, so FTS5 can merge the doclists and stop at LIMIT
+            parts.append(f"SELECT rowid FROM {NAME_TABLE} WHERE {NAME_TABLE} MATCH %s")
+            params.append(" AND ".join(f'"{t}"*' for t in words))
+        for t in numbers:
+            # digits: anywhere in the phone number, or the start of an NID / name token
+            parts.append(
+                f"SELECT rowid FROM {NAME_TABLE} WHERE {NAME_TABLE} MATCH %s "
+                f"UNION SELECT rowid FROM {PHONE_TABLE} WHERE {PHONE_TABLE} MATCH %s"
+            )
+            params += [f'"{t}"*', f'"{t}"']
+        if not parts:
+            return None
+        sql = " INTERSECT ".join(parts)
+        if limit:
+            sql += " ORDER BY rowid DESC LIMIT %s"
+            params.append(limit)
+        return sql, params
+
+    def match(self, q: str) -> Q:
+        found = self._ids_sql(q)
+        if found is None:
+            return _icontains(q)
+        return Q(pk__in=RawSQL(*found))
+
+    def typeahead(self, q: str, limit: int = 10):
+        """The `limit` most recently added matches, by name."""
+        exact = self.lookup(q)
+        if exact:
+            return exact[:limit]
+        found = self._ids_sql((q or "").strip(), limit=limit)
+        if found is None:
+            return super().typeahead(q, limit)
+        from .models import Guest
+        return list(Guest.objects.using(self.using).filter(pk__in=RawSQL(*found)).order_by("full_name"))
+
+    def index(self, guests):
+        rows = [(g.pk, g.full_name or "", g.email or "", g.nid_passport or "", g.phone_number or "")
+                for g in guests]
+        if not rows:
+            return
+        ids = [(r[0],) for r in rows]
+        with connections[self.using].cursor() as cur:
+            cur.executemany(f"DELETE FROM {NAME_TABLE} WHERE rowid = %s", ids)
+            cur.executemany(f"DELETE FROM {PHONE_TABLE} WHERE rowid = %s", ids)
+            cur.executemany(
+                f"INSERT INTO {NAME_TABLE} (rowid, full_name, email, nid_passport) VALUES (%s, %s, %s, %s)",
+                [r[:4] for r in rows],
+            )
+            cur.executemany(
+                f"INSERT INTO {PHONE_TABLE} (rowid, phone) VALUES (%s, %s)",
+                [(r[0], r[4]) for r in rows],
+            )
+
+    def remove(self, ids):
+        ids = [(i,) for i in ids]
+        if not ids:
+            return
+        with connections[self.using].cursor() as cur:
+            cur.executemany(f"DELETE FROM {NAME_TABLE} WHERE rowid = %s", ids)
+            cur.executemany(f"DELETE FROM {PHONE_TABLE} WHERE rowid = %s", ids)
+
+    def rebuild(self) -> int:
+        with connections[self.using].cursor() as cur:
+            cur.execute(f"DELETE FROM {NAME_TABLE}")
+            cur.execute(f"DELETE FROM {PHONE_TABLE}")
+            cur.execute(
+                f"INSERT INTO {NAME_TABLE} (rowid, full_name, email, nid_passport) "
+                "SELECT id, full_name, COALESCE(email, ''), nid_passport FROM guests_guest"
+            )
+            cur.execute(f"INSERT INTO {PHONE_TABLE} (rowid, phone) SELECT id, phone_number FROM guests_guest")
+            return cur.rowcount
+
+
+BACKENDS = {b.name: b for b in (BasicSearch, TrigramSearch, FTS5Search)}
+_VENDOR_DEFAULT = {"sqlite": "fts5", "postgresql": "trigram"}
+_backends: dict[str, BasicSearch] = {}
+
+
+def _fts5_ready(connection) -> bool:
+    """Both FTS5 tables exist (guests 0005 creates both or neither)."""
+    try:
+        return {NAME_TABLE, PHONE_TABLE} <= set(connection.introspection.table_names())
+    except OperationalError:
+        return False
+
+
+def get_backend(using: str = "default") -> BasicSearch:
+    """Search backend for the database alias (resolved once per process)."""
+    backend = _backends.get(using)
+    if backend is None:
+        connection = connections[using]
+        name = GUEST_SEARCH_BACKEND
+        if name == "auto":
+            name = _VENDOR_DEFAULT.get(connection.vendor, "basic")
+        if name == "fts5" and not _fts5_ready(connection):
+            name = "basic"   # SQLite without FTS5 / the trigram tokenizer, or not migrated yet
+        backend = _backends[using] = BACKENDS[name](using)
+    return backend
+
+
+def search_guests(qs, q: str):
+    """Filter a Guest queryset by the search box text."""
+    return get_backend(qs.db).filter(qs, q)
+
+
+def index_guests(guests, using: str = "default"):
+    get_backend(using).index(guests)
+
@@ -62,6 +62,14 @@ def ensure_guest_profile(user):
     if guest:
         return guest
 
+    # same number already registered at the desk (any format) -> link it
+    if user.phone_e164:
+        guest = Guest.objects.filter(phone_e164=user.phone_e164, user_account__isnull=True).first()
+        if guest:
+            guest.user_account = user
+            guest.save(update_fields=["user_account"])
+            return guest
+
     # full_name safe ভাবে বানানো
     full_name = ""
     if hasattr(user, "first_name") or hasattr(user, "last_name"):
@@ -0,0 +1,24 @@
+# apps/guests/signals.py
+"""
+Keep the guest search index in step with Guest writes (same transaction),
+and advance the "guests" data version (apps/core/versioning.py).
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.versioning import bump
+
+from .models import Guest
+from .search import get_backend
+
+
+@receiver(post_save, sender=Guest)
+def _index_guest(sender, instance: Guest, using, **kwargs):
+    get_backend(using).index([instance])
+    bump("guests", using=using)
+
+
+@receiver(post_delete, sender=Guest)
+def _unindex_guest(sender, instance: Guest, using, **kwargs):
+    get_backend(using).remove([instance.pk])
+    bump("guests", using=using)
@@ -1,3 +1,72 @@
+import importlib
+from contextlib import contextmanager
+from unittest import mock
+
+from django.db import connection
+from django.db.utils import OperationalError
 from django.test import TestCase
 
-# Create your tests here.
+from . import search
+from .models import Guest
+
+search_migration = importlib.import_module("apps.guests.migrations.0005_guest_search_index")
+
+
+class _NoTrigramCursor:
+    """Cursor of a SQLite build with FTS5 but without the trigram tokenizer (< 3.34)."""
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, sql, params=None):
+        if "tokenize = 'trigram'" in sql:
+            raise OperationalError("parse error in tokenize directive")
+        return self.cursor.execute(sql, params)
+
+
+class _SchemaEditor:
+    class connection:
+        vendor = "sqlite"
+
+        @staticmethod
+        @contextmanager
+        def cursor():
+            with connection.cursor() as cur:
+                yield _NoTrigramCursor(cur)
+
+
+class GuestSearchFallbackTests(TestCase):
+    """Without both FTS5 tables, search falls back to icontains instead of failing."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.guest = Guest.objects.create(full_name="Rahim Karim", phone_number="8801711223344")
+
+    def setUp(self):
+        search._backends.clear()
+        self.addCleanup(search._backends.clear)
+
+    def tables(self):
+        return {search.NAME_TABLE, search.PHONE_TABLE} & set(connection.introspection.table_names())
+
+    def test_fts5_when_migrated(self):
+        self.assertEqual(search.get_backend().name, "fts5")
+        self.assertEqual(list(search.search_guests(Guest.objects.all(), "rah kar")), [self.guest])
+
+    def test_migration_without_trigram_tokenizer(self):
+        search_migration.uninstall(None, mock.Mock(connection=connection))
+        search_migration.install(None, _SchemaEditor())     # must not raise
+        self.assertEqual(self.tables(), set())
+
+        backend = search.get_backend()
+        self.assertEqual(backend.name, "basic")
+        self.assertEqual(list(search.search_guests(Guest.objects.all(), "Rahim")), [self.guest])
+        self.assertEqual(list(search.search_guests(Guest.objects.all(), "1122")), [self.guest])
+        search.index_guests([self.guest])       # a no-op, not an error
+
+    def test_missing_phone_table(self):
+        with connection.cursor() as cur:
+            cur.execute(f"DROP TABLE {search.PHONE_TABLE}")
+        self.assertEqual(search.get_backend().name, "basic")
+        with mock.patch.object(search, "GUEST_SEARCH_BACKEND", "fts5"):     # forced, still needs the tables
+            search._backends.clear()
+            self.assertEqual(search.get_backend().name, "basic")
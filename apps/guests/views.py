@@ -83,36 +83,39 @@ def post(self, request, *args, **kwargs):
 
 
 from django.views.generic import ListView
-from django.db.models import Q
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
 from web_project import TemplateLayout, TemplateHelper
 from apps.core.guards import RequireAnyRoleMixin
+from apps.core.pagination import KeysetPaginationMixin
 from apps.core.roles import ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN
-from .models import Guest
+from .models import Guest, GuestCompanion
+from .search import search_guests
 from django.utils.dateparse import parse_date
 
-class GuestListPage(RequireAnyRoleMixin, ListView):
+class GuestListPage(RequireAnyRoleMixin, KeysetPaginationMixin, ListView):
     model = Guest
     template_name = "guests/guest_list.html"
     context_object_name = "guests"
     paginate_by = 50
+    keyset_ordering = ("-created_at", "-id")
     allowed_roles = (ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN)
 
     def get_queryset(self):
+        # correlated count: evaluated for the page rows only, and no GROUP BY
+        # on the whole guest table (the list COUNT skips it entirely)
+        companions = (
+            GuestCompanion.objects.filter(guest=OuterRef("pk"))
+            .order_by().values("guest").annotate(n=Count("id")).values("n")
+        )
         qs = (
             Guest.objects
-            .annotate(companion_count=Count("companions"))  # 👈 add this
+            .annotate(companion_count=Coalesce(Subquery(companions, output_field=IntegerField()), 0))
             .order_by("-created_at")
         )
 
-        q = self.request.GET.get("q", "").strip()
-        if q:
-            qs = qs.filter(
-                Q(full_name__icontains=q)
-                | Q(phone_number__icontains=q)
-                | Q(email__icontains=q)
-                | Q(nid_passport__icontains=q)
-            )
+        qs = search_guests(qs, self.request.GET.get("q", ""))
 
         profession = self.request.GET.get("profession", "").strip()
         if profession:
@@ -135,7 +138,8 @@ def get_queryset(self):
 
     def get_context_data(self, **kwargs):
         context = TemplateLayout.init(self, super().get_context_data(**kwargs))
-        total_count = context["paginator"].count if "paginator" in context else 0
+        page = context.get("page_obj")
+        total_count = page.count if page is not None and page.count is not None else 0
         context.update({
             "layout_path": TemplateHelper.set_layout("layout_vertical.html", context),
             "page_title": "Guest List",
@@ -144,6 +148,8 @@ def get_context_data(self, **kwargs):
             "start_date": self.request.GET.get("start_date", ""),
             "end_date": self.request.GET.get("end_date", ""),
             "total_guests": total_count,
+            "total_is_approx": bool(page and page.count_is_approx),
+            "preserved_qs": self.preserved_querystring(),
         })
         return context
 
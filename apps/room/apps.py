@@ -4,3 +4,6 @@
 class RoomConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.room'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,117 @@
+# apps/room/availability.py
+"""
+Set-based availability engine.
+
+Answers "which rooms are busy in [cin, cout), from when to when, and with
+which guest" for every room in a single grouped query, instead of running
+several queries per room.
+
+Half-open overlap policy (same as the booking APIs):
+    existing.check_in < cout AND existing.check_out > cin
+CANCELLED bookings never block a room.
+"""
+from datetime import date
+from typing import Iterable, NamedTuple
+
+from apps.bookings.models import Booking
+
+ROOM_ID_FILTER_LIMIT = 500
+
+
+class RoomBusy(NamedTuple):
+    """Compact per-room record for one window."""
+    room_id: int
+    booked_from: date        # earliest check_in among overlaps
+    booked_to: date          # latest check_out among overlaps
+    guest: str               # guest of the earliest overlapping booking
+    booking_ids: tuple       # all overlapping booking ids, ordered by check_in
+
+
+def _busy_rows(cin: date, cout: date, room_ids, exclude_booking_id):
+    qs = (
+        Booking.objects
+        .exclude(status=Booking.Status.CANCELLED)
+        .filter(check_in__lt=cout, check_out__gt=cin)
+    )
+    if room_ids is not None:
+        qs = qs.filter(room_id__in=list(room_ids))
+    if exclude_booking_id:
+        qs = qs.exclude(pk=exclude_booking_id)
+
+    return (
+        qs.order_by("room_id", "check_in", "id")
+        .values_list("room_id", "id", "check_in", "check_out", "guest__full_name")
+    )
+
+
+def _fold(out: dict, row):
+    room_id, bid, ci, co, guest = row
+    cur = out.get(room_id)
+    if cur is None:
+        # first row per room is the earliest check_in (ordered above)
+        out[room_id] = RoomBusy(room_id, ci, co, guest or "", (bid,))
+    else:
+        out[room_id] = cur._replace(
+            booked_to=max(cur.booked_to, co),
+            booking_ids=cur.booking_ids + (bid,),
+        )
+
+
+def busy_rooms(cin: date, cout: date, room_ids: Iterable[int] | None = None,
+               exclude_booking_id=None) -> dict[int, RoomBusy]:
+    """
+    Returns {room_id: RoomBusy} for every room that has at least one
+    non-cancelled booking overlapping [cin, cout). One query total.
+    """
+    out: dict[int, RoomBusy] = {}
+    for row in _busy_rows(cin, cout, room_ids, exclude_booking_id):
+        _fold(out, row)
+    return out
+
+
+async def abusy_rooms(cin: date, cout: date, room_ids: Iterable[int] | None = None,
+                      exclude_booking_id=None) -> dict[int, RoomBusy]:
+    """busy_rooms() for async views."""
+    out: dict[int, RoomBusy] = {}
+    async for row in _busy_rows(cin, cout, room_ids, exclude_booking_id):
+        _fold(out, row)
+    return out
+
+
+def room_row(r, busy: RoomBusy | None, cin: date) -> dict:
+    """
+    Row shape used by the room overview table / RoomsAvailabilityAPI.
+    `r` must have `category` loaded (select_related) to stay query-free.
+    """
+    next_free = busy.booked_to if busy else cin
+    return {
+        "id": r.id,
+        "room": r.room_number,
+        "category": getattr(getattr(r, "category", None), "name", ""),
+        "rate": int(r.price or 0),
+        "is_booked": busy is not None,
+        "booked_label": (f"{busy.booked_from:%d %b %Y} → {busy.booked_to:%d %b %Y}" if busy else ""),
+        "guest": busy.guest if busy else "",
+        "next_free": (next_free.strftime("%d %b %Y") if next_free else ""),
+    }
+
+
+def room_rows(rooms, cin: date, cout: date) -> list[dict]:
+    """
+    Build overview rows for an iterable/queryset of rooms.
+    Costs: 1 query for the rooms + 1 grouped booking query.
+    """
+    rooms = list(rooms)
+    # small subsets -> IN (...) filter; large sets -> one scan of the window
+    # (keeps us clear of backend bind-parameter limits)
+    ids = [r.id for r in rooms] if len(rooms) <= ROOM_ID_FILTER_LIMIT else None
+    busy = busy_rooms(cin, cout, room_ids=ids)
+    return [room_row(r, busy.get(r.id), cin) for r in rooms]
+
+
+async def aroom_rows(rooms, cin: date, cout: date) -> list[dict]:
+    """room_rows() for async views (`rooms` is a queryset)."""
+    rooms = [r async for r in rooms]
+    ids = [r.id for r in rooms] if len(rooms) <= ROOM_ID_FILTER_LIMIT else None
+    busy = await abusy_rooms(cin, cout, room_ids=ids)
+    return [room_row(r, busy.get(r.id), cin) for r in rooms]
@@ -0,0 +1,104 @@
+# apps/room/calendar.py
+"""
+Room calendar data (RoomCalendarAPI + RoomCalendarBatchAPI).
+
+One ordered query returns every booking overlapping the window for all the
+requested rooms; events and each room's next-free date are both derived
+from those rows in Python, so the cost is the same for 1 room × 1 month as
+for every room × a quarter.
+
+Event ends are check_out + 1 day (exclusive), which is how the calendar
+grids have always painted the check-out day. next_free is the latest
+check_out among the overlapping bookings.
+"""
+from datetime import date, timedelta
+from typing import Iterable, NamedTuple
+
+from django.conf import settings
+
+from apps.bookings.models import Booking
+
+CALENDAR_MAX_MONTHS = getattr(settings, "CALENDAR_MAX_MONTHS", 12)
+
+EVENT_COLUMNS = ("room", "id", "start", "end", "guest", "status")
+
+
+class CalendarEvent(NamedTuple):
+    room: int
+    id: int
+    start: date          # check_in (inclusive)
+    end: date            # check_out + 1 day (exclusive)
+    guest: str
+    status: str
+
+
+def month_start(ym: str | None, default: date | None = None) -> date:
+    """'YYYY-MM' -> first day of that month; bad/empty input -> `default` (this month)."""
+    try:
+        y, m = map(int, (ym or "").strip().split("-"))
+        return date(y, m, 1)
+    except (TypeError, ValueError):
+        pass
+    if default is not None:
+        return default
+    today = date.today()
+    return date(today.year, today.month, 1)
+
+
+def next_month(d: date) -> date:
+    return date(d.year + 1, 1, 1) if d.month == 12 else date(d.year, d.month + 1, 1)
+
+
+def months_between(first: date, last: date) -> int:
+    """Inclusive month count from `first`'s month to `last`'s month."""
+    return (last.year - first.year) * 12 + last.month - first.month + 1
+
+
+def calendar_events(start: date, end: date, room_ids: Iterable[int] | None = None):
+    """
+    (events, next_free) for bookings overlapping [start, end).
+    events: [CalendarEvent] ordered by room, check_in, id
+    next_free: {room_id: date}, only for rooms that have events
+    One query.
+    """
+    qs = Booking.objects.filter(check_in__lt=end, check_out__gt=start)
+    if room_ids is not None:
+        qs = qs.filter(room_id__in=list(room_ids))
+    rows = (
+        qs.order_by("room_id", "check_in", "id")
+        .values_list("room_id", "id", "check_in", "check_out", "guest__full_name", "status")
+    )
+
+    events, next_free = [], {}
+    for room_id, bid, ci, co, guest, status in rows:
+        events.append(CalendarEvent(room_id, bid, ci, co + timedelta(days=1), guest or "", status))
+        if room_id not in next_free or co > next_free[room_id]:
+            next_free[room_id] = co
+    return events, next_free
+
+
+def calendar_payload(start: date, end: date, room_ids: list[int], filter_rooms: bool = True) -> dict:
+    """
+    Columnar JSON shape for RoomCalendarBatchAPI:
+      {
+        "from": "YYYY-MM-DD", "to": "YYYY-MM-DD",        # [from, to)
+        "rooms":     [1, 2, 3],
+        "next_free": ["YYYY-MM-DD" | null, ...],          # aligned with rooms
+        "events": {"room": [...], "id": [...], "start": [...],
+                   "end": [...], "guest": [...], "status": [...]}
+      }
+    filter_rooms=False skips the IN (...) filter when room_ids is every room
+    (keeps large hotels clear of backend bind-parameter limits).
+    """
+    events, next_free = calendar_events(start, end, room_ids if filter_rooms else None)
+    columns = {name: [] for name in EVENT_COLUMNS}
+    for ev in events:
+        for name, value in zip(EVENT_COLUMNS, ev):
+            columns[name].append(value.isoformat() if isinstance(value, date) else value)
+    return {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "rooms": room_ids,
+        "next_free": [next_free[r].isoformat() if r in next_free else None for r in room_ids],
+        "events": columns,
+    }
@@ -0,0 +1,94 @@
+# apps/room/management/commands/bench_availability.py
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Min, Max
+from django.test.utils import CaptureQueriesContext
+
+from apps.bookings.models import Booking
+from apps.guests.models import Guest
+from apps.room.availability import room_rows
+from apps.room.models import Room, Category
+
+
+def _legacy_room_row(r, cin, cout):
+    """The old per-room shape (5 queries per room), kept here for comparison."""
+    qs = Booking.objects.select_related("guest").filter(room_id=r.id, check_in__lt=cout, check_out__gt=cin)
+    is_booked = qs.exists()
+    booked_from = qs.aggregate(m=Min("check_in"))["m"]
+    booked_to = qs.aggregate(m=Max("check_out"))["m"]
+    b0 = qs.order_by("check_in").first()
+    return {
+        "id": r.id,
+        "is_booked": is_booked,
+        "booked_from": booked_from,
+        "booked_to": booked_to,
+        "guest": getattr(getattr(b0, "guest", None), "full_name", "") if is_booked else "",
+    }
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark room availability: legacy per-room queries vs the set-based engine. "
+        "Synthetic rooms/bookings are created inside a transaction and rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="50,200,1000", help="Comma-separated room counts.")
+        parser.add_argument("--bookings-per-room", type=int, default=6)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **opts):
+        sizes = [int(x) for x in opts["sizes"].split(",") if x.strip()]
+        self.stdout.write(f"{'rooms':>6} | {'legacy q':>8} {'legacy ms':>10} | {'engine q':>8} {'engine ms':>10}")
+        for n in sizes:
+            try:
+                with transaction.atomic():
+                    self._seed(n, opts["bookings_per_room"])
+                    legacy = self._measure(lambda rooms, ci, co: [_legacy_room_row(r, ci, co) for r in rooms], opts["repeat"])
+                    engine = self._measure(room_rows, opts["repeat"])
+                    self.stdout.write(
+                        f"{n:>6} | {legacy[0]:>8} {legacy[1]:>10.1f} | {engine[0]:>8} {engine[1]:>10.1f}"
+                    )
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _seed(self, n, per_room):
+        cat = Category.objects.create(name="__bench__")
+        rooms = Room.objects.bulk_create(
+            [Room(room_number=f"B{i:05d}", category=cat, price=1000) for i in range(n)]
+        )
+        guest = Guest.objects.create(full_name="Bench Guest", phone_number="__bench__")
+        start = date.today() - timedelta(days=per_room * 2)
+        bookings = []
+        for r in rooms:
+            for k in range(per_room):
+                ci = start + timedelta(days=k * 4)
+                bookings.append(Booking(
+                    guest=guest, room=r, check_in=ci, check_out=ci + timedelta(days=2),
+                    status=Booking.Status.RESERVED,
+                ))
+        # bulk_create skips save()/signals: no validation queries, no SMS
+        Booking.objects.bulk_create(bookings, batch_size=500)
+
+    def _measure(self, fn, repeat):
+        cin = date.today()
+        cout = cin + timedelta(days=3)
+        best = None
+        queries = 0
+        for _ in range(repeat):
+            rooms = Room.objects.select_related("category").filter(room_number__startswith="B").order_by("room_number")
+            with CaptureQueriesContext(connection) as ctx:
+                t0 = time.perf_counter()
+                fn(rooms, cin, cout)
+                elapsed = (time.perf_counter() - t0) * 1000
+            queries = len(ctx.captured_queries)
+            best = elapsed if best is None else min(best, elapsed)
+        return queries, best
@@ -0,0 +1,14 @@
+# apps/room/signals.py
+"""Advance the "rooms" data version (apps/core/versioning.py) on room/category writes."""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.versioning import bump
+
+from .models import Category, Room
+
+
+@receiver([post_save, post_delete], sender=Room)
+@receiver([post_save, post_delete], sender=Category)
+def _bump_room_version(sender, using, **kwargs):
+    bump("rooms", using=using)
@@ -16,6 +16,7 @@
 
     # path("dashboard/rooms/calendar/", views.RoomCalendarPage.as_view(), name="room_calendar"),
     path("dashboard/rooms/calendar/data/", views.RoomCalendarAPI.as_view(), name="api_room_calendar"),
+    path("dashboard/rooms/calendar/batch/", views.RoomCalendarBatchAPI.as_view(), name="api_room_calendar_batch"),
 
     # path("dashboard/rooms/overview/", RoomOverviewPage.as_view(), name="room_overview"),
     # path("dashboard/rooms/api/availability/", RoomsAvailabilityAPI.as_view(), name="api_rooms_overview"),
@@ -185,14 +185,18 @@ def post(self, request, pk):
 from django.views.generic import TemplateView, View
 from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Min, Max
+from django.db.models import Q
 
 from web_project import TemplateLayout, TemplateHelper
-from apps.core.guards import RequireAnyRoleMixin
+from apps.core.guards import AsyncRequireAnyRoleMixin, RequireAnyRoleMixin
 from apps.core.roles import ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN
+from apps.core.versioning import etag_versions
 
 from apps.room.models import Room
-from apps.bookings.models import Booking
+from apps.room.availability import ROOM_ID_FILTER_LIMIT, aroom_rows, room_rows
+from apps.room.calendar import (
+    CALENDAR_MAX_MONTHS, calendar_events, calendar_payload, month_start, months_between, next_month,
+)
 
 # ---- shared helper ----
 def _parse_range(request):
@@ -203,24 +207,6 @@ def _parse_range(request):
         cout = cin + timedelta(days=1)
     return cin, cout
 
-def _room_row(r: Room, cin: date, cout: date):
-    qs = Booking.objects.select_related("guest").filter(room_id=r.id, check_in__lt=cout, check_out__gt=cin)
-    is_booked = qs.exists()
-    booked_from = qs.aggregate(m=Min("check_in"))["m"]
-    booked_to   = qs.aggregate(m=Max("check_out"))["m"]
-    b0 = qs.order_by("check_in").first()
-    next_free = booked_to if is_booked else cin
-    return {
-        "id": r.id,
-        "room": r.room_number,
-        "category": getattr(getattr(r, "category", None), "name", ""),
-        "rate": int(r.price or 0),
-        "is_booked": is_booked,
-        "booked_label": (f"{booked_from:%d %b %Y} → {booked_to:%d %b %Y}" if (booked_from and booked_to) else ""),
-        "guest": getattr(getattr(b0, "guest", None), "full_name", "") if is_booked else "",
-        "next_free": (next_free.strftime("%d %b %Y") if next_free else ""),
-    }
-
 # ---- main combined page ----
 @method_decorator(login_required, name="dispatch")
 class RoomOverviewPage(RequireAnyRoleMixin, TemplateView):
@@ -231,7 +217,7 @@ def get_context_data(self, **kwargs):
         ctx = TemplateLayout.init(self, super().get_context_data(**kwargs))
         cin, cout = _parse_range(self.request)
         rooms = Room.objects.select_related("category").order_by("room_number")
-        rows = [_room_row(r, cin, cout) for r in rooms[:30]]
+        rows = room_rows(rooms[:30], cin, cout)
         ctx.update({
             "layout_path": TemplateHelper.set_layout("layout_vertical.html", ctx),
             "page_title": "Room Overview & Calendar",
@@ -246,16 +232,17 @@ def get_context_data(self, **kwargs):
 
 # ---- ajax: table availability ----
 @method_decorator(login_required, name="dispatch")
-class RoomsAvailabilityAPI(RequireAnyRoleMixin, View):
+@method_decorator(etag_versions("bookings", "rooms", "guests"), name="get")
+class RoomsAvailabilityAPI(AsyncRequireAnyRoleMixin, View):
     allowed_roles = (ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN)
-    def get(self, request):
+    async def get(self, request):
         cin, cout = _parse_range(request)
         q = (request.GET.get("q") or "").strip()
         status = (request.GET.get("status") or "").lower()
         qs = Room.objects.select_related("category").order_by("room_number")
         if q:
             qs = qs.filter(Q(room_number__icontains=q) | Q(category__name__icontains=q))
-        rows = [_room_row(r, cin, cout) for r in qs]
+        rows = await aroom_rows(qs, cin, cout)
         if status in ("available", "booked"):
             rows = [r for r in rows if r["is_booked"] == (status == "booked")]
         return JsonResponse({"results": rows})
@@ -274,6 +261,7 @@ def get(self, request):
 
 
 @method_decorator(login_required, name="dispatch")
+@method_decorator(etag_versions("bookings", "guests"), name="get")
 class RoomCalendarAPI(RequireAnyRoleMixin, View):
     """
     GET ?room=<id>&ym=YYYY-MM   -> month view for a room
@@ -298,55 +286,69 @@ class RoomCalendarAPI(RequireAnyRoleMixin, View):
 
     def get(self, request):
         rid = request.GET.get("room")
-        ym  = (request.GET.get("ym") or "").strip()
-
-        if not rid:
+        if not rid or not rid.isdigit():
             return JsonResponse({"error": "Missing room"}, status=400)
 
-        # --- Resolve month window ---
-        today = date.today()
-        try:
-            if ym:
-                y, m = map(int, ym.split("-"))
-            else:
-                y, m = today.year, today.month
-            month_start = date(y, m, 1)
-        except Exception:
-            # Fallback to current month on bad ym
-            month_start = date(today.year, today.month, 1)
-
-        # First day of next month (exclusive)
-        if month_start.month == 12:
-            month_end = date(month_start.year + 1, 1, 1)
-        else:
-            month_end = date(month_start.year, month_start.month + 1, 1)
-
-        # --- Bookings that overlap this month window ---
-        qs = (Booking.objects
-              .select_related("guest")
-              .filter(room_id=rid,
-                      check_in__lt=month_end,   # overlap
-                      check_out__gt=month_start)
-              .order_by("check_in", "id"))
-
-        # IMPORTANT: end must be exclusive; use check_out + 1 day
-        events = []
-        for b in qs:
-            events.append({
-                "id": b.id,
-                "start": b.check_in.isoformat(),
-                "end":   (b.check_out + timedelta(days=1)).isoformat(),  # ✅ inclusive rendering
-                "guest": b.guest.full_name if b.guest_id else "",
-                "status": b.status,
-            })
-
-        # keep your "next_free" as the latest check_out among overlaps
-        latest_co = qs.aggregate(mx=Max("check_out"))["mx"]
-        next_free = latest_co.isoformat() if latest_co else None
+        # --- Resolve month window (bad ym -> current month) ---
+        start = month_start(request.GET.get("ym"))
+        end = next_month(start)
+
+        events, next_free = calendar_events(start, end, room_ids=[int(rid)])
+        latest_co = next_free.get(int(rid))
 
         return JsonResponse({
-            "month_start": month_start.isoformat(),
-            "month_end":   month_end.isoformat(),
-            "events":      events,
-            "next_free":   next_free,
+            "month_start": start.isoformat(),
+            "month_end":   end.isoformat(),
+            "events": [
+                {
+                    "id": ev.id,
+                    "start": ev.start.isoformat(),
+                    "end":   ev.end.isoformat(),
+                    "guest": ev.guest,
+                    "status": ev.status,
+                }
+                for ev in events
+            ],
+            "next_free":   latest_co.isoformat() if latest_co else None,
         })
+
+
+# ---- ajax: batched calendar (many rooms x many months) ----
+@method_decorator(login_required, name="dispatch")
+@method_decorator(etag_versions("bookings", "rooms", "guests"), name="get")
+class RoomCalendarBatchAPI(RequireAnyRoleMixin, View):
+    """
+    GET ?rooms=1,2,3&from=YYYY-MM&to=YYYY-MM
+        rooms: comma-separated ids, or "all" / omitted for every room
+        from/to: inclusive months (default: current month)
+
+    Columnar payload, see apps.room.calendar.calendar_payload. The ETag comes
+    from the data versions (apps.core.versioning): a client revalidating with
+    If-None-Match gets 304 without any booking query while nothing changed.
+    """
+    allowed_roles = (ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN)
+
+    def get(self, request):
+        raw = (request.GET.get("rooms") or "all").strip()
+        if raw == "all":
+            room_ids = list(Room.objects.order_by("id").values_list("id", flat=True))
+        else:
+            try:
+                room_ids = sorted({int(x) for x in raw.split(",") if x.strip()})
+            except ValueError:
+                return JsonResponse({"error": "rooms must be comma-separated ids"}, status=400)
+            if not room_ids:
+                return JsonResponse({"error": "Missing rooms"}, status=400)
+            if len(room_ids) > ROOM_ID_FILTER_LIMIT:
+                return JsonResponse({"error": f"At most {ROOM_ID_FILTER_LIMIT} rooms"}, status=400)
+
+        first = month_start(request.GET.get("from"))
+        last = month_start(request.GET.get("to"), default=first)
+        if last < first:
+            return JsonResponse({"error": "to is before from"}, status=400)
+        if months_between(first, last) > CALENDAR_MAX_MONTHS:
+            return JsonResponse({"error": f"At most {CALENDAR_MAX_MONTHS} months"}, status=400)
+
+        payload = calendar_payload(first, next_month(last), room_ids, filter_rooms=raw != "all")
+
+        return JsonResponse(payload)
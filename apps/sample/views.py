@@ -90,6 +90,11 @@ def get_context_data(self, **kwargs):
 )
 
 from apps.bookings.models import Booking
+from apps.bookings.room_nights import occupied_nights, occupied_room_ids
+from apps.finances import rollup
+from apps.core.versioning import etag_versions
+from apps.core.guards import AsyncRequireAnyRoleMixin
+from apps.room.models import Category
 # from apps.rooms.models import Room
 
 
@@ -141,54 +146,44 @@ def _admin_context(self, ctx):
 
         # ---- KPIs ----
         total_bookings = Booking.objects.count()
-        active_guests = Booking.objects.filter(
-            check_in__lte=today, check_out__gt=today
-        ).count()
-
-        occupied_room_ids_today = Booking.objects.filter(
-            check_in__lte=today, check_out__gt=today
-        ).values_list("room_id", flat=True)
+        # occupancy = indexed point lookup on RoomNight(date)
+        active_guests = occupied_nights(today).count()
 
         available_rooms = Room.objects.exclude(
-            id__in=occupied_room_ids_today
+            id__in=occupied_room_ids(today)
         ).count()
 
-        total_revenue = (
-            Booking.objects.aggregate(total=Sum("payment_amount"))["total"] or 0
-        )
+        # ---- money / trends from the daily finance rollup ----
+        total_revenue = rollup.totals()["net_received"]
 
         # ---- 7-day booking trend ----
-        trend = (
-            Booking.objects.filter(created_at__gte=week_ago)
-            .annotate(day=TruncDate("created_at"))
-            .values("day")
-            .annotate(count=Count("id"))
-            .order_by("day")
-        )
-        chart_labels = [t["day"].strftime("%b %d") for t in trend]
-        chart_data = [t["count"] for t in trend]
-
-        # ---- Revenue by category ----
-        rev_by_cat = (
-            Booking.objects
-            .values("room__category__name")
-            .annotate(total=Sum("payment_amount"))
-            .order_by("room__category__name")
+        trend = [
+            t for t in rollup.series(week_ago, today, by="day", measures=("new_bookings",))
+            if t["new_bookings"]
+        ]
+        chart_labels = [t["key"].strftime("%b %d") for t in trend]
+        chart_data = [t["new_bookings"] for t in trend]
+
+        # ---- Revenue by category (cash received, all time) ----
+        cat_names = dict(Category.objects.values_list("id", "name"))
+        rev_by_cat = sorted(
+            (
+                (cat_names.get(r["key"]) or "—", r["charges"] - r["refunds"])
+                for r in rollup.series(
+                    None, None, by="room_category_id", measures=("charges", "refunds"),
+                    expense_category_id=0, income_category_id=0,
+                )
+            ),
+            key=lambda r: r[0],
         )
-        cat_labels = [r["room__category__name"] or "—" for r in rev_by_cat]
-        cat_data = [float(r["total"] or 0) for r in rev_by_cat]
+        cat_labels = [name for name, _ in rev_by_cat]
+        cat_data = [float(total) for _, total in rev_by_cat]
 
-        # ---- Monthly revenue ----
+        # ---- Monthly revenue (cash received per month) ----
         six_months_ago = today - timedelta(days=180)
-        monthly = (
-            Booking.objects.filter(created_at__gte=six_months_ago)
-            .annotate(month=TruncMonth("created_at"))
-            .values("month")
-            .annotate(total=Sum("payment_amount"))
-            .order_by("month")
-        )
-        month_labels = [m["month"].strftime("%b %Y") for m in monthly]
-        month_data = [float(m["total"] or 0) for m in monthly]
+        monthly = rollup.series(six_months_ago, today, by="month")
+        month_labels = [m["key"].strftime("%b %Y") for m in monthly]
+        month_data = [float(m["charges"] - m["refunds"]) for m in monthly]
 
         # ---- Today lists ----
         todays_checkins = (
@@ -203,12 +198,10 @@ def _admin_context(self, ctx):
         )
 
         # ---- Room cards ----
-        active_bookings = (
-            Booking.objects
-            .select_related("guest", "room", "room__category")
-            .filter(check_in__lte=today, check_out__gt=today)
-        )
-        active_by_room = {b.room_id: b for b in active_bookings}
+        active_by_room = {
+            n.room_id: n.booking
+            for n in occupied_nights(today).select_related("booking__guest")
+        }
 
         def room_floor(room_number):
             m = re.search(r"\d+", str(room_number or ""))
@@ -279,28 +272,26 @@ def _selected_day(request) -> date:
     return parse_date(request.GET.get("d") or "") or date.today()
 
 @method_decorator(login_required, name="dispatch")
-class DashboardPulseAPI(RequireAnyRoleMixin, View):
+@method_decorator(etag_versions("bookings", "payments", "rooms", "guests"), name="get")
+class DashboardPulseAPI(AsyncRequireAnyRoleMixin, View):
     allowed_roles = (ROLE_RECEPTIONIST, ROLE_MANAGER, ROLE_ADMIN, ROLE_SUPER_ADMIN)
 
-    def get(self, request):
+    async def get(self, request):
         the_day  = _selected_day(request)
         next_day = the_day + timedelta(days=1)
 
-        total_bookings = Booking.objects.count()
+        total_bookings = await Booking.objects.acount()
 
         # occupancy for the selected day
-        occupied_qs = Booking.objects.filter(check_in__lte=the_day, check_out__gt=the_day)
-        active_guests = occupied_qs.count()
-
-        occupied_room_ids = occupied_qs.values_list("room_id", flat=True)
-        available_rooms = Room.objects.exclude(id__in=occupied_room_ids).count()
+        active_guests = await occupied_nights(the_day).acount()
+        available_rooms = await Room.objects.exclude(id__in=occupied_room_ids(the_day)).acount()
 
-        total_revenue = float(Booking.objects.aggregate(total=Sum("payment_amount"))["total"] or 0)
+        total_revenue = float((await rollup.atotals())["net_received"])
 
         qs_base = Booking.objects.select_related("guest", "room", "room__category")
 
-        ci_qs = qs_base.filter(check_in__gte=the_day, check_in__lt=next_day).order_by("check_in")[:20]
-        co_qs = qs_base.filter(check_out__gte=the_day, check_out__lt=next_day).order_by("check_out")[:20]
+        ci_qs = [b async for b in qs_base.filter(check_in__gte=the_day, check_in__lt=next_day).order_by("check_in")[:20]]
+        co_qs = [b async for b in qs_base.filter(check_out__gte=the_day, check_out__lt=next_day).order_by("check_out")[:20]]
 
         def row(b: Booking, is_ci=True):
             return {
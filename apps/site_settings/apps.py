@@ -4,3 +4,7 @@
 class SitesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.site_settings"
+
+    def ready(self):
+        # cache invalidation on SiteSettings save/delete
+        from . import signals  # noqa
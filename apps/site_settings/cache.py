@@ -0,0 +1,55 @@
+# apps/site_settings/cache.py
+"""
+Cached accessor for the single SiteSettings row.
+
+Two tiers:
+  1. process-local copy, trusted for SITE_SETTINGS_LOCAL_TTL seconds
+  2. Django cache (shared between workers when a shared backend is set),
+     kept until a SiteSettings save/delete invalidates it
+Only a miss on both hits the database.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+CACHE_KEY = "site_settings:current"
+LOCAL_TTL = getattr(settings, "SITE_SETTINGS_LOCAL_TTL", 60)
+
+_NO_ROW = "__none__"    # cached "no row yet" (distinct from a cache miss)
+_lock = threading.Lock()
+_local = {"value": None, "expires": 0.0}
+
+
+def get_site_settings():
+    """The SiteSettings instance, or None if none exists yet."""
+    now = time.monotonic()
+    if now < _local["expires"]:
+        return _local["value"]
+
+    try:
+        value = cache.get(CACHE_KEY)
+    except Exception:
+        value = None
+    if value is None:
+        from .models import SiteSettings
+        value = SiteSettings.objects.first() or _NO_ROW
+        try:
+            cache.set(CACHE_KEY, value, timeout=None)
+        except Exception:
+            pass
+
+    obj = None if value == _NO_ROW else value
+    with _lock:
+        _local.update(value=obj, expires=now + LOCAL_TTL)
+    return obj
+
+
+def invalidate_site_settings():
+    with _lock:
+        _local.update(value=None, expires=0.0)
+    try:
+        cache.delete(CACHE_KEY)
+    except Exception:
+        pass
@@ -1,10 +1,8 @@
-from .models import (
-    SiteSettings
-)
+from .cache import get_site_settings
 
 
 
 def global_site_data(request):
     return {
-        'site_settings': SiteSettings.objects.first() or {},
+        'site_settings': get_site_settings() or {},
     }
@@ -0,0 +1,14 @@
+# apps/site_settings/signals.py
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import invalidate_site_settings
+from .models import SiteSettings
+
+
+@receiver([post_save, post_delete], sender=SiteSettings)
+def _invalidate_cached_settings(sender, using=None, **kwargs):
+    # after commit: invalidating inside the admin's transaction lets a
+    # concurrent request re-cache the old committed row (with no timeout)
+    transaction.on_commit(invalidate_site_settings, using=using)
@@ -2,6 +2,9 @@
 ASGI config for web_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Long-lived responses (the live events stream, core:live_events) need this
+entry point, e.g. ``uvicorn config.asgi:application``; a sync WSGI worker
+would be tied up for as long as a browser keeps the stream open.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -0,0 +1,125 @@
+# config/server.py
+"""
+Gunicorn server profile (read by gunicorn-cfg.py; no Django import).
+
+Everything comes from the environment / config/.env, like settings.py:
+
+    GUNICORN_WORKER_CLASS   uvicorn (default, ASGI: async views + live events)
+                            | gthread | sync             (WSGI: config.wsgi)
+                            Under ASGI a plain StreamingHttpResponse over a
+                            sync iterator is buffered whole; large bodies use
+                            apps.core.exports.Chunked*Response instead.
+    WEB_CONCURRENCY         worker processes; default derived from the CPUs
+                            this container may use:
+                              uvicorn  -> cpus + 1   (one event loop each)
+                              gthread  -> cpus * 2 + 1, GUNICORN_THREADS each
+                              sync     -> cpus * 2 + 1
+    GUNICORN_PRELOAD        import the app once in the master and fork
+                            (copy-on-write sharing of the imported code)
+    GUNICORN_MAX_REQUESTS   recycle a worker after N requests (+ up to
+                            GUNICORN_MAX_REQUESTS_JITTER, so they don't all
+                            restart together) to bound memory growth
+    GUNICORN_TIMEOUT / GUNICORN_GRACEFUL_TIMEOUT / GUNICORN_KEEPALIVE
+    GUNICORN_BIND / GUNICORN_LOG_LEVEL
+
+Several workers only make sense with shared state: the data versions, the
+occupancy index freshness counter and the SMS de-dup keys live in the
+Django cache, so with the default process-local cache (CACHE_URL unset /
+locmem) the derived count is capped at 1. Set CACHE_URL to a shared cache
+(and EVENTS_BROKER_URL for live events) to scale out; an explicit
+WEB_CONCURRENCY is always obeyed.
+"""
+import logging
+import os
+from dataclasses import dataclass
+
+import environ
+
+env = environ.Env()
+environ.Env.read_env()  # same config/.env as settings.py
+
+logger = logging.getLogger("gunicorn.error")
+
+WORKER_CLASSES = {
+    "uvicorn": "uvicorn_worker.UvicornWorker",
+    "gthread": "gthread",
+    "sync": "sync",
+}
+ASGI_APP = "config.asgi:application"
+WSGI_APP = "config.wsgi:application"
+
+
+def cpu_count() -> int:
+    """CPUs this process may actually use (affinity mask and cgroup v2 quota)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+def shared_cache() -> bool:
+    url = env("CACHE_URL", default="locmemcache://")
+    return not url.startswith(("locmemcache", "dummycache"))
+
+
+def derived_workers(worker_class: str, cpus: int) -> int:
+    return cpus + 1 if worker_class == "uvicorn" else cpus * 2 + 1
+
+
+@dataclass(frozen=True)
+class ServerProfile:
+    bind: str
+    app: str
+    worker_class: str
+    workers: int
+    threads: int
+    preload_app: bool
+    max_requests: int
+    max_requests_jitter: int
+    timeout: int
+    graceful_timeout: int
+    keepalive: int
+    loglevel: str
+    worker_tmp_dir: str | None
+
+
+def load_profile() -> ServerProfile:
+    kind = env("GUNICORN_WORKER_CLASS", default="uvicorn")
+    if kind not in WORKER_CLASSES:
+        raise ValueError(f"GUNICORN_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}; got {kind!r}")
+
+    workers = env.int("WEB_CONCURRENCY", default=0)
+    if workers <= 0:
+        workers = derived_workers(kind, cpu_count())
+        if workers > 1 and not shared_cache():
+            logger.warning("CACHE_URL is process-local: running 1 worker (set CACHE_URL or WEB_CONCURRENCY).")
+            workers = 1
+    if workers > 1 and not env("EVENTS_BROKER_URL", default=""):
+        logger.warning("%d workers with the in-process events broker: live events only reach "
+                       "clients of the publishing worker (set EVENTS_BROKER_URL).", workers)
+
+    max_requests = env.int("GUNICORN_MAX_REQUESTS", default=1000)
+    return ServerProfile(
+        bind=env("GUNICORN_BIND", default="0.0.0.0:5005"),
+        app=ASGI_APP if kind == "uvicorn" else WSGI_APP,
+        worker_class=WORKER_CLASSES[kind],
+        workers=workers,
+        threads=env.int("GUNICORN_THREADS", default=4) if kind == "gthread" else 1,
+        preload_app=env.bool("GUNICORN_PRELOAD", default=True),
+        max_requests=max_requests,
+        max_requests_jitter=env.int("GUNICORN_MAX_REQUESTS_JITTER", default=max_requests // 10),
+        timeout=env.int("GUNICORN_TIMEOUT", default=30),
+        graceful_timeout=env.int("GUNICORN_GRACEFUL_TIMEOUT", default=30),
+        keepalive=env.int("GUNICORN_KEEPALIVE", default=5),
+        loglevel=env("GUNICORN_LOG_LEVEL", default="info"),
+        # heartbeat files on tmpfs: a slow container disk can't make workers look dead
+        worker_tmp_dir="/dev/shm" if os.path.isdir("/dev/shm") else None,
+    )
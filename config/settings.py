@@ -23,6 +23,17 @@
 # JBD SMS
 JBD_SMS_TOKEN  = env("JBD_SMS_TOKEN", default="")
 JBD_SENDER_ID  = env("JBD_SENDER_ID", default="8809617615010")
+JBD_SMS_URL    = env("JBD_SMS_URL", default="https://sms.jbdit.net/api/http/sms/send")
+# pooled gateway client (apps.core.sms.JBDSmsClient)
+JBD_SMS_POOL_SIZE               = env.int("JBD_SMS_POOL_SIZE", default=10)
+JBD_SMS_CONNECT_TIMEOUT         = env.float("JBD_SMS_CONNECT_TIMEOUT", default=3.05)
+JBD_SMS_READ_TIMEOUT            = env.float("JBD_SMS_READ_TIMEOUT", default=10)
+JBD_SMS_BREAKER_THRESHOLD       = env.int("JBD_SMS_BREAKER_THRESHOLD", default=5)
+JBD_SMS_BREAKER_RESET_SECONDS   = env.float("JBD_SMS_BREAKER_RESET_SECONDS", default=30)
+
+# SMS outbox (apps.core.outbox) — drained by `manage.py sms_worker`
+SMS_OUTBOX_ENABLED      = env.bool("SMS_OUTBOX_ENABLED", default=True)
+SMS_OUTBOX_MAX_ATTEMPTS = env.int("SMS_OUTBOX_MAX_ATTEMPTS", default=5)
 
 
 # Optional hotel metadata fallbacks (used only if DB site_settings is unavailable)
@@ -98,7 +109,10 @@
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # whitenoise, async-capable under ASGI (apps.core.middleware)
+    "apps.core.middleware.WhiteNoiseMiddleware",
+    # no-op unless QUERY_PROFILING_ENABLED (report at core:query_profile)
+    "apps.core.profiling.QueryProfileMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -145,10 +159,14 @@
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# SQLITE_PATH: the web container and the sms / export workers must open the same
+# file (docker-compose puts it on the shared `data` volume); timeout = seconds a
+# writer waits for another process's lock before "database is locked"
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": env("SQLITE_PATH", default=str(BASE_DIR / "db.sqlite3")),
+        "OPTIONS": {"timeout": env.int("SQLITE_TIMEOUT", default=20)},
     }
 }
 
@@ -169,6 +187,48 @@
 # }
 
 
+# Cache
+# Local memory by default (per process). Point CACHE_URL at a shared backend,
+# e.g. redis://127.0.0.1:6379/1, so cached SiteSettings / occupancy versions
+# are invalidated across all gunicorn workers.
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
+# Seconds a worker trusts its in-process SiteSettings copy before re-checking the cache
+SITE_SETTINGS_LOCAL_TTL = env.int("SITE_SETTINGS_LOCAL_TTL", default=60)
+
+# Request profiler (apps.core.profiling): per-view latency / SQL stats, ring buffer per process
+QUERY_PROFILING_ENABLED = env.bool("QUERY_PROFILING_ENABLED", default=False)
+QUERY_PROFILING_BUFFER  = env.int("QUERY_PROFILING_BUFFER", default=2000)
+
+# Guest search index (apps.guests.search): auto = FTS5 on SQLite, pg_trgm on PostgreSQL
+GUEST_SEARCH_BACKEND = env("GUEST_SEARCH_BACKEND", default="auto")
+
+# Live events (apps.core.events): "" = in-process broker (one worker), or redis://host:6379/0
+EVENTS_BROKER_URL = env("EVENTS_BROKER_URL", default="")
+EVENTS_HEARTBEAT_SECONDS = env.int("EVENTS_HEARTBEAT_SECONDS", default=15)
+
+# Rendered PDF cache (apps.core.pdf): outside MEDIA_ROOT so invoices are never publicly served;
+# PDF_SENDFILE_HEADER = X-Accel-Redirect (nginx, internal location PDF_SENDFILE_PREFIX) or X-Sendfile
+PDF_CACHE_ENABLED   = env.bool("PDF_CACHE_ENABLED", default=True)
+PDF_CACHE_DIR       = env("PDF_CACHE_DIR", default=str(BASE_DIR / "cache" / "pdf"))
+PDF_CACHE_MAX_BYTES = env.int("PDF_CACHE_MAX_BYTES", default=256 * 1024 * 1024)
+PDF_SENDFILE_HEADER = env("PDF_SENDFILE_HEADER", default="")
+PDF_SENDFILE_PREFIX = env("PDF_SENDFILE_PREFIX", default="/protected/pdf/")
+
+# Batch invoice rendering (manage.py render_invoices / admin action): worker processes, 0 = one per CPU
+INVOICE_BATCH_WORKERS = env.int("INVOICE_BATCH_WORKERS", default=0)
+
+# Background exports (apps.core.export_jobs, run by `manage.py export_worker`):
+# exports of at least this many rows are queued instead of streamed; files kept EXPORT_JOB_TTL seconds
+# in EXPORT_JOB_DIR (outside MEDIA_ROOT: guest PII, served only through core:export_job_download)
+EXPORT_JOB_DIR              = env("EXPORT_JOB_DIR", default=str(BASE_DIR / "cache" / "exports"))
+EXPORT_BACKGROUND_THRESHOLD = env.int("EXPORT_BACKGROUND_THRESHOLD", default=20000)
+EXPORT_JOB_TTL              = env.int("EXPORT_JOB_TTL", default=24 * 3600)
+EXPORT_JOB_STALE_SECONDS    = env.int("EXPORT_JOB_STALE_SECONDS", default=30 * 60)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -0,0 +1,11 @@
+#!/bin/sh
+set -e
+
+# Migrations run when the container starts, not at image build time: the
+# build has no access to the real database. With several replicas against
+# one database, set MIGRATE_ON_START=0 on all but one.
+if [ "${MIGRATE_ON_START:-1}" = "1" ]; then
+    python manage.py migrate --noinput
+fi
+
+exec "$@"
@@ -1,8 +1,43 @@
 # -*- encoding: utf-8 -*-
+# Server profile (worker class/count, preload, recycling, timeouts) lives in
+# config/server.py and is driven by the environment; see its docstring.
+from config.server import load_profile
+
+_profile = load_profile()
+
+wsgi_app = _profile.app               # config.asgi for uvicorn, config.wsgi otherwise
+bind = _profile.bind
+worker_class = _profile.worker_class
+workers = _profile.workers
+threads = _profile.threads
+preload_app = _profile.preload_app
+max_requests = _profile.max_requests
+max_requests_jitter = _profile.max_requests_jitter
+timeout = _profile.timeout
+graceful_timeout = _profile.graceful_timeout
+keepalive = _profile.keepalive
+if _profile.worker_tmp_dir:
+    worker_tmp_dir = _profile.worker_tmp_dir
 
-bind = '0.0.0.0:5005'
-workers = 1
 accesslog = '-'
-loglevel = 'debug'
+loglevel = _profile.loglevel
 capture_output = True
 enable_stdio_inheritance = True
+
+
+def when_ready(server):
+    # preload_app: import the URLconf (views, forms, ...) and load the layout
+    # registry (bootstrap classes, menus) in the master as well, so workers
+    # share them instead of each building them on its first request
+    if preload_app:
+        from django.urls import get_resolver
+        from web_project.template_helpers import registry
+        get_resolver().url_patterns
+        registry.warm()
+
+
+def post_fork(server, worker):
+    # preload_app: a forked worker must not reuse the master's DB connections
+    if preload_app:
+        from django.db import connections
+        connections.close_all()
@@ -1,7 +1,7 @@
 from django.conf import settings
-import json
 
 
+from web_project.template_helpers import registry
 from web_project.template_helpers.theme import TemplateHelper
 
 menu_file_path =  settings.BASE_DIR / "templates" / "layout" / "partials" / "menu" / "horizontal" / "json" / "horizontal_menu.json"
@@ -35,8 +35,11 @@ def init(context):
         return context
 
     def init_menu_data(context):
-        # Load the menu data from the JSON file
-        menu_data = json.load(menu_file_path.open()) if menu_file_path.exists() else []
+        # Load the menu data from the JSON file (parsed once by the layout registry)
+        menu_data = registry.menu_data(menu_file_path)
 
         # Updated context with menu_data
         context.update({"menu_data": menu_data})
+
+    def menu_files():
+        return [menu_file_path]
@@ -104,22 +104,24 @@
 
 
 from django.conf import settings
-import json
+from web_project.template_helpers import registry
 from web_project.template_helpers.theme import TemplateHelper
 from pathlib import Path
 from django.contrib.auth.models import AnonymousUser
 
+MENU_FILES = {
+    "master_admin": "vertical_master_menu.json",
+    "admin": "vertical_menu.json",
+    "receptionist": "vertical_receptionist_menu.json",
+    "teacher": "vertical_teacher_menu.json",
+    "guest": "vertical_menu_guest.json",
+}
+DEFAULT_MENU_FILE = "vertical_menu.json"
+
 # Load menu JSON path dynamically by role
 def get_menu_file_path(role):
     role = (role or "student").lower()  # Normalize role to lowercase
-    filename_map = {
-        "master_admin": "vertical_master_menu.json",
-        "admin": "vertical_menu.json",
-        "receptionist": "vertical_receptionist_menu.json",
-        "teacher": "vertical_teacher_menu.json",
-        "guest": "vertical_menu_guest.json",
-    }
-    filename = filename_map.get(role, "vertical_menu.json")  # Default menu
+    filename = MENU_FILES.get(role, DEFAULT_MENU_FILE)  # Default menu
     return Path(settings.BASE_DIR) / "templates" / "layout" / "partials" / "menu" / "vertical" / "json" / filename
 
 class TemplateBootstrapLayoutVertical:
@@ -144,19 +146,15 @@ def init(context):
             role = user["role"].lower()
         else:
             role = "guest"
-            print(f"DEBUG: User is {user}, defaulting role to 'guest'")
-
-        print(f"DEBUG: User: {user}, Role: {role}")
 
         TemplateBootstrapLayoutVertical.init_menu_data(context, role)
         return context
 
     @staticmethod
     def init_menu_data(context, role):
-        menu_file_path = get_menu_file_path(role)
-        try:
-            with open(menu_file_path, 'r', encoding='utf-8') as file:
-                context["menu_data"] = json.load(file)
-        except FileNotFoundError:
-            print(f"DEBUG: Menu file not found: {menu_file_path}")
-            context["menu_data"] = []
+        # Parsed once per file by the layout registry
+        context["menu_data"] = registry.menu_data(get_menu_file_path(role))
+
+    @staticmethod
+    def menu_files():
+        return [get_menu_file_path(role) for role in (*MENU_FILES, None)]
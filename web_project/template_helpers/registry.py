@@ -0,0 +1,146 @@
+# web_project/template_helpers/registry.py
+"""
+Layout registry: what TemplateHelper.set_layout and the layout bootstrap
+classes used to work out on every page view, worked out once per process.
+
+    bootstrap_class("layout_vertical")  -> TemplateBootstrapLayoutVertical
+    menu_data(path)                     -> parsed, pre-filtered menu tree
+
+Bootstrap classes are discovered from templates/<THEME_LAYOUT_DIR>/bootstrap
+on first use. Menu files are parsed once per file; entries that can never
+render (empty items, links whose URL name does not reverse, submenus left
+empty, headers with nothing under them) are dropped at load time, so the
+menu templates only do the per-user permission checks.
+
+THEME_MENU_RELOAD (default: DEBUG) re-reads a menu file when its mtime
+changes, so menu edits show up without a restart.
+
+warm() does all of it up front (gunicorn's when_ready, with preload_app, so
+forked workers share the result). Menu trees are shared between requests:
+treat them as read-only.
+"""
+import json
+import logging
+import os
+import pkgutil
+import threading
+from importlib import import_module
+
+from django.conf import settings
+from django.urls import NoReverseMatch, reverse
+
+logger = logging.getLogger(__name__)
+
+THEME_MENU_RELOAD = getattr(settings, "THEME_MENU_RELOAD", settings.DEBUG)
+
+_lock = threading.Lock()
+_bootstraps = None
+_menus = {}  # path -> (mtime, menu tree)
+
+
+# ---------- bootstrap classes ----------
+def _bootstrap_package() -> str:
+    return f"templates.{settings.THEME_LAYOUT_DIR.replace('/', '.')}.bootstrap"
+
+
+def _class_name(layout: str) -> str:
+    return f"TemplateBootstrap{layout.title().replace('_', '')}"
+
+
+def _discover() -> dict:
+    package = import_module(_bootstrap_package())
+    found = {}
+    for info in pkgutil.iter_modules(package.__path__):
+        module = import_module(f"{package.__name__}.{info.name}")
+        cls = getattr(module, _class_name(info.name), None)
+        if cls is not None:
+            found[info.name] = cls
+    return found
+
+
+def _registry() -> dict:
+    global _bootstraps
+    if _bootstraps is None:
+        with _lock:
+            if _bootstraps is None:
+                _bootstraps = _discover()
+    return _bootstraps
+
+
+def bootstrap_class(layout: str):
+    """Bootstrap class for a layout name ("layout_vertical"), else the theme default."""
+    registry = _registry()
+    cls = registry.get(layout)
+    if cls is None:
+        cls = getattr(import_module(f"{_bootstrap_package()}.default"), "TemplateBootstrapDefault")
+        registry[layout] = cls
+    return cls
+
+
+# ---------- menus ----------
+def _resolves(url_name) -> bool:
+    try:
+        reverse(url_name)
+    except NoReverseMatch:
+        return False
+    return True
+
+
+def _prune(items, path) -> list:
+    kept = []
+    for item in items or []:
+        if not item:
+            continue
+        if "menu_header" in item:
+            kept.append(item)
+            continue
+        if item.get("submenu"):
+            submenu = _prune(item["submenu"], path)
+            if not submenu:
+                continue
+            item = {**item, "submenu": submenu}
+        elif not item.get("external") and not _resolves(item.get("url")):
+            logger.info("Menu %s: dropping %r, URL %r does not resolve", path.name, item.get("name"), item.get("url"))
+            continue
+        kept.append(item)
+
+    # a header only makes sense above at least one item
+    return [
+        item for i, item in enumerate(kept)
+        if "menu_header" not in item or (i + 1 < len(kept) and "menu_header" not in kept[i + 1])
+    ]
+
+
+def _load(path) -> dict:
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    if isinstance(data, dict) and "menu" in data:
+        data = {**data, "menu": _prune(data["menu"], path)}
+    return data
+
+
+def menu_data(path):
+    """Parsed, pre-filtered menu file ([] if it does not exist)."""
+    entry = _menus.get(path)
+    if entry is not None and not THEME_MENU_RELOAD:
+        return entry[1]
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        if entry is None:
+            logger.warning("Menu file not found: %s", path)
+        _menus[path] = (None, [])
+        return []
+    if entry is None or entry[0] != mtime:
+        entry = _menus[path] = (mtime, _load(path))
+    return entry[1]
+
+
+def warm():
+    """Discover the bootstrap classes and load every menu file now."""
+    for cls in set(_registry().values()):
+        for path in getattr(cls, "menu_files", tuple)():
+            try:
+                menu_data(path)
+            except ValueError:
+                logger.warning("Menu file %s is not valid JSON; it fails on first use", path)
@@ -1,112 +1,68 @@
 from django.conf import settings
-from pprint import pprint
+from functools import cache, lru_cache
 import os
-from importlib import import_module, util
+from importlib import import_module
+from types import MappingProxyType
+
+from web_project.template_helpers import registry
+
+
+# TEMPLATE_CONFIG keys copied into every page context
+BASE_CONTEXT_KEYS = (
+    "layout",
+    "theme",
+    "style",
+    "rtl_support",
+    "rtl_mode",
+    "has_customizer",
+    "display_customizer",
+    "content_layout",
+    "navbar_type",
+    "header_type",
+    "menu_fixed",
+    "menu_collapsed",
+    "footer_fixed",
+    "show_dropdown_onhover",
+    "customizer_controls",
+)
+
+# Context values map_context derives its classes from
+MAP_CONTEXT_KEYS = (
+    "layout",
+    "header_type",
+    "navbar_type",
+    "menu_collapsed",
+    "menu_fixed",
+    "footer_fixed",
+    "rtl_support",
+    "rtl_mode",
+    "show_dropdown_onhover",
+    "display_customizer",
+    "content_layout",
+    "navbar_detached",
+)
+
+
+@cache
+def base_context():
+    """Read-only theme context from TEMPLATE_CONFIG, built once."""
+    return MappingProxyType({key: settings.TEMPLATE_CONFIG.get(key) for key in BASE_CONTEXT_KEYS})
 
 
 # Core TemplateHelper class
 class TemplateHelper:
     # Init the Template Context using TEMPLATE_CONFIG
     def init_context(context):
-        context.update(
-            {
-                "layout": settings.TEMPLATE_CONFIG.get("layout"),
-                "theme": settings.TEMPLATE_CONFIG.get("theme"),
-                "style": settings.TEMPLATE_CONFIG.get("style"),
-                "rtl_support": settings.TEMPLATE_CONFIG.get("rtl_support"),
-                "rtl_mode": settings.TEMPLATE_CONFIG.get("rtl_mode"),
-                "has_customizer": settings.TEMPLATE_CONFIG.get("has_customizer"),
-                "display_customizer": settings.TEMPLATE_CONFIG.get(
-                    "display_customizer"
-                ),
-                "content_layout": settings.TEMPLATE_CONFIG.get("content_layout"),
-                "navbar_type": settings.TEMPLATE_CONFIG.get("navbar_type"),
-                "header_type": settings.TEMPLATE_CONFIG.get("header_type"),
-                "menu_fixed": settings.TEMPLATE_CONFIG.get("menu_fixed"),
-                "menu_collapsed": settings.TEMPLATE_CONFIG.get("menu_collapsed"),
-                "footer_fixed": settings.TEMPLATE_CONFIG.get("footer_fixed"),
-                "show_dropdown_onhover": settings.TEMPLATE_CONFIG.get(
-                    "show_dropdown_onhover"
-                ),
-                "customizer_controls": settings.TEMPLATE_CONFIG.get(
-                    "customizer_controls"
-                ),
-            }
-        )
+        context.update(base_context())
         return context
 
     # ? Map context variables to template class/value/variables names
     def map_context(context):
-        #! Header Type (horizontal support only)
-        if context.get("layout") == "horizontal":
-            if context.get("header_type") == "fixed":
-                context["header_type_class"] = "layout-menu-fixed"
-            elif context.get("header_type") == "static":
-                context["header_type_class"] = ""
-            else:
-                context["header_type_class"] = ""
-        else:
-            context["header_type_class"] = ""
-
-        #! Navbar Type (vertical/front support only)
-        if context.get("layout") != "horizontal":
-            if context.get("navbar_type") == "fixed":
-                context["navbar_type_class"] = "layout-navbar-fixed"
-            elif context.get("navbar_type") == "static":
-                context["navbar_type_class"] = ""
-            else:
-                context["navbar_type_class"] = "layout-navbar-hidden"
-        else:
-            context["navbar_type_class"] = ""
-
-        # Menu collapsed
-        context["menu_collapsed_class"] = (
-            "layout-menu-collapsed" if context.get("menu_collapsed") else ""
-        )
-
-        #! Menu Fixed (vertical support only)
-        if context.get("layout") == "vertical":
-            if context.get("menu_fixed") is True:
-                context["menu_fixed_class"] = "layout-menu-fixed"
-            else:
-                context["menu_fixed_class"] = ""
-
-        # Footer Fixed
-        context["footer_fixed_class"] = (
-            "layout-footer-fixed" if context.get("footer_fixed") else ""
-        )
-
-        # RTL Supported template
-        context["rtl_support_value"] = "/rtl" if context.get("rtl_support") else ""
-
-        # RTL Mode/Layout
-        context["rtl_mode_value"], context["text_direction_value"] = (
-            ("rtl", "rtl") if context.get("rtl_mode") else ("ltr", "ltr")
-        )
-
-        #!  Show dropdown on hover (Horizontal menu)
-        context["show_dropdown_onhover_value"] = (
-            "true" if context.get("show_dropdown_onhover") else "false"
-        )
-
-        # Display Customizer
-        context["display_customizer_class"] = (
-            "" if context.get("display_customizer") else "customizer-hide"
-        )
-
-        # Content Layout
-        if context.get("content_layout") == "wide":
-            context["container_class"] = "container-fluid"
-            context["content_layout_class"] = "layout-wide"
-        else:
-            context["container_class"] = "container-xxl"
-            context["content_layout_class"] = "layout-compact"
-
-        # Detached Navbar
-        if context.get("navbar_detached") == True:
-            context["navbar_detached_class"] = "navbar-detached"
-        else:
-            context["navbar_detached_class"] = ""
+        values = tuple(context.get(key) for key in MAP_CONTEXT_KEYS)
+        try:
+            context.update(_mapped_context(values))
+        except TypeError:  # unhashable value: compute without the cache
+            context.update(_map_values(dict(zip(MAP_CONTEXT_KEYS, values))))
 
     # Get theme variables by scope
     def get_theme_variables(scope):
@@ -121,28 +77,94 @@ def set_layout(view, context={}):
         # Extract layout from the view path
         layout = os.path.splitext(view)[0].split("/")[0]
 
-        # Get module path
-        module = f"templates.{settings.THEME_LAYOUT_DIR.replace('/', '.')}.bootstrap.{layout}"
-
-        # Check if the bootstrap file is exist
-        if util.find_spec(module) is not None:
-            # Auto import and init the default bootstrap.py file from the theme
-            TemplateBootstrap = TemplateHelper.import_class(
-                module, f"TemplateBootstrap{layout.title().replace('_', '')}"
-            )
-            TemplateBootstrap.init(context)
-        else:
-            module = f"templates.{settings.THEME_LAYOUT_DIR.replace('/', '.')}.bootstrap.default"
-
-            TemplateBootstrap = TemplateHelper.import_class(
-                module, "TemplateBootstrapDefault"
-            )
-            TemplateBootstrap.init(context)
+        # Init the layout's bootstrap class (resolved once, see registry.py)
+        registry.bootstrap_class(layout).init(context)
 
         return f"{settings.THEME_LAYOUT_DIR}/{view}"
 
     # Import a module by string
     def import_class(fromModule, import_className):
-        pprint(f"Loading {import_className} from {fromModule}")
         module = import_module(fromModule)
         return getattr(module, import_className)
+
+
+@lru_cache(maxsize=64)
+def _mapped_context(values):
+    return MappingProxyType(_map_values(dict(zip(MAP_CONTEXT_KEYS, values))))
+
+
+# ? Template class/value/variable names for the given context values
+def _map_values(values):
+    context = {}
+
+    #! Header Type (horizontal support only)
+    if values.get("layout") == "horizontal":
+        if values.get("header_type") == "fixed":
+            context["header_type_class"] = "layout-menu-fixed"
+        elif values.get("header_type") == "static":
+            context["header_type_class"] = ""
+        else:
+            context["header_type_class"] = ""
+    else:
+        context["header_type_class"] = ""
+
+    #! Navbar Type (vertical/front support only)
+    if values.get("layout") != "horizontal":
+        if values.get("navbar_type") == "fixed":
+            context["navbar_type_class"] = "layout-navbar-fixed"
+        elif values.get("navbar_type") == "static":
+            context["navbar_type_class"] = ""
+        else:
+            context["navbar_type_class"] = "layout-navbar-hidden"
+    else:
+        context["navbar_type_class"] = ""
+
+    # Menu collapsed
+    context["menu_collapsed_class"] = (
+        "layout-menu-collapsed" if values.get("menu_collapsed") else ""
+    )
+
+    #! Menu Fixed (vertical support only)
+    if values.get("layout") == "vertical":
+        if values.get("menu_fixed") is True:
+            context["menu_fixed_class"] = "layout-menu-fixed"
+        else:
+            context["menu_fixed_class"] = ""
+
+    # Footer Fixed
+    context["footer_fixed_class"] = (
+        "layout-footer-fixed" if values.get("footer_fixed") else ""
+    )
+
+    # RTL Supported template
+    context["rtl_support_value"] = "/rtl" if values.get("rtl_support") else ""
+
+    # RTL Mode/Layout
+    context["rtl_mode_value"], context["text_direction_value"] = (
+        ("rtl", "rtl") if values.get("rtl_mode") else ("ltr", "ltr")
+    )
+
+    #!  Show dropdown on hover (Horizontal menu)
+    context["show_dropdown_onhover_value"] = (
+        "true" if values.get("show_dropdown_onhover") else "false"
+    )
+
+    # Display Customizer
+    context["display_customizer_class"] = (
+        "" if values.get("display_customizer") else "customizer-hide"
+    )
+
+    # Content Layout
+    if values.get("content_layout") == "wide":
+        context["container_class"] = "container-fluid"
+        context["content_layout_class"] = "layout-wide"
+    else:
+        context["container_class"] = "container-xxl"
+        context["content_layout_class"] = "layout-compact"
+
+    # Detached Navbar
+    if values.get("navbar_detached") == True:
+        context["navbar_detached_class"] = "navbar-detached"
+    else:
+        context["navbar_detached_class"] = ""
+    return context